@@ -1 +1,50 @@
-"""aiopvapi library."""
+"""aiopvapi library.
+
+The main classes can be imported from the package itself, their modules
+are only imported on first use::
+
+    from aiopvapi import AioRequest, Hub, Shades
+"""
+
+from importlib import import_module
+
+# typing.TYPE_CHECKING without importing typing, the names are visible to
+# type checkers but never imported at runtime
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from aiopvapi.automations import Automations
+    from aiopvapi.helpers.aiorequest import AioRequest
+    from aiopvapi.hub import Hub
+    from aiopvapi.resources.model import PowerviewData
+    from aiopvapi.resources.shade import ShadePosition
+    from aiopvapi.resources.shade_data import PowerviewShadeData
+    from aiopvapi.rooms import Rooms
+    from aiopvapi.scenes import Scenes
+    from aiopvapi.shades import Shades
+
+_LAZY_IMPORTS = {
+    "AioRequest": "aiopvapi.helpers.aiorequest",
+    "Automations": "aiopvapi.automations",
+    "Hub": "aiopvapi.hub",
+    "PowerviewData": "aiopvapi.resources.model",
+    "PowerviewShadeData": "aiopvapi.resources.shade_data",
+    "Rooms": "aiopvapi.rooms",
+    "Scenes": "aiopvapi.scenes",
+    "ShadePosition": "aiopvapi.resources.shade",
+    "Shades": "aiopvapi.shades",
+}
+
+__all__ = sorted(_LAZY_IMPORTS)
+
+
+def __getattr__(name: str):
+    """Import the main classes on first use."""
+    if (module := _LAZY_IMPORTS.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_LAZY_IMPORTS])
@@ -4,9 +4,11 @@ import logging
 
 from aiopvapi.helpers.aiorequest import AioRequest
 from aiopvapi.helpers.api_base import ApiEntryPoint
-from aiopvapi.helpers.constants import ATTR_ID, ATTR_SCHEDULED_EVENT_DATA
+from aiopvapi.helpers.constants import ATTR_SCHEDULED_EVENT_DATA
+from aiopvapi.helpers.tracing import ATTR_COUNT, span
 from aiopvapi.resources.automation import Automation
 from aiopvapi.resources.model import PowerviewData
+from aiopvapi.resources.records import AutomationRecord
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -14,6 +16,8 @@ _LOGGER = logging.getLogger(__name__)
 class Automations(ApiEntryPoint):
     """Powerview Automations."""
 
+    record_type = AutomationRecord
+
     def __init__(self, request: AioRequest) -> None:
         """Initialize Automations."""
         self.api_endpoint = "scheduledevents"
@@ -36,25 +40,29 @@ class Automations(ApiEntryPoint):
         return raw.get("scene")
 
     async def get_automations(
-        self, fetch_scene_data: bool = True, **kwargs
+        self, fetch_scene_data: bool = True, typed: bool = False, **kwargs
     ) -> PowerviewData:
         """Get a list of automations.
 
+        :param typed: Create the automations from typed records.
         :returns PowerviewData object
         :raises PvApiError when an error occurs.
         """
-        resources = await self.get_resources(**kwargs)
-        if self.api_version < 3:
-            resources = resources[ATTR_SCHEDULED_EVENT_DATA]
+        with span("Automations.get_automations", self.request) as trace:
+            if typed:
+                data = await self.get_typed_data(**kwargs)
+            else:
+                resources = await self.get_resources(**kwargs)
+                if self.api_version < 3:
+                    resources = resources[ATTR_SCHEDULED_EVENT_DATA]
 
-        _LOGGER.debug("Raw automation data: %s", resources)
+                _LOGGER.debug("Raw automation data: %s", resources)
 
-        processed = {
-            entry[ATTR_ID]: Automation(entry, self.request) for entry in resources
-        }
+                data = self._stored_data(resources, complete=not kwargs.get("params"))
+            trace.set_attribute(ATTR_COUNT, len(data.processed))
 
-        if fetch_scene_data is True:
-            for automation in processed.values():
-                await automation.fetch_associated_scene_data()
+            if fetch_scene_data is True:
+                for automation in data.processed.values():
+                    await automation.fetch_associated_scene_data()
 
-        return PowerviewData(raw=resources, processed=processed)
+        return data
@@ -0,0 +1,301 @@
+"""Fleet class managing many PowerView hubs from a single event loop."""
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+import logging
+import time
+from typing import Any
+
+import aiohttp
+
+from aiopvapi.helpers.aiorequest import AioRequest
+from aiopvapi.hub import Hub
+from aiopvapi.resources.model import PowerviewData
+from aiopvapi.resources.shade_data import PowerviewShadeData
+from aiopvapi.rooms import Rooms
+from aiopvapi.scenes import Scenes
+from aiopvapi.shades import Shades
+from aiopvapi.snapshot import write_snapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+HUB_STATE_UNKNOWN = "unknown"
+HUB_STATE_ONLINE = "online"
+HUB_STATE_OFFLINE = "offline"
+
+
+@dataclass
+class HubHealth:
+    """Health information for a single hub in the fleet."""
+
+    state: str = HUB_STATE_UNKNOWN
+    last_success: float | None = None
+    last_failure: float | None = None
+    last_error: str | None = None
+    last_duration: float | None = None
+    consecutive_failures: int = 0
+    total_failures: int = 0
+    total_operations: int = 0
+
+
+@dataclass
+class FleetResult:
+    """Result of a fleet operation on a single hub."""
+
+    host: str
+    result: Any = None
+    error: BaseException | None = None
+    duration: float = 0
+
+    @property
+    def ok(self) -> bool:
+        """Return if the operation succeeded for this hub."""
+        return self.error is None
+
+
+@dataclass
+class FleetHub:
+    """A single hub and its entry points within the fleet."""
+
+    host: str
+    request: AioRequest
+    tags: set[str] = field(default_factory=set)
+    health: HubHealth = field(default_factory=HubHealth)
+    rooms: PowerviewData | None = None
+    scenes: PowerviewData | None = None
+    shades: PowerviewData | None = None
+
+    def __post_init__(self) -> None:
+        """Create the entry points sharing the hub request."""
+        self.hub = Hub(self.request)
+        self.shade_data = PowerviewShadeData()
+
+    @property
+    def api_version(self) -> int | None:
+        """Return the API version of the hub."""
+        return self.request.api_version
+
+
+FleetOperation = Callable[[FleetHub], Awaitable[Any]]
+
+
+class HubFleet:
+    """Manage many PowerView hubs sharing one connection pool.
+
+    All hubs share a single connector. The number of hubs worked on at the
+    same time is capped fleet-wide (max_concurrency) and per hub
+    (per_hub_concurrency), and every operation is bound by
+    operation_timeout so one dead hub never stalls the others.
+
+    The fleet has to be created from within a running event loop.
+    """
+
+    def __init__(
+        self,
+        websession: aiohttp.ClientSession | None = None,
+        max_concurrency: int = 50,
+        per_hub_concurrency: int = 2,
+        timeout: int = 15,
+        operation_timeout: float = 60,
+    ) -> None:
+        """Initialize the fleet."""
+        self.loop = asyncio.get_running_loop()
+        self._owns_session = websession is None
+        if websession is None:
+            connector = aiohttp.TCPConnector(
+                limit=max_concurrency, limit_per_host=per_hub_concurrency
+            )
+            websession = aiohttp.ClientSession(connector=connector)
+        self.websession = websession
+        self.timeout = timeout
+        self.operation_timeout = operation_timeout
+        self.per_hub_concurrency = per_hub_concurrency
+        self._fleet_semaphore = asyncio.Semaphore(max_concurrency)
+        self._hub_semaphores: dict[str, asyncio.Semaphore] = {}
+        self.hubs: dict[str, FleetHub] = {}
+
+    async def __aenter__(self) -> "HubFleet":
+        """Enter the fleet context."""
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Close the fleet on exit."""
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the shared session if it is owned by the fleet."""
+        if self._owns_session:
+            await self.websession.close()
+
+    def add_hub(
+        self,
+        host: str,
+        api_version: int | None = None,
+        tags: Iterable[str] | None = None,
+    ) -> FleetHub:
+        """Add a hub to the fleet.
+
+        :param host: ip address or hostname of the hub.
+        :param api_version: Optional known api version, skips detection.
+        :param tags: Free form labels, ie the building the hub is in.
+        """
+        if host in self.hubs:
+            fleet_hub = self.hubs[host]
+            fleet_hub.tags.update(tags or ())
+            return fleet_hub
+
+        request = AioRequest(
+            host,
+            loop=self.loop,
+            websession=self.websession,
+            timeout=self.timeout,
+            api_version=api_version,
+        )
+        fleet_hub = FleetHub(host, request, set(tags or ()))
+        self.hubs[host] = fleet_hub
+        self._hub_semaphores[host] = asyncio.Semaphore(self.per_hub_concurrency)
+        return fleet_hub
+
+    def remove_hub(self, host: str) -> None:
+        """Remove a hub from the fleet."""
+        self.hubs.pop(host, None)
+        self._hub_semaphores.pop(host, None)
+
+    def select(self, tag: str | None = None) -> list[FleetHub]:
+        """Return the hubs carrying a tag, or all hubs."""
+        if tag is None:
+            return list(self.hubs.values())
+        return [hub for hub in self.hubs.values() if tag in hub.tags]
+
+    def health(self) -> dict[str, HubHealth]:
+        """Return the health of every hub in the fleet."""
+        return {host: hub.health for host, hub in self.hubs.items()}
+
+    async def _run_on_hub(
+        self, fleet_hub: FleetHub, operation: FleetOperation, timeout: float
+    ) -> FleetResult:
+        """Run an operation on a single hub, never raising."""
+        health = fleet_hub.health
+        async with self._fleet_semaphore, self._hub_semaphores[fleet_hub.host]:
+            start = time.monotonic()
+            try:
+                result = await asyncio.wait_for(operation(fleet_hub), timeout)
+            except Exception as err:  # pylint: disable=broad-except # noqa: BLE001
+                duration = time.monotonic() - start
+                health.state = HUB_STATE_OFFLINE
+                health.last_failure = time.time()
+                health.last_error = repr(err)
+                health.last_duration = duration
+                health.consecutive_failures += 1
+                health.total_failures += 1
+                health.total_operations += 1
+                _LOGGER.debug("Fleet operation failed on %s: %r", fleet_hub.host, err)
+                return FleetResult(fleet_hub.host, error=err, duration=duration)
+
+        duration = time.monotonic() - start
+        health.state = HUB_STATE_ONLINE
+        health.last_success = time.time()
+        health.last_duration = duration
+        health.consecutive_failures = 0
+        health.total_operations += 1
+        return FleetResult(fleet_hub.host, result=result, duration=duration)
+
+    async def run(
+        self,
+        operation: FleetOperation,
+        hubs: Iterable[FleetHub] | None = None,
+        timeout: float | None = None,
+    ) -> AsyncIterator[FleetResult]:
+        """Run an operation on many hubs, yielding results as hubs finish.
+
+        :param operation: Coroutine function receiving a FleetHub.
+        :param hubs: The hubs to run on, defaults to the whole fleet.
+        :param timeout: Per hub time limit, defaults to operation_timeout.
+        """
+        hubs = self.select() if hubs is None else list(hubs)
+        timeout = timeout or self.operation_timeout
+        tasks = [
+            asyncio.ensure_future(self._run_on_hub(hub, operation, timeout))
+            for hub in hubs
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def gather(
+        self,
+        operation: FleetOperation,
+        hubs: Iterable[FleetHub] | None = None,
+        timeout: float | None = None,
+    ) -> dict[str, FleetResult]:
+        """Run an operation on many hubs and return all results by host."""
+        return {
+            result.host: result
+            async for result in self.run(operation, hubs=hubs, timeout=timeout)
+        }
+
+    @staticmethod
+    async def _refresh(fleet_hub: FleetHub) -> FleetHub:
+        if not fleet_hub.hub.main_processor_version:
+            await fleet_hub.hub.query_firmware()
+        fleet_hub.rooms = await Rooms(fleet_hub.request).get_rooms()
+        fleet_hub.scenes = await Scenes(fleet_hub.request).get_scenes()
+        fleet_hub.shades = await Shades(fleet_hub.request).get_shades()
+        fleet_hub.shade_data.store_group_data(fleet_hub.shades)
+        return fleet_hub
+
+    @staticmethod
+    async def _firmware(fleet_hub: FleetHub) -> dict[str, Any]:
+        hub = fleet_hub.hub
+        await hub.query_firmware()
+        return {
+            "name": hub.name,
+            "serial_number": hub.serial_number,
+            "model": hub.model,
+            "firmware": hub.firmware,
+            "api_version": hub.api_version,
+            "role": hub.role,
+        }
+
+    @staticmethod
+    async def _close_shades(fleet_hub: FleetHub) -> list[int]:
+        if fleet_hub.shades is None:
+            if not fleet_hub.api_version:
+                await fleet_hub.hub.query_firmware()
+            fleet_hub.shades = await Shades(fleet_hub.request).get_shades()
+            fleet_hub.shade_data.store_group_data(fleet_hub.shades)
+        closed = []
+        # shades of a single hub share one radio, send them one by one
+        for shade in fleet_hub.shades.processed.values():
+            await shade.close()
+            closed.append(shade.id)
+        return closed
+
+    def refresh_all(
+        self, tag: str | None = None, timeout: float | None = None
+    ) -> AsyncIterator[FleetResult]:
+        """Refresh firmware, rooms, scenes and shades of every hub."""
+        return self.run(self._refresh, self.select(tag), timeout)
+
+    def firmware_inventory(
+        self, tag: str | None = None, timeout: float | None = None
+    ) -> AsyncIterator[FleetResult]:
+        """Query the firmware information of every hub."""
+        return self.run(self._firmware, self.select(tag), timeout)
+
+    def close_shades(
+        self, tag: str | None = None, timeout: float | None = None
+    ) -> AsyncIterator[FleetResult]:
+        """Close all shades of every hub carrying a tag."""
+        return self.run(self._close_shades, self.select(tag), timeout)
+
+    def write_snapshot(self, path: str, tag: str | None = None) -> None:
+        """Write the hubs, rooms and shades fetched so far to a snapshot file.
+
+        See aiopvapi.snapshot, FleetSnapshot opens it.
+        """
+        write_snapshot(path, self.select(tag))
@@ -0,0 +1,232 @@
+"""Gateway group routing requests over Gen 3 multi gateway installations."""
+
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+import logging
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
+from aiopvapi.helpers.aiorequest import AioRequest, PvApiConnectionError, PvApiError
+from aiopvapi.helpers.tools import get_base_path
+from aiopvapi.hub import Hub
+
+_LOGGER = logging.getLogger(__name__)
+
+ROLE_PRIMARY = "Primary"
+
+# weight of the latest measurement in the latency moving average
+LATENCY_SMOOTHING = 0.3
+# time a gateway is skipped after a connection failure
+FAILURE_BACKOFF = 30
+
+
+@dataclass
+class Gateway:
+    """A single gateway of a multi gateway installation."""
+
+    ip: str
+    name: str | None = None
+    serial_number: str | None = None
+    primary: bool = False
+    latency: float | None = None
+    in_flight: int = 0
+    failures: int = 0
+    unavailable_until: float = 0
+
+    def available(self, now: float) -> bool:
+        """Return if the gateway is not backing off after a failure."""
+        return self.unavailable_until <= now
+
+    def record_success(self, duration: float) -> None:
+        """Update the latency moving average."""
+        if self.latency is None:
+            self.latency = duration
+        else:
+            self.latency += LATENCY_SMOOTHING * (duration - self.latency)
+        self.failures = 0
+        self.unavailable_until = 0
+
+    def record_failure(self, now: float) -> None:
+        """Back off from a gateway that failed to respond."""
+        self.failures += 1
+        self.unavailable_until = now + FAILURE_BACKOFF
+
+
+class GatewayGroup(AioRequest):
+    """Request class spreading requests over all gateways of a home.
+
+    Writes (put, post, delete), which includes moves and scene activations,
+    go to the primary gateway. Reads go to the available gateway with the
+    fewest requests in flight and the lowest latency. When a gateway fails
+    to respond the request is retried on the next gateway.
+
+    A GatewayGroup can be used everywhere an AioRequest is used.
+    """
+
+    def __init__(
+        self,
+        hub_ip,
+        loop=None,
+        websession=None,
+        timeout: int = 15,
+        api_version: int | None = 3,
+    ) -> None:
+        """Initialize the gateway group with the initially known gateway."""
+        super().__init__(
+            hub_ip,
+            loop=loop,
+            websession=websession,
+            timeout=timeout,
+            api_version=api_version,
+        )
+        self._host = self._netloc(get_base_path(hub_ip, ""))
+        self.gateways: dict[str, Gateway] = {
+            self._host: Gateway(self._host, primary=True)
+        }
+
+    @staticmethod
+    def _netloc(url: str) -> str:
+        return urlsplit(url).netloc
+
+    @property
+    def primary(self) -> Gateway:
+        """Return the primary gateway."""
+        for gateway in self.gateways.values():
+            if gateway.primary:
+                return gateway
+        return self.gateways[self._host]
+
+    async def discover(self, **kwargs) -> dict[str, Gateway]:
+        """Discover all gateways of the home and their roles."""
+        home = await self._request(
+            "get", get_base_path(self.hub_ip, "home"), self._read_order(), **kwargs
+        )
+        for entry in home.get("gateways", []):
+            if not (ip := entry.get("ip")):
+                continue
+            gateway = self.gateways.setdefault(ip, Gateway(ip))
+            gateway.name = entry.get("name")
+            gateway.serial_number = entry.get("serial")
+
+        for gateway in self.gateways.values():
+            hub = Hub(
+                AioRequest(
+                    gateway.ip,
+                    loop=self.loop,
+                    websession=self.websession,
+                    timeout=self._timeout,
+                    api_version=self.api_version,
+                )
+            )
+            try:
+                await hub.query_firmware(**kwargs)
+            except PvApiError as err:
+                _LOGGER.debug("Gateway %s not reachable: %s", gateway.ip, err)
+                gateway.record_failure(time.monotonic())
+                continue
+            gateway.primary = hub.role == ROLE_PRIMARY
+            gateway.serial_number = gateway.serial_number or hub.serial_number
+
+        if not any(gateway.primary for gateway in self.gateways.values()):
+            _LOGGER.debug("No primary gateway found, using %s", self._host)
+            self.gateways[self._host].primary = True
+
+        _LOGGER.debug("Discovered gateways: %s", self.gateways)
+        return self.gateways
+
+    def _read_order(self) -> list[Gateway]:
+        now = time.monotonic()
+        return sorted(
+            self.gateways.values(),
+            key=lambda gateway: (
+                not gateway.available(now),
+                gateway.in_flight,
+                gateway.latency or 0,
+            ),
+        )
+
+    def _write_order(self) -> list[Gateway]:
+        if not self.gateways:
+            return []
+        primary = self.primary
+        return [primary] + [
+            gateway for gateway in self._read_order() if gateway is not primary
+        ]
+
+    async def _request(
+        self, method: str, url: str, gateways: list[Gateway], *args, **kwargs
+    ):
+        if not gateways:
+            raise PvApiConnectionError(f"No gateways to send {method} {url} to")
+        parts = urlsplit(url)
+        send = getattr(super(), method)
+        error = None
+        for gateway in gateways:
+            gateway.in_flight += 1
+            start = time.monotonic()
+            try:
+                result = await send(
+                    parts._replace(netloc=gateway.ip).geturl(), *args, **kwargs
+                )
+            except PvApiConnectionError as err:
+                _LOGGER.debug("Gateway %s failed, trying next: %s", gateway.ip, err)
+                gateway.record_failure(time.monotonic())
+                error = err
+                continue
+            finally:
+                gateway.in_flight -= 1
+            gateway.record_success(time.monotonic() - start)
+            return result
+        raise error
+
+    async def get(self, url: str, *args, **kwargs) -> dict:
+        """Get a resource from the best available gateway."""
+        return await self._request("get", url, self._read_order(), *args, **kwargs)
+
+    async def iter_json_array(self, url: str, *args, **kwargs) -> AsyncIterator[Any]:
+        """Stream a JSON array from the best available gateway.
+
+        A gateway failing before the first element is retried on the next
+        one, a failure after that is raised.
+        """
+        gateways = self._read_order()
+        if not gateways:
+            raise PvApiConnectionError(f"No gateways to stream {url} from")
+        parts = urlsplit(url)
+        stream = super().iter_json_array
+        error = None
+        for gateway in gateways:
+            gateway.in_flight += 1
+            start = time.monotonic()
+            received = False
+            try:
+                async for element in stream(
+                    parts._replace(netloc=gateway.ip).geturl(), *args, **kwargs
+                ):
+                    received = True
+                    yield element
+            except PvApiConnectionError as err:
+                gateway.record_failure(time.monotonic())
+                if received:
+                    raise
+                _LOGGER.debug("Gateway %s failed, trying next: %s", gateway.ip, err)
+                error = err
+                continue
+            finally:
+                gateway.in_flight -= 1
+            gateway.record_success(time.monotonic() - start)
+            return
+        raise error
+
+    async def post(self, url: str, *args, **kwargs):
+        """Post a resource update to the primary gateway."""
+        return await self._request("post", url, self._write_order(), *args, **kwargs)
+
+    async def put(self, url: str, *args, **kwargs):
+        """Do a put request on the primary gateway."""
+        return await self._request("put", url, self._write_order(), *args, **kwargs)
+
+    async def delete(self, url: str, *args, **kwargs):
+        """Delete a resource on the primary gateway."""
+        return await self._request("delete", url, self._write_order(), *args, **kwargs)
@@ -1,9 +1,18 @@
 """Class containing the async http methods."""
 
 import asyncio
+from collections.abc import AsyncIterator
 import logging
+import sys
+from typing import Any
 
-import aiohttp
+from aiopvapi.helpers.json_stream import JsonArrayParser
+from aiopvapi.helpers.tracing import (
+    ATTR_HTTP_METHOD,
+    ATTR_HTTP_STATUS,
+    ATTR_URL,
+    span,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,6 +37,16 @@ class PvApiEmptyData(PvApiError):
     """PowerView Hub returned empty data."""
 
 
+def _client_errors() -> tuple[type[Exception], ...]:
+    """Return the aiohttp errors to translate into PvApiConnectionError.
+
+    aiohttp is slow to import and only loaded once a ClientSession is used,
+    before that no request can raise its errors.
+    """
+    aiohttp = sys.modules.get("aiohttp")
+    return (aiohttp.ClientError,) if aiohttp is not None else ()
+
+
 class AioRequest:
     """Request class managing Powerview Hub connection."""
 
@@ -39,7 +58,11 @@ class AioRequest:
         timeout: int = 15,
         api_version: int | None = None,
     ) -> None:
-        """Initialize request class."""
+        """Initialize request class.
+
+        :param websession: aiohttp ClientSession, or any transport of
+                    aiopvapi.helpers.transport.
+        """
         self.hub_ip = hub_ip
         self._timeout = timeout
         if loop:
@@ -49,8 +72,12 @@ class AioRequest:
         if websession:
             self.websession = websession
         else:
+            import aiohttp  # pylint: disable=import-outside-toplevel
+
             self.websession = aiohttp.ClientSession(loop=self.loop)
         self.api_version: int | None = api_version
+        # known once the hub has been queried, used to label traces
+        self.hub_serial: str | None = None
         self._last_request_status: int = 0
         _LOGGER.debug("Powerview api version: %s", self.api_version)
 
@@ -61,8 +88,11 @@ class AioRequest:
             return "home"
         return "api"
 
-    async def check_response(self, response, valid_response_codes):
-        """Check the response for correctness."""
+    async def check_response(self, response, valid_response_codes, raw=False):
+        """Check the response for correctness.
+
+        :param raw: Return the body as bytes instead of decoding its json.
+        """
         _val = None
         if response.status == 403 and self._last_request_status == 423:
             # if last status was hub undergoing maint then it is common
@@ -74,7 +104,11 @@ class AioRequest:
             # 423 hub under maintenance, returns data, but not shade
             _val = True
         elif response.status in valid_response_codes:
-            _val = await response.json()
+            if raw:
+                _val = await response.read()
+            else:
+                with span("AioRequest.json_decode", self):
+                    _val = await response.json()
 
         # store the status for next check
         self._last_request_status = response.status
@@ -95,6 +129,7 @@ class AioRequest:
         url: str,
         params: str | None = None,
         suppress_timeout: bool = False,
+        raw: bool = False,
         **kwargs,
     ) -> dict:
         """Get a resource.
@@ -103,32 +138,95 @@ class AioRequest:
         :param params: Dictionary or bytes to be sent in the query string of the new request
                     (optional).
         :param suppress_timeout: Stermine if timeouts will return an error
+        :param raw: Return the body as bytes instead of decoding its json.
         :param kwargs: Keyword arguments to be passed to aiohttp ClientSession get method.
                     For example, timeout can be passed as kwargs.
         :return: A dictionary representing the JSON response.
         """
+        with span(
+            "AioRequest.get",
+            self,
+            {ATTR_HTTP_METHOD: "GET", ATTR_URL: url},
+        ) as trace:
+            response = None
+            try:
+                timeout = kwargs.pop("timeout", None) or self._timeout
+                _LOGGER.debug(
+                    "Sending GET request to: %s params: %s timeout: %s kwargs: %s",
+                    url,
+                    params,
+                    timeout,
+                    kwargs,
+                )
+                response = await self.websession.get(
+                    url, params=params, timeout=timeout, **kwargs
+                )
+                if trace.is_recording():
+                    trace.set_attribute(ATTR_HTTP_STATUS, response.status)
+                return await self.check_response(response, [200, 204], raw)
+            except TimeoutError as error:
+                if suppress_timeout:
+                    _LOGGER.debug("Timeout occurred but was suppressed: %s", error)
+                    return None
+                raise PvApiConnectionError(
+                    "Timeout in communicating with PowerView Hub"
+                ) from error
+            except _client_errors() as error:
+                raise PvApiConnectionError(
+                    "Failed to communicate with PowerView Hub"
+                ) from error
+            finally:
+                if response is not None:
+                    await response.release()
+
+    async def iter_json_array(
+        self,
+        url: str,
+        params: str | None = None,
+        chunk_size: int = 16384,
+        **kwargs,
+    ) -> AsyncIterator[Any]:
+        """Get a JSON array and yield its elements as they arrive.
+
+        The body is parsed while it is received, every element is yielded
+        once complete. Transports without a body stream yield the elements
+        of the decoded body. A body that is not an array is yielded whole.
+
+        :param url: The URL to fetch.
+        :param params: Dictionary or bytes to be sent in the query string.
+        :param chunk_size: The most bytes read from the stream at once.
+        :param kwargs: Keyword arguments to be passed to aiohttp ClientSession get method.
+        :raises PvApiError when an error occurs.
+        """
         response = None
         try:
             timeout = kwargs.pop("timeout", None) or self._timeout
-            _LOGGER.debug(
-                "Sending GET request to: %s params: %s timeout: %s kwargs: %s",
-                url,
-                params,
-                timeout,
-                kwargs,
-            )
+            _LOGGER.debug("Streaming GET request to: %s params: %s", url, params)
             response = await self.websession.get(
                 url, params=params, timeout=timeout, **kwargs
             )
-            return await self.check_response(response, [200, 204])
+            content = getattr(response, "content", None)
+            if response.status != 200 or content is None:
+                data = await self.check_response(response, [200])
+                for element in data if isinstance(data, list) else [data]:
+                    yield element
+                return
+            self._last_request_status = response.status
+            parser = JsonArrayParser()
+            async for chunk in content.iter_chunked(chunk_size):
+                for element in parser.feed(chunk):
+                    yield element
+            for element in parser.close():
+                yield element
         except TimeoutError as error:
-            if suppress_timeout:
-                _LOGGER.debug("Timeout occurred but was suppressed: %s", error)
-                return None
             raise PvApiConnectionError(
                 "Timeout in communicating with PowerView Hub"
             ) from error
-        except aiohttp.ClientError as error:
+        except ValueError as error:
+            raise PvApiResponseStatusError(
+                f"Invalid JSON received from PowerView Hub: {error}"
+            ) from error
+        except _client_errors() as error:
             raise PvApiConnectionError(
                 "Failed to communicate with PowerView Hub"
             ) from error
@@ -152,34 +250,41 @@ class AioRequest:
                     For example, timeout can be passed as kwargs.
         :return: A dictionary representing the JSON response.
         """
-        response = None
-        try:
-            timeout = kwargs.pop("timeout", None) or self._timeout
-            _LOGGER.debug(
-                "Sending POST request to: %s data: %s timeout: %s kwargs: %s",
-                url,
-                data,
-                timeout,
-                kwargs,
-            )
-            response = await self.websession.post(
-                url, json=data, timeout=timeout, **kwargs
-            )
-            return await self.check_response(response, [200, 201])
-        except TimeoutError as error:
-            if suppress_timeout:
-                _LOGGER.debug("Timeout occurred but was suppressed: %s", error)
-                return None
-            raise PvApiConnectionError(
-                "Timeout in communicating with PowerView Hub"
-            ) from error
-        except aiohttp.ClientError as error:
-            raise PvApiConnectionError(
-                "Failed to communicate with PowerView Hub"
-            ) from error
-        finally:
-            if response is not None:
-                await response.release()
+        with span(
+            "AioRequest.post",
+            self,
+            {ATTR_HTTP_METHOD: "POST", ATTR_URL: url},
+        ) as trace:
+            response = None
+            try:
+                timeout = kwargs.pop("timeout", None) or self._timeout
+                _LOGGER.debug(
+                    "Sending POST request to: %s data: %s timeout: %s kwargs: %s",
+                    url,
+                    data,
+                    timeout,
+                    kwargs,
+                )
+                response = await self.websession.post(
+                    url, json=data, timeout=timeout, **kwargs
+                )
+                if trace.is_recording():
+                    trace.set_attribute(ATTR_HTTP_STATUS, response.status)
+                return await self.check_response(response, [200, 201])
+            except TimeoutError as error:
+                if suppress_timeout:
+                    _LOGGER.debug("Timeout occurred but was suppressed: %s", error)
+                    return None
+                raise PvApiConnectionError(
+                    "Timeout in communicating with PowerView Hub"
+                ) from error
+            except _client_errors() as error:
+                raise PvApiConnectionError(
+                    "Failed to communicate with PowerView Hub"
+                ) from error
+            finally:
+                if response is not None:
+                    await response.release()
 
     async def put(
         self,
@@ -200,35 +305,42 @@ class AioRequest:
                     For example, timeout can be passed as kwargs.
         :return: A dictionary representing the JSON response.
         """
-        response = None
-        try:
-            timeout = kwargs.pop("timeout", None) or self._timeout
-            _LOGGER.debug(
-                "Sending PUT request to: %s params: %s data: %s timeout: %s kwargs: %s",
-                url,
-                params,
-                data,
-                timeout,
-                kwargs,
-            )
-            response = await self.websession.put(
-                url, json=data, params=params, timeout=timeout, **kwargs
-            )
-            return await self.check_response(response, [200, 204])
-        except TimeoutError as error:
-            if suppress_timeout:
-                _LOGGER.debug("Timeout occurred but was suppressed: %s", error)
-                return None
-            raise PvApiConnectionError(
-                "Timeout in communicating with PowerView Hub"
-            ) from error
-        except aiohttp.ClientError as error:
-            raise PvApiConnectionError(
-                "Failed to communicate with PowerView Hub"
-            ) from error
-        finally:
-            if response is not None:
-                await response.release()
+        with span(
+            "AioRequest.put",
+            self,
+            {ATTR_HTTP_METHOD: "PUT", ATTR_URL: url},
+        ) as trace:
+            response = None
+            try:
+                timeout = kwargs.pop("timeout", None) or self._timeout
+                _LOGGER.debug(
+                    "Sending PUT request to: %s params: %s data: %s timeout: %s kwargs: %s",
+                    url,
+                    params,
+                    data,
+                    timeout,
+                    kwargs,
+                )
+                response = await self.websession.put(
+                    url, json=data, params=params, timeout=timeout, **kwargs
+                )
+                if trace.is_recording():
+                    trace.set_attribute(ATTR_HTTP_STATUS, response.status)
+                return await self.check_response(response, [200, 204])
+            except TimeoutError as error:
+                if suppress_timeout:
+                    _LOGGER.debug("Timeout occurred but was suppressed: %s", error)
+                    return None
+                raise PvApiConnectionError(
+                    "Timeout in communicating with PowerView Hub"
+                ) from error
+            except _client_errors() as error:
+                raise PvApiConnectionError(
+                    "Failed to communicate with PowerView Hub"
+                ) from error
+            finally:
+                if response is not None:
+                    await response.release()
 
     async def delete(
         self,
@@ -245,31 +357,38 @@ class AioRequest:
 
         :raises PvApiError when something is wrong.
         """
-        response = None
-        try:
-            timeout = kwargs.pop("timeout", None) or self._timeout
-            _LOGGER.debug(
-                "Sending DELETE request to: %s params: %s timeout: %s kwargs: %s",
-                url,
-                params,
-                timeout,
-                kwargs,
-            )
-            response = await self.websession.delete(
-                url, params=params, timeout=timeout, **kwargs
-            )
-            return await self.check_response(response, [200, 204])
-        except TimeoutError as error:
-            if suppress_timeout:
-                _LOGGER.debug("Timeout occurred but was suppressed: %s", error)
-                return None
-            raise PvApiConnectionError(
-                "Timeout in communicating with PowerView Hub"
-            ) from error
-        except aiohttp.ClientError as error:
-            raise PvApiConnectionError(
-                "Failed to communicate with PowerView Hub"
-            ) from error
-        finally:
-            if response is not None:
-                await response.release()
+        with span(
+            "AioRequest.delete",
+            self,
+            {ATTR_HTTP_METHOD: "DELETE", ATTR_URL: url},
+        ) as trace:
+            response = None
+            try:
+                timeout = kwargs.pop("timeout", None) or self._timeout
+                _LOGGER.debug(
+                    "Sending DELETE request to: %s params: %s timeout: %s kwargs: %s",
+                    url,
+                    params,
+                    timeout,
+                    kwargs,
+                )
+                response = await self.websession.delete(
+                    url, params=params, timeout=timeout, **kwargs
+                )
+                if trace.is_recording():
+                    trace.set_attribute(ATTR_HTTP_STATUS, response.status)
+                return await self.check_response(response, [200, 204])
+            except TimeoutError as error:
+                if suppress_timeout:
+                    _LOGGER.debug("Timeout occurred but was suppressed: %s", error)
+                    return None
+                raise PvApiConnectionError(
+                    "Timeout in communicating with PowerView Hub"
+                ) from error
+            except _client_errors() as error:
+                raise PvApiConnectionError(
+                    "Failed to communicate with PowerView Hub"
+                ) from error
+            finally:
+                if response is not None:
+                    await response.release()
@@ -1,6 +1,13 @@
 """Class containing the api base."""
 
+from collections.abc import AsyncIterator, Callable, Iterable
+import copy
+import functools
+import hashlib
+import json
 import logging
+import time
+from typing import Any
 
 from aiopvapi.helpers.aiorequest import AioRequest
 from aiopvapi.helpers.constants import (
@@ -9,10 +16,48 @@ from aiopvapi.helpers.constants import (
     ATTR_NAME_UNICODE,
     ATTR_PTNAME,
 )
-from aiopvapi.helpers.tools import base64_to_unicode, get_base_path, join_path
+from aiopvapi.helpers.tools import (
+    base64_to_name,
+    get_base_path,
+    intern_name,
+    join_path,
+    next_sequence,
+)
+from aiopvapi.helpers.tracing import span
+from aiopvapi.resources.model import LazyResources, PowerviewData
+from aiopvapi.resources.raw_store import RawStore, raw_store
+from aiopvapi.resources.records import Record, load_payload
 
 _LOGGER = logging.getLogger(__name__)
 
+# key of the typed record of a resource in its derived attributes, a record
+# applies to the version of the raw data it was decoded from
+_RECORD_KEY = "_record"
+
+
+def derived(func: Callable) -> property:
+    """Property of an ApiResource computed once per version of its raw data.
+
+    The value is cached until the raw data is assigned again, changes made
+    to the raw dict in place are not seen.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def getter(self):
+        try:
+            return self._derived[name]
+        except KeyError:
+            value = self._derived[name] = func(self)
+            return value
+
+    return property(getter)
+
+
+async def _aiter(iterable: Iterable) -> AsyncIterator:
+    for item in iterable:
+        yield item
+
 
 class ApiBase:
     """Api base class."""
@@ -68,14 +113,68 @@ class ApiBase:
 class ApiResource(ApiBase):
     """Represent a single PowerView resource such as scene, shade or room."""
 
+    # the raw store of the hub holding the raw data, see _bind()
+    _store: RawStore | None = None
+
     def __init__(self, request, api_endpoint, raw_data=None) -> None:
-        """Initialize the API Resource."""
+        """Initialize the API Resource.
+
+        :param raw_data: The raw dict of the resource or its typed Record.
+        """
         super().__init__(request, api_endpoint)
+        record = None
+        if isinstance(raw_data, Record):
+            record = raw_data
+            raw_data = record.raw
         self._id = "unknown" if raw_data is None else raw_data.get(ATTR_ID)
         self._raw_data = raw_data
+        if record is not None:
+            self._derived[_RECORD_KEY] = record
         self._resource_path = join_path(self.base_path, str(self._id))
         _LOGGER.debug("Initializing resource path: %s", self._resource_path)
 
+    @property
+    def _raw_data(self):
+        return self._raw
+
+    @_raw_data.setter
+    def _raw_data(self, data) -> None:
+        if self._store is not None:
+            if self._id in self._store:
+                # updated in place, for every view of the resource
+                self._store.update(self._id, data)
+                return
+            # removed from the hub, the instance keeps its own data
+            self._store = None
+        # every assignment starts a new version of the derived attributes
+        self._raw = data
+        self._derived: dict[str, Any] = {}
+
+    def _bind(self, store: RawStore) -> None:
+        """Use the raw data kept in the raw store of the hub.
+
+        The resource shares the stored dict (and the derived attributes)
+        with the other instances of the resource, assigning its raw data
+        updates the stored dict in place.
+        """
+        self._raw = store.get(self._id)
+        self._derived = store.derived(self._id)
+        self._store = store
+
+    def _carry_over(
+        self,
+        previous: "ApiResource | None",
+        sequence: int,
+        when: float | None = None,
+    ) -> None:
+        """Take over state of the instance replaced by this one.
+
+        State of the previous instance that is newer than the request of
+        this one (``sequence``, see next_sequence()) is kept. Resources
+        created after their data was fetched get the time of the request
+        (``when``, time.monotonic()).
+        """
+
     async def delete(self):
         """Delete a resource."""
         return await self.request.delete(self._resource_path)
@@ -86,20 +185,28 @@ class ApiResource(ApiBase):
         return self._id
 
     @property
+    def record(self) -> Record | None:
+        """Typed record the resource was created from.
+
+        None when created from a raw dict or once the raw data changed.
+        """
+        return self._derived.get(_RECORD_KEY)
+
+    @derived
     def name(self):
         """Name of the resource.
 
         If conversion to unicode somehow
         didn't go well value is returned in base64 encoding.
         """
-        return (
-            self._raw_data.get(ATTR_PTNAME)
-            or self._raw_data.get(ATTR_NAME_UNICODE)
-            or self._parse(ATTR_NAME, converter=base64_to_unicode, data=self._raw_data)
-            or self._raw_data.get(ATTR_NAME)
-            or ""
-        )
-        # resource[ATTR_NAME_UNICODE] = base64_to_unicode(_name)
+        if (record := self.record) is not None:
+            return record.name
+        raw = self._raw_data
+        if name := raw.get(ATTR_PTNAME) or raw.get(ATTR_NAME_UNICODE):
+            return intern_name(name)
+        if name := raw.get(ATTR_NAME):
+            return base64_to_name(name) or name
+        return ""
 
     @property
     def url(self) -> str:
@@ -113,17 +220,31 @@ class ApiResource(ApiBase):
 
     @raw_data.setter
     def raw_data(self, data):
-        self._raw_data = dict(data)
+        # a stored resource copies data into the stored dict
+        self._raw_data = data if self._store is not None else dict(data)
 
 
 class ApiEntryPoint(ApiBase):
     """API entrypoint."""
 
+    record_type: type[Record] = Record
+
     def __init__(self, request, api_endpoint, use_initial=True) -> None:
         """Initialize the API Entry Point."""
         super().__init__(request, api_endpoint)
+        # raw data of the resources of the hub, shared by all entry points
+        self.raw_store = raw_store(request, api_endpoint)
         if use_initial:
             api_endpoint = join_path(self.api_path, api_endpoint)
+        # state of poll()
+        self._poll_digest: bytes | None = None
+        self._poll_data: PowerviewData | None = None
+        self._poll_raw: dict[int, dict] = {}
+        # next_sequence() of the last poll
+        self._poll_sequence = 0
+        # resources created from the polled entries, by id: (entry, resource)
+        self._poll_created: dict[int, tuple[dict, ApiResource]] = {}
+        self.changed_ids: set[int] = set()
 
     def _sanitize_resources(self, resources: dict):
         """Loop over incoming data looking for base64 encoded data.
@@ -138,11 +259,63 @@ class ApiEntryPoint(ApiBase):
             _LOGGER.warning("No shade data available")
             return
 
+    def _store_raw(self, raw: dict, sequence: int | None, fetched: float) -> dict:
+        """Store the raw data of a resource and return the stored dict.
+
+        :param sequence: next_sequence() when raw was requested.
+        :param fetched: time.monotonic() when raw was requested.
+        """
+        return self.raw_store.put(raw)
+
+    def _stored_data(
+        self, entries: list, sequence: int | None = None, complete: bool = True
+    ) -> PowerviewData:
+        """Store raw entries and return them as PowerviewData.
+
+        The resources are created on first access, sharing the stored raw
+        data.
+
+        :param entries: Raw dicts or typed records.
+        :param sequence: next_sequence() when the entries were requested.
+        :param complete: The entries are all resources of the hub, others
+                    are removed from the store.
+        """
+        fetched = time.monotonic()
+        store = self.raw_store
+        factory = self._resource_factory
+        raw = []
+        # the resources are created from the stored dicts, the entries of
+        # known resources are not kept alive
+        stored_entries = {}
+        for entry in entries:
+            if isinstance(entry, Record):
+                # the record applies to the stored dict until it is updated
+                entry.raw = stored = self._store_raw(entry.raw, sequence, fetched)
+                store.derived(stored[ATTR_ID])[_RECORD_KEY] = entry
+            else:
+                entry = stored = self._store_raw(entry, sequence, fetched)
+            raw.append(stored)
+            stored_entries[stored[ATTR_ID]] = entry
+        if complete:
+            store.retain(record[ATTR_ID] for record in raw)
+
+        def create(entry):
+            resource = factory(entry)
+            resource._bind(store)
+            if sequence is not None:
+                resource._carry_over(None, sequence, fetched)
+            return resource
+
+        processed = LazyResources(stored_entries, create)
+        return PowerviewData(
+            raw=raw, processed=processed, sequence=sequence, store=store
+        )
+
     @classmethod
     def _sanitize_resource(cls, resource):
         _name = resource.get(ATTR_NAME)
         if _name:
-            resource[ATTR_NAME_UNICODE] = base64_to_unicode(_name)
+            resource[ATTR_NAME_UNICODE] = base64_to_name(_name)
 
     async def get_resources(self, **kwargs) -> dict:
         """Get a list of resources.
@@ -152,9 +325,136 @@ class ApiEntryPoint(ApiBase):
         # resources = await self.request.get(self._base_path, **kwargs)
         # _LOGGER.warning("%s kwargs %s", self.base_path, kwargs)
         resources = await self.request.get(self.base_path, **kwargs)
-        self._sanitize_resources(resources)
+        with span("sanitize", self.request):
+            self._sanitize_resources(resources)
         return resources
 
+    def _changed_since(self, resource_id, sequence: int) -> bool:
+        """Return if the stored state of a resource changed after sequence.
+
+        Ie by a move, according to the state stamps of the resource (see
+        next_sequence()).
+        """
+        stamps = self.raw_store.stamps(resource_id, create=False)
+        return bool(stamps) and any(
+            stamp.sequence > sequence for stamp in stamps.values()
+        )
+
+    async def poll(self, **kwargs) -> PowerviewData:
+        """Get the resources, skipping all work for what did not change.
+
+        Meant to be called repeatedly on the same entry point. A body equal
+        to the one of the previous poll (by content hash) returns the
+        previous PowerviewData without decoding it. Otherwise every
+        resource whose raw data equals its previous version is reused, only
+        new or changed resources are sanitized and (on first access)
+        created. Their ids are left in changed_ids.
+
+        The state of a reused resource changed locally since the previous
+        poll (ie the requested position of a move) is stored again from
+        the poll, the hub state wins over what it was not confirmed by.
+
+        :raises PvApiError when an error occurs.
+        """
+        sequence = next_sequence()
+        body = await self.request.get(self.base_path, raw=True, **kwargs)
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        fetched = time.monotonic()
+        store = self.raw_store
+        since, self._poll_sequence = self._poll_sequence, sequence
+
+        def store_polled(raw: dict) -> None:
+            # the polled dict is kept unchanged to compare the next poll
+            # against, the store gets its own copy
+            resource_raw = copy.deepcopy(raw)
+            self._sanitize_resource(resource_raw)
+            self._store_raw(resource_raw, sequence, fetched)
+
+        if digest == self._poll_digest and self._poll_data is not None:
+            changed = set()
+            for resource_id, raw in self._poll_raw.items():
+                if self._changed_since(resource_id, since):
+                    store_polled(raw)
+                    changed.add(resource_id)
+            self.changed_ids = changed
+            return self._poll_data
+
+        created = self._poll_created
+        polled: dict[int, dict] = {}
+        changed = set()
+        with span("poll", self.request):
+            for raw in self._loop_raw(json.loads(body)):
+                resource_id = raw[ATTR_ID]
+                previous = self._poll_raw.get(resource_id)
+                if previous == raw and resource_id in store:
+                    polled[resource_id] = previous
+                    if self._changed_since(resource_id, since):
+                        store_polled(previous)
+                        changed.add(resource_id)
+                    continue
+                polled[resource_id] = raw
+                store_polled(raw)
+                changed.add(resource_id)
+                created.pop(resource_id, None)
+            for resource_id in created.keys() - polled.keys():
+                del created[resource_id]
+            store.retain(polled)
+
+        def create(entry):
+            # an entry unchanged since a previous poll keeps its resource
+            resource_id = entry[ATTR_ID]
+            if (cached := created.get(resource_id)) and cached[0] is entry:
+                return cached[1]
+            if self._poll_raw.get(resource_id) is not entry or resource_id not in store:
+                # changed by a later poll or removed from the hub since, the
+                # resource gets the data of this poll
+                raw = copy.deepcopy(entry)
+                self._sanitize_resource(raw)
+                return self._resource_factory(raw)
+            resource = self._resource_factory(store.get(resource_id))
+            resource._bind(store)
+            resource._carry_over(None, sequence, fetched)
+            created[resource_id] = (entry, resource)
+            return resource
+
+        self._poll_digest = digest
+        self._poll_raw = polled
+        self._poll_data = PowerviewData(
+            raw=[store.get(resource_id) for resource_id in polled],
+            processed=LazyResources(polled, create),
+            sequence=sequence,
+            store=store,
+        )
+        self.changed_ids = changed
+        return self._poll_data
+
+    def decode_records(self, payload) -> list[Record]:
+        """Decode a response body straight into typed records.
+
+        Unlike get_resources the raw dicts are left untouched, names are
+        decoded into the records.
+        """
+        decode = self.record_type.decode
+        return [decode(raw) for raw in self._loop_raw(load_payload(payload))]
+
+    async def get_records(self, **kwargs) -> list[Record]:
+        """Get the resources as typed records.
+
+        :raises PvApiError when an error occurs.
+        """
+        resources = await self.request.get(self.base_path, **kwargs)
+        with span("decode_records", self.request):
+            return self.decode_records(resources)
+
+    async def get_typed_data(self, **kwargs) -> PowerviewData:
+        """Get the resources as PowerviewData created from typed records.
+
+        :raises PvApiError when an error occurs.
+        """
+        sequence = next_sequence()
+        records = await self.get_records(**kwargs)
+        return self._stored_data(records, sequence, not kwargs.get("params"))
+
     async def get_resource(self, resource_id: int) -> dict:
         """Get a single resource.
 
@@ -165,14 +465,43 @@ class ApiEntryPoint(ApiBase):
         self._sanitize_resource(self._get_to_actual_data(resource))
         return resource
 
-    async def get_instances(self, **kwargs) -> list[ApiResource]:
+    async def get_instances(self, typed: bool = False, **kwargs) -> list[ApiResource]:
         """Return a list of resource instances.
 
+        :param typed: Create the instances from typed records.
         :raises PvApiError when a hub problem occurs.
         """
+        if typed:
+            records = await self.get_records(**kwargs)
+            return [self._resource_factory(record) for record in records]
         raw_resources = await self.get_resources(**kwargs)
         return [self._resource_factory(_raw) for _raw in self._loop_raw(raw_resources)]
 
+    async def iter_instances(
+        self, typed: bool = False, **kwargs
+    ) -> AsyncIterator[ApiResource]:
+        """Yield resource instances while the response is being received.
+
+        Gen 3 hubs return a plain array which is parsed incrementally, every
+        resource is yielded as soon as its element is complete. Gen 2 hubs
+        wrap the array in an object, their body is decoded whole first.
+
+        :param typed: Create the instances from typed records.
+        :raises PvApiError when a hub problem occurs.
+        """
+        if self.api_version >= 3:
+            raws = self.request.iter_json_array(self.base_path, **kwargs)
+        else:
+            raws = _aiter(
+                self._loop_raw(await self.request.get(self.base_path, **kwargs))
+            )
+        async for raw in raws:
+            if typed:
+                yield self._resource_factory(self.record_type.decode(raw))
+            else:
+                self._sanitize_resource(raw)
+                yield self._resource_factory(raw)
+
     async def get_instance(self, resource_id) -> ApiResource:
         """Get a single instance of a pv resource.
 
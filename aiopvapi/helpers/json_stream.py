@@ -0,0 +1,154 @@
+"""Incremental parsing of JSON arrays received in chunks."""
+
+import codecs
+import json
+import re
+from typing import Any
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+# characters changing the nesting of an element
+_STRUCTURE = re.compile(r'[\[\]{}"\\]')
+
+
+class JsonArrayParser:
+    """Parse the elements of a top level JSON array as its chunks arrive.
+
+    Every element is returned as soon as it is complete and its text is
+    dropped, only the element being received is buffered. The text of an
+    incomplete object, array or string is only followed to its end and
+    decoded once, large elements cost linear time. A document that is not
+    an array is returned whole by close().
+    """
+
+    def __init__(self) -> None:
+        """Initialize the parser."""
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        # None until the first character, then True for an array
+        self._array: bool | None = None
+        self._done = False
+        # text received for an incomplete element since it was found
+        # incomplete, None when there is no such element
+        self._pending: list[str] | None = None
+        # where the incomplete element is at the end of its text
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def buffered(self) -> int:
+        """Return the number of characters waiting for more data."""
+        pending = sum(map(len, self._pending)) if self._pending else 0
+        return len(self._buffer) - self._pos + pending
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        """Add a chunk and return the elements it completed."""
+        text = self._text.decode(chunk)
+        if self._pending is not None:
+            self._pending.append(text)
+            if not self._follow(text):
+                return []
+            text = "".join(self._pending)
+            self._pending = None
+        self._buffer = self._buffer[self._pos :] + text
+        self._pos = 0
+        if self._array is None:
+            self._skip_whitespace()
+            if self._pos == len(self._buffer):
+                return []
+            self._array = self._buffer[self._pos] == "["
+            if self._array:
+                self._pos += 1
+        if not self._array or self._done:
+            return []
+        return self._elements()
+
+    def close(self) -> list[Any]:
+        """Signal the end of the data and return what was left.
+
+        :raises ValueError when the data is not complete JSON.
+        """
+        # raises on a truncated utf-8 character
+        self._text.decode(b"", final=True)
+        elements = self.feed(b"")
+        if self._array:
+            if not self._done:
+                raise ValueError("JSON array is not complete")
+            return elements
+        rest = self._buffer[self._pos :]
+        return [json.loads(rest)] if rest.strip() else []
+
+    def _skip_whitespace(self) -> None:
+        buffer, pos = self._buffer, self._pos
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+
+    def _elements(self) -> list[Any]:
+        elements = []
+        buffer = self._buffer
+        while True:
+            self._skip_whitespace()
+            if self._pos == len(buffer):
+                break
+            char = buffer[self._pos]
+            if char == "]":
+                self._pos += 1
+                self._done = True
+                break
+            if char == ",":
+                self._pos += 1
+                continue
+            try:
+                element, end = self._decoder.raw_decode(buffer, self._pos)
+            except json.JSONDecodeError:
+                # element not complete yet, or invalid once it is. Numbers
+                # and literals are short enough to be decoded again.
+                if char in '[{"':
+                    self._depth, self._in_string, self._escaped = 0, False, False
+                    if not self._follow(buffer[self._pos :]):
+                        self._pending = []
+                break
+            if type(element) in (int, float) and (
+                end == len(buffer) or buffer[end] not in _DELIMITERS
+            ):
+                # a number could continue in the next chunk (ie "1." or "1e")
+                break
+            elements.append(element)
+            self._pos = end
+        return elements
+
+    def _follow(self, text: str) -> bool:
+        """Follow the incomplete element through its next text.
+
+        Return if the element ends in text.
+        """
+        depth, in_string = self._depth, self._in_string
+        pos = 0
+        if self._escaped and text:
+            # the character escaped at the end of the previous text
+            pos, self._escaped = 1, False
+        while (match := _STRUCTURE.search(text, pos)) is not None:
+            char, pos = match.group(), match.end()
+            if in_string:
+                if char == "\\":
+                    if pos == len(text):
+                        self._escaped = True
+                    pos += 1
+                elif char == '"':
+                    in_string = False
+                    if not depth:
+                        return True
+            elif char == '"':
+                in_string = True
+            elif char in "[{":
+                depth += 1
+            elif char in "]}":
+                depth -= 1
+                if not depth:
+                    return True
+        self._depth, self._in_string = depth, in_string
+        return False
@@ -1,6 +1,7 @@
 """Tools for converting data from powerview hub."""
 
 import base64
+import itertools
 import logging
 
 from aiopvapi.helpers.constants import ATTR_ID
@@ -31,6 +32,53 @@ def base64_to_unicode(string):
         return string
 
 
+# names shared by all resources of the process, by their text and by the
+# base64 value they were decoded from
+_NAMES: dict[str, str] = {}
+_DECODED_NAMES: dict[str, str] = {}
+NAMES_MAX = 4096
+
+
+def intern_name(name: str) -> str:
+    """Return the shared copy of a name.
+
+    Names repeat on every poll, every resource keeps the same string object
+    instead of a copy per response.
+    """
+    try:
+        return _NAMES[name]
+    except KeyError:
+        pass
+    if len(_NAMES) >= NAMES_MAX:
+        # names of hubs long gone, start over
+        _NAMES.clear()
+        _DECODED_NAMES.clear()
+    _NAMES[name] = name
+    return name
+
+
+def base64_to_name(string: str) -> str:
+    """Convert a base64 name to unicode, decoding each name once."""
+    try:
+        return _DECODED_NAMES[string]
+    except KeyError:
+        pass
+    name = _DECODED_NAMES[string] = intern_name(base64_to_unicode(string))
+    return name
+
+
+_SEQUENCE = itertools.count(1)
+
+
+def next_sequence() -> int:
+    """Return a number higher than all returned before.
+
+    Taken when a request is issued, it orders the responses by the time
+    their requests were sent rather than the time they arrive.
+    """
+    return next(_SEQUENCE)
+
+
 def get_base_path(ip_address, url):
     """Convert url and ip to base path."""
     # Remove scheme if present
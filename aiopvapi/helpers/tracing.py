@@ -0,0 +1,118 @@
+"""Optional tracing of library operations.
+
+Tracing is disabled by default and costs next to nothing. Enable it with
+an OpenTelemetry tracer (``pip install opentelemetry-api``)::
+
+    from aiopvapi.helpers import tracing
+
+    tracing.enable_opentelemetry()
+
+or with any object offering OpenTelemetry's
+``start_as_current_span(name, attributes=...)``::
+
+    tracing.set_tracer(my_tracer)
+
+Spans are opened for high level operations (firmware query, get_shades,
+moves, scene activation, battery refreshes), for every request to the hub
+and for CPU heavy phases (json decoding, sanitizing, the shade factory and
+position conversions).
+"""
+
+from typing import Any
+
+ATTR_API_VERSION = "powerview.api_version"
+ATTR_HUB_ADDRESS = "server.address"
+ATTR_HUB_SERIAL = "powerview.hub.serial"
+ATTR_SHADE_ID = "powerview.shade.id"
+ATTR_SCENE_ID = "powerview.scene.id"
+ATTR_AUTOMATION_ID = "powerview.automation.id"
+ATTR_COUNT = "powerview.count"
+ATTR_ATTEMPT = "powerview.attempt"
+ATTR_HTTP_METHOD = "http.request.method"
+ATTR_HTTP_STATUS = "http.response.status_code"
+ATTR_URL = "url.full"
+
+
+class _NoopSpan:
+    """Span doing nothing, used while tracing is disabled."""
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def is_recording(self) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: dict[str, Any]) -> None:
+        pass
+
+    def add_event(self, name: str, attributes: dict[str, Any] | None = None) -> None:
+        pass
+
+    def record_exception(self, exception: BaseException, **kwargs) -> None:
+        pass
+
+
+class NoopTracer:
+    """Tracer doing nothing, the default."""
+
+    def start_as_current_span(self, name: str, **kwargs) -> _NoopSpan:
+        """Return a span doing nothing."""
+        return NOOP_SPAN
+
+
+NOOP_SPAN = _NoopSpan()
+NOOP_TRACER = NoopTracer()
+
+_tracer: Any = NOOP_TRACER
+
+
+def set_tracer(tracer: Any | None) -> None:
+    """Trace with this tracer, None disables tracing."""
+    global _tracer  # noqa: PLW0603
+    _tracer = NOOP_TRACER if tracer is None else tracer
+
+
+def get_tracer() -> Any:
+    """Return the current tracer."""
+    return _tracer
+
+
+def enable_opentelemetry(tracer_provider: Any | None = None) -> None:
+    """Trace with OpenTelemetry.
+
+    :raises ImportError when opentelemetry-api is not installed.
+    """
+    from opentelemetry import trace  # noqa: PLC0415
+
+    set_tracer(trace.get_tracer("aiopvapi", tracer_provider=tracer_provider))
+
+
+def request_attributes(request: Any) -> dict[str, Any]:
+    """Return the attributes describing the hub of a request."""
+    return {
+        ATTR_HUB_ADDRESS: getattr(request, "hub_ip", None),
+        ATTR_API_VERSION: getattr(request, "api_version", None),
+        ATTR_HUB_SERIAL: getattr(request, "hub_serial", None),
+    }
+
+
+def span(name: str, request: Any = None, attributes: dict[str, Any] | None = None):
+    """Return a context manager tracing an operation.
+
+    :param request: AioRequest of the hub, adds the hub attributes.
+    :param attributes: Span attributes, None values are left out.
+    """
+    if _tracer is NOOP_TRACER:
+        return NOOP_SPAN
+    merged = request_attributes(request) if request is not None else {}
+    merged.update(attributes or {})
+    return _tracer.start_as_current_span(
+        name,
+        attributes={key: value for key, value in merged.items() if value is not None},
+    )
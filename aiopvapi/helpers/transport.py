@@ -0,0 +1,274 @@
+"""Transports carrying the requests of AioRequest.
+
+AioRequest talks to its ``websession`` through ``get``, ``post``, ``put``
+and ``delete`` returning a response with ``status``, ``json()`` and
+``release()``. An aiohttp ClientSession is the real transport. The
+transports in this module offer the same interface:
+
+- InMemoryTransport dispatches requests straight to handler callables,
+  without sockets.
+- RecordingTransport wraps another transport and captures all traffic
+  with its timing.
+- ReplayTransport answers from a capture, at original or accelerated
+  speed.
+"""
+
+import asyncio
+from collections import defaultdict, deque
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+import inspect
+import json
+import logging
+import re
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class TransportRequest:
+    """A request passed to a transport."""
+
+    method: str
+    url: str
+    params: dict[str, str] = field(default_factory=dict)
+    json: Any = None
+    match_info: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def path(self) -> str:
+        """Return the path of the url."""
+        return urlsplit(self.url).path
+
+
+class TransportResponse:
+    """Response of a transport, mimicking an aiohttp response."""
+
+    def __init__(self, status: int = 200, data: Any = None) -> None:
+        """Initialize the response."""
+        self.status = status
+        self._data = data
+
+    async def json(self) -> Any:
+        """Return the decoded body."""
+        return self._data
+
+    async def read(self) -> bytes:
+        """Return the body encoded as json."""
+        return b"" if self._data is None else json.dumps(self._data).encode()
+
+    async def release(self) -> None:
+        """Release the response, nothing to do in memory."""
+
+
+def _params(params) -> dict[str, str]:
+    if not params:
+        return {}
+    return {str(key): str(value) for key, value in dict(params).items()}
+
+
+class Transport:
+    """Base class of transports, implements the websession interface."""
+
+    async def request(
+        self, request: TransportRequest, timeout: float | None = None
+    ) -> TransportResponse:
+        """Send a request and return its response."""
+        raise NotImplementedError
+
+    async def _send(self, method, url, params=None, json=None, timeout=None, **_):
+        return await self.request(
+            TransportRequest(method, url, _params(params), json), timeout
+        )
+
+    async def get(self, url: str, **kwargs) -> TransportResponse:
+        """Send a GET request."""
+        return await self._send("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> TransportResponse:
+        """Send a POST request."""
+        return await self._send("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> TransportResponse:
+        """Send a PUT request."""
+        return await self._send("PUT", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> TransportResponse:
+        """Send a DELETE request."""
+        return await self._send("DELETE", url, **kwargs)
+
+    async def close(self) -> None:
+        """Close the transport."""
+
+
+Handler = Callable[[TransportRequest], Any | Awaitable[Any]]
+
+
+class InMemoryTransport(Transport):
+    """Dispatch requests to handler callables.
+
+    Handlers are registered by method and path, the path can contain
+    ``{name}`` placeholders that end up in ``request.match_info``. A
+    handler returns the response data, a (status, data) tuple or a
+    TransportResponse and can be a coroutine function. Unknown routes
+    answer with 404.
+    """
+
+    def __init__(self, routes: dict[tuple[str, str], Handler] | None = None) -> None:
+        """Initialize the transport with (method, path) -> handler routes."""
+        self._routes: list[tuple[str, re.Pattern, Handler]] = []
+        for (method, path), handler in (routes or {}).items():
+            self.add_route(method, path, handler)
+
+    def add_route(self, method: str, path: str, handler: Handler) -> None:
+        """Register a handler for a method ("*" for any) and path."""
+        pattern = re.sub(r"\\{(\w+)\\}", r"(?P<\1>[^/]+)", re.escape(path))
+        self._routes.append((method.upper(), re.compile(pattern + "$"), handler))
+
+    async def request(
+        self, request: TransportRequest, timeout: float | None = None
+    ) -> TransportResponse:
+        """Dispatch the request to the first matching handler."""
+        for method, pattern, handler in self._routes:
+            if method not in ("*", request.method):
+                continue
+            if (match := pattern.match(request.path)) is None:
+                continue
+            request.match_info = match.groupdict()
+            result = handler(request)
+            if inspect.isawaitable(result):
+                result = await asyncio.wait_for(result, timeout)
+            if isinstance(result, TransportResponse):
+                return result
+            if isinstance(result, tuple):
+                return TransportResponse(*result)
+            return TransportResponse(200, result)
+        return TransportResponse(404, None)
+
+
+@dataclass
+class Exchange:
+    """A captured request with its response and timing."""
+
+    offset: float
+    duration: float
+    method: str
+    path: str
+    params: dict[str, str]
+    json: Any
+    status: int
+    response: Any
+
+    @property
+    def key(self) -> tuple:
+        """Return what identifies the request during replay."""
+        return (
+            self.method,
+            self.path,
+            tuple(sorted(self.params.items())),
+            json.dumps(self.json, sort_keys=True),
+        )
+
+
+class RecordingTransport(Transport):
+    """Capture all traffic of another transport (ie a ClientSession)."""
+
+    def __init__(self, session) -> None:
+        """Initialize the transport around a websession."""
+        self.session = session
+        self.exchanges: list[Exchange] = []
+        self._start = time.monotonic()
+
+    async def request(
+        self, request: TransportRequest, timeout: float | None = None
+    ) -> TransportResponse:
+        """Send the request through the wrapped session and capture it."""
+        from aiohttp import ContentTypeError  # pylint: disable=import-outside-toplevel
+
+        kwargs = {"params": request.params or None, "timeout": timeout}
+        if request.method in ("POST", "PUT"):
+            kwargs["json"] = request.json
+        send = getattr(self.session, request.method.lower())
+        started = time.monotonic()
+        response = await send(request.url, **kwargs)
+        try:
+            try:
+                data = await response.json()
+            except (ValueError, ContentTypeError):
+                # no json body (ie 204 or 423), replayed as None
+                data = None
+            status = response.status
+        finally:
+            await response.release()
+        self.exchanges.append(
+            Exchange(
+                offset=started - self._start,
+                duration=time.monotonic() - started,
+                method=request.method,
+                path=request.path,
+                params=request.params,
+                json=request.json,
+                status=status,
+                response=data,
+            )
+        )
+        return TransportResponse(status, data)
+
+    def save(self, path: str) -> None:
+        """Write the capture to a file, one JSON exchange per line."""
+        with open(path, "w", encoding="utf-8") as file:
+            for exchange in self.exchanges:
+                file.write(json.dumps(asdict(exchange)) + "\n")
+
+    async def close(self) -> None:
+        """Close the wrapped session."""
+        await self.session.close()
+
+
+def load_capture(path: str) -> list[Exchange]:
+    """Read a capture written by RecordingTransport.save."""
+    with open(path, encoding="utf-8") as file:
+        return [Exchange(**json.loads(line)) for line in file if line.strip()]
+
+
+class ReplayTransport(Transport):
+    """Answer requests from a capture.
+
+    Identical requests are answered in the order they were captured, once
+    exhausted the last answer is repeated. Every answer takes its captured
+    duration divided by speed, speed 0 answers immediately.
+    """
+
+    def __init__(self, capture: str | list[Exchange], speed: float = 1.0) -> None:
+        """Initialize the transport from a capture file or exchanges."""
+        if isinstance(capture, str):
+            capture = load_capture(capture)
+        self.speed = speed
+        self.unmatched: list[TransportRequest] = []
+        self._answers: dict[tuple, deque[Exchange]] = defaultdict(deque)
+        for exchange in capture:
+            self._answers[exchange.key].append(exchange)
+
+    async def request(
+        self, request: TransportRequest, timeout: float | None = None
+    ) -> TransportResponse:
+        """Answer the request with the next captured response."""
+        key = Exchange(
+            0, 0, request.method, request.path, request.params, request.json, 0, None
+        ).key
+        answers = self._answers.get(key)
+        if not answers:
+            _LOGGER.debug("No captured answer for %s %s", request.method, request.url)
+            self.unmatched.append(request)
+            return TransportResponse(404, None)
+        exchange = answers.popleft() if len(answers) > 1 else answers[0]
+        if self.speed:
+            delay = exchange.duration / self.speed
+            if timeout is not None and delay > timeout:
+                await asyncio.sleep(timeout)
+                raise TimeoutError
+            await asyncio.sleep(delay)
+        return TransportResponse(exchange.status, exchange.response)
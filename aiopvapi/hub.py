@@ -1,5 +1,6 @@
 """Hub class acting as the base for the PowerView API."""
 
+import asyncio
 import logging
 import re
 
@@ -26,6 +27,7 @@ from aiopvapi.helpers.constants import (
     USER_DATA,
 )
 from aiopvapi.helpers.tools import base64_to_unicode, get_base_path, join_path
+from aiopvapi.helpers.tracing import span
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -211,16 +213,24 @@ class Hub(ApiBase):
 
         If API version is not set yet, get the API version first.
         """
-        await self.detect_api_version(**kwargs)
-        if self.api_version >= 3:
-            await self._query_firmware_g3(**kwargs)
-        else:
-            await self._query_firmware_g2(**kwargs)
+        with span("Hub.query_firmware", self.request):
+            await self.detect_api_version(**kwargs)
+            if self.api_version >= 3:
+                await self._query_firmware_g3(**kwargs)
+            else:
+                await self._query_firmware_g2(**kwargs)
+        self.request.hub_serial = self.serial_number
         _LOGGER.debug("Raw hub data: %s", self._raw_data)
 
     async def _query_firmware_g2(self, **kwargs):
         # self._raw_data = await self.request.get(join_path(self._base_path, "userdata"))
-        self._raw_data = await self.request_raw_data(**kwargs)
+        # the payload of the version detection is only good for this query
+        raw_firmware, self._raw_firmware = self._raw_firmware, None
+        if raw_firmware and USER_DATA in raw_firmware:
+            # the version detection already returned the full user data
+            self._raw_data = raw_firmware
+        else:
+            self._raw_data = await self.request_raw_data(**kwargs)
 
         if not self._raw_data or self._raw_data == {}:
             raise PvApiEmptyData("Hub returned empty data")
@@ -228,9 +238,7 @@ class Hub(ApiBase):
         _main = self._parse(USER_DATA, FIRMWARE, FIRMWARE_MAINPROCESSOR)
         if not _main:
             # do some checking for legacy v1 failures
-            if not self._raw_firmware:
-                self._raw_firmware = await self.request_raw_firmware(**kwargs)
-            _fw = self._raw_firmware
+            _fw = raw_firmware or await self.request_raw_firmware(**kwargs)
             # _fw = await self.request.get(join_path(self._base_path, FWVERSION))
             if FIRMWARE in _fw:
                 _main = self._parse(FIRMWARE, FIRMWARE_MAINPROCESSOR, data=_fw)
@@ -259,7 +267,13 @@ class Hub(ApiBase):
 
     async def _query_firmware_g3(self, **kwargs):
         # self._raw_data = await self.request.get(gateway)
-        self._raw_data = await self.request_raw_data(**kwargs)
+        # the payload of the version detection is only good for this query
+        raw_firmware, self._raw_firmware = self._raw_firmware, None
+        if raw_firmware and CONFIG in raw_firmware:
+            # the version detection already returned the full gateway data
+            self._raw_data = raw_firmware
+        else:
+            self._raw_data = await self.request_raw_data(**kwargs)
 
         if not self._raw_data or self._raw_data == {}:
             raise PvApiEmptyData("Hub returned empty data")
@@ -362,18 +376,34 @@ class Hub(ApiBase):
             return await self.request.get(data_url, **kwargs)
 
         _LOGGER.debug("Searching for firmware file")
-        try:
-            _LOGGER.debug("Attempting Gen 2 connection")
-            return await self.request.get(gen2_url, **kwargs)
-        except Exception:  # pylint: disable=broad-except  # noqa: BLE001
-            _LOGGER.debug("Gen 2 connection failed")
-
-        try:
-            _LOGGER.debug("Attempting Gen 3 connection")
+        # race both generations so a gen 3 gateway does not have to wait
+        # for the gen 2 url to time out (and vice versa)
+        probes = {
+            asyncio.ensure_future(self.request.get(gen2_url, **kwargs)): 2,
             # Secondary hubs not supported - second hub is essentially a repeater
-            return await self.request.get(gen3_url, **kwargs)
-        except Exception as err:  # pylint: disable=broad-except # noqa: BLE001
-            _LOGGER.debug("Gen 3 connection failed %s", err)
+            asyncio.ensure_future(self.request.get(gen3_url, **kwargs)): 3,
+        }
+        pending = set(probes)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for probe in done:
+                    try:
+                        result = probe.result()
+                    except Exception as err:  # pylint: disable=broad-except # noqa: BLE001
+                        _LOGGER.debug("Gen %s connection failed %s", probes[probe], err)
+                        continue
+                    if result:
+                        _LOGGER.debug("Gen %s connection succeeded", probes[probe])
+                        return result
+                    _LOGGER.debug("Gen %s returned no data", probes[probe])
+        finally:
+            for probe in pending:
+                probe.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
 
         raise PvApiConnectionError("Failed to discover gateway version")
 
@@ -0,0 +1,366 @@
+"""Caching proxy server sharing a single hub connection between clients.
+
+The proxy exposes the same /api, /home and /gateway routes as the hub.
+Reads are answered from a cache that is kept up to date by polling.
+Writes (and gets making the hub act, like gen 2 scene activations) are
+queued and sent one by one through a single AioRequest, pending moves of
+the same shade are coalesced into the latest one.
+Clients can follow changes on /proxy/events (server sent events).
+
+Run it with ``python -m aiopvapi.proxy <hub ip>``.
+"""
+
+import argparse
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import json
+import logging
+import time
+from typing import Any
+
+import aiohttp
+from aiohttp import web
+
+from aiopvapi.helpers.aiorequest import (
+    AioRequest,
+    PvApiConnectionError,
+    PvApiMaintenance,
+    PvApiResponseStatusError,
+)
+from aiopvapi.helpers.constants import ATTR_POSITIONS, ATTR_SHADE
+from aiopvapi.helpers.tools import get_base_path
+from aiopvapi.hub import Hub
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENTS_PATH = "/proxy/events"
+# query parameters asking the hub to talk to the shade, never cached
+BYPASS_CACHE_PARAMS = ("refresh", "updateBatteryLevel")
+# gets making the hub act (gen 2 scene activation, identify), by path and
+# the query parameter naming what to act on (None: any get of the path).
+# They are queued with the writes and never cached.
+ACTION_GETS = {
+    "/api/scenes": "sceneId",
+    "/api/scenecollections": "sceneCollectionId",
+    "/api/scheduledevents": "scheduledEventId",
+    "/gateway/identify": None,
+}
+POLL_PATHS_V2 = ("/api/shades", "/api/scenes", "/api/rooms")
+POLL_PATHS_V3 = ("/home/shades", "/home/scenes", "/home/rooms")
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+@dataclass
+class _CacheEntry:
+    data: Any
+    fetched: float
+
+
+@dataclass
+class _PendingWrite:
+    method: str
+    path: str
+    params: dict | None
+    data: Any
+    waiters: list[asyncio.Future] = field(default_factory=list)
+
+
+@dataclass
+class ProxyStats:
+    """Counters of the proxy."""
+
+    cache_hits: int = 0
+    coalesced_reads: int = 0
+    upstream_reads: int = 0
+    upstream_writes: int = 0
+    coalesced_writes: int = 0
+
+
+def _collection(path: str) -> str:
+    """Return the collection a resource path belongs to (ie /home/shades)."""
+    return "/".join(path.split("/")[:3])
+
+
+def _is_action(path: str, params: dict) -> bool:
+    path = path.rstrip("/")
+    if path not in ACTION_GETS:
+        return False
+    return (param := ACTION_GETS[path]) is None or param in params
+
+
+def _is_move(data: Any) -> bool:
+    if not isinstance(data, dict):
+        return False
+    return ATTR_POSITIONS in data.get(ATTR_SHADE, data)
+
+
+class PowerviewProxy:
+    """Caching proxy in front of a single PowerView hub."""
+
+    def __init__(
+        self,
+        request: AioRequest,
+        cache_ttl: float = 30,
+        poll_interval: float = 60,
+        write_interval: float = 0.25,
+    ) -> None:
+        """Initialize the proxy.
+
+        :param request: The request class connected to the hub.
+        :param cache_ttl: Time a cached read is served without asking the hub.
+        :param poll_interval: Interval of the background poll of shades,
+                    scenes and rooms. 0 disables polling.
+        :param write_interval: Pause between two writes to the hub.
+        """
+        self.request = request
+        self.cache_ttl = cache_ttl
+        self.poll_interval = poll_interval
+        self.write_interval = write_interval
+        self.stats = ProxyStats()
+        self.app = web.Application()
+        self.app.router.add_get(EVENTS_PATH, self._handle_events)
+        for prefix in ("/api", "/home", "/gateway"):
+            self.app.router.add_route("*", prefix + "{tail:.*}", self._handle)
+        self._cache: dict[tuple, _CacheEntry] = {}
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._writes: OrderedDict[Any, _PendingWrite] = OrderedDict()
+        self._write_event = asyncio.Event()
+        self._subscribers: set[asyncio.Queue] = set()
+        self._tasks: list[asyncio.Task] = []
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def poll_paths(self) -> tuple[str, ...]:
+        """Paths kept up to date by the background poll."""
+        if self.request.api_version and self.request.api_version >= 3:
+            return POLL_PATHS_V3
+        return POLL_PATHS_V2
+
+    async def start(self, host: str = "0.0.0.0", port: int = 8080) -> None:
+        """Start serving."""
+        if not self.request.api_version:
+            await Hub(self.request).detect_api_version()
+        self._tasks.append(asyncio.ensure_future(self._writer()))
+        if self.poll_interval:
+            self._tasks.append(asyncio.ensure_future(self._poller()))
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        _LOGGER.debug(
+            "Proxy for %s listening on %s:%s", self.request.hub_ip, host, port
+        )
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        for queue in self._subscribers:
+            queue.put_nowait(None)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        if self._runner:
+            await self._runner.cleanup()
+
+    def subscribe(self) -> asyncio.Queue:
+        """Return a queue receiving all change events."""
+        queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """Stop receiving change events."""
+        self._subscribers.discard(queue)
+
+    def _publish(self, event: dict) -> None:
+        for queue in self._subscribers:
+            if queue.full():
+                # slow consumer, drop its oldest event
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def _store(self, key: tuple, data: Any) -> None:
+        previous = self._cache.get(key)
+        self._cache[key] = _CacheEntry(data, time.monotonic())
+        if previous is None or previous.data != data:
+            self._publish({"type": "changed", "path": key[0], "data": data})
+
+    async def read(self, path: str, params: dict | None = None, force=False) -> Any:
+        """Return data for a hub path, from cache when fresh enough.
+
+        Concurrent reads of the same path result in one hub request. Gets
+        making the hub act (see ACTION_GETS) are queued as writes instead.
+        """
+        params = dict(params or {})
+        if _is_action(path, params):
+            return await self.write("GET", path, params, None)
+        key = (path, tuple(sorted(params.items())))
+        bypass = force or any(param in params for param in BYPASS_CACHE_PARAMS)
+        entry = self._cache.get(key)
+        if not bypass and entry and time.monotonic() - entry.fetched < self.cache_ttl:
+            self.stats.cache_hits += 1
+            return entry.data
+
+        while (inflight := self._inflight.get(key)) is not None:
+            self.stats.coalesced_reads += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # the read joined was cancelled, not this one: read again
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            self.stats.upstream_reads += 1
+            data = await self.request.get(
+                get_base_path(self.request.hub_ip, path), params=params or None
+            )
+        except Exception as err:
+            future.set_exception(err)
+            # mark retrieved, waiters (if any) get the exception themselves
+            future.exception()
+            raise
+        except BaseException:
+            # cancelled, waiters read again
+            future.cancel()
+            raise
+        finally:
+            del self._inflight[key]
+        future.set_result(data)
+
+        # a refreshed shade is also the newest plain state of that shade
+        self._store((path, ()) if bypass and params else key, data)
+        return data
+
+    async def write(self, method: str, path: str, params: dict | None, data: Any):
+        """Queue a write to the hub and wait for its response.
+
+        A move of a shade replaces a queued move of the same shade.
+        """
+        future = asyncio.get_running_loop().create_future()
+        key = None
+        if method == "PUT" and _is_move(data):
+            key = (path, tuple(sorted((params or {}).items())))
+        if key is not None and key in self._writes:
+            pending = self._writes[key]
+            pending.data = data
+            pending.waiters.append(future)
+            self.stats.coalesced_writes += 1
+        else:
+            self._writes[key or object()] = _PendingWrite(
+                method, path, params, data, [future]
+            )
+        self._write_event.set()
+        return await future
+
+    async def _send(self, pending: _PendingWrite):
+        url = get_base_path(self.request.hub_ip, pending.path)
+        if pending.method == "GET":
+            return await self.request.get(url, params=pending.params)
+        if pending.method == "PUT":
+            return await self.request.put(url, pending.data, params=pending.params)
+        if pending.method == "POST":
+            return await self.request.post(url, pending.data)
+        return await self.request.delete(url, params=pending.params)
+
+    async def _writer(self) -> None:
+        while True:
+            await self._write_event.wait()
+            self._write_event.clear()
+            while self._writes:
+                _, pending = self._writes.popitem(last=False)
+                try:
+                    self.stats.upstream_writes += 1
+                    result = await self._send(pending)
+                except Exception as err:  # noqa: BLE001
+                    for waiter in pending.waiters:
+                        if not waiter.done():
+                            waiter.set_exception(err)
+                else:
+                    for waiter in pending.waiters:
+                        if not waiter.done():
+                            waiter.set_result(result)
+                collection = _collection(pending.path)
+                for key in [
+                    key for key in self._cache if key[0].startswith(collection)
+                ]:
+                    del self._cache[key]
+                self._publish(
+                    {"type": "write", "path": pending.path, "data": pending.data}
+                )
+                await asyncio.sleep(self.write_interval)
+
+    async def _poller(self) -> None:
+        while True:
+            for path in self.poll_paths:
+                try:
+                    await self.read(path, force=True)
+                except Exception as err:  # noqa: BLE001
+                    _LOGGER.debug("Proxy poll of %s failed: %s", path, err)
+            await asyncio.sleep(self.poll_interval)
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        params = dict(request.query)
+        try:
+            if request.method == "GET":
+                data = await self.read(request.path, params)
+            else:
+                body = await request.json() if request.can_read_body else None
+                data = await self.write(request.method, request.path, params, body)
+        except PvApiMaintenance:
+            return web.json_response({}, status=423)
+        except PvApiResponseStatusError as err:
+            status = err.args[0] if err.args and isinstance(err.args[0], int) else 502
+            return web.json_response({}, status=status)
+        except PvApiConnectionError:
+            return web.json_response({}, status=504)
+        return web.json_response(data)
+
+    async def _handle_events(self, request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse(
+            headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"}
+        )
+        await response.prepare(request)
+        queue = self.subscribe()
+        try:
+            while (event := await queue.get()) is not None:
+                await response.write(f"data: {json.dumps(event)}\n\n".encode())
+        finally:
+            self.unsubscribe(queue)
+        return response
+
+
+async def _serve(args) -> None:
+    async with aiohttp.ClientSession() as session:
+        request = AioRequest(
+            args.hub_ip, loop=asyncio.get_running_loop(), websession=session
+        )
+        proxy = PowerviewProxy(
+            request, cache_ttl=args.cache_ttl, poll_interval=args.poll_interval
+        )
+        await proxy.start(args.host, args.port)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await proxy.stop()
+
+
+def main() -> None:
+    """Run the proxy from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("hub_ip")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--cache-ttl", type=float, default=30)
+    parser.add_argument("--poll-interval", type=float, default=60)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
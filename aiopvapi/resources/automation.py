@@ -11,6 +11,8 @@ from aiopvapi.helpers.constants import (
     FUNCTION_SCHEDULE,
 )
 from aiopvapi.helpers.tools import get_base_path, join_path
+from aiopvapi.helpers.tracing import ATTR_AUTOMATION_ID, span
+from aiopvapi.resources.records import AutomationRecord
 from aiopvapi.resources.scene import Scene
 
 _LOGGER = logging.getLogger(__name__)
@@ -19,7 +21,7 @@ _LOGGER = logging.getLogger(__name__)
 class Automation(ApiResource):
     """Powerview Automation class."""
 
-    def __init__(self, raw_data: dict, request: AioRequest) -> None:
+    def __init__(self, raw_data: dict | AutomationRecord, request: AioRequest) -> None:
         """Initialize the automation."""
         self.api_endpoint = "scheduledevents"
         if request.api_version >= 3:
@@ -40,11 +42,15 @@ class Automation(ApiResource):
     @property
     def enabled(self) -> bool:
         """Return the automation state."""
+        if (record := self.record) is not None:
+            return record.enabled
         return self._raw_data.get("enabled")
 
     @property
     def id(self) -> int:
         """Return the automation id."""
+        if (record := self.record) is not None:
+            return record.id
         return self._raw_data.get(ATTR_ID)
 
     @property
@@ -52,11 +58,13 @@ class Automation(ApiResource):
         """Return the automation name."""
         if self._name is not None:
             return self._name
-        return self._raw_data.get(ATTR_SCENE_ID)
+        return self.scene_id
 
     @property
     def scene_id(self) -> str:
         """Return the scene id of the automation."""
+        if (record := self.record) is not None:
+            return record.scene_id
         return self._raw_data.get(ATTR_SCENE_ID)
 
     @property
@@ -210,10 +218,15 @@ class Automation(ApiResource):
             "scenes",
             str(self.scene_id),
         )
-        self._scene: Scene = Scene(
-            await self.request.get(scene_url),
+        with span(
+            "Automation.fetch_associated_scene_data",
             self.request,
-        )
+            {ATTR_AUTOMATION_ID: self.id},
+        ):
+            self._scene: Scene = Scene(
+                await self.request.get(scene_url),
+                self.request,
+            )
         self._name = self._scene.name
         self._room_id = self._scene.room_id
 
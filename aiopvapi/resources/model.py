@@ -1,14 +1,79 @@
 """Powerview data models."""
 
-from collections.abc import Iterable
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Iterator, Mapping, MutableMapping
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from aiopvapi.hub import Hub
+    from aiopvapi.resources.automation import Automation
+    from aiopvapi.resources.raw_store import RawStore
+    from aiopvapi.resources.room import Room
+    from aiopvapi.resources.scene import Scene
+    from aiopvapi.resources.shade import BaseShade
+
+
+class LazyResources(MutableMapping):
+    """Resources by id, each created from its raw entry when first accessed.
+
+    Iteration, len() and membership only look at the ids, a resource is
+    created (once) by reading it, ie processed[id], get() or values().
+    Resources assigned to the mapping are kept as given.
+    """
+
+    __slots__ = ("_entries", "_factory", "_resources")
+
+    def __init__(
+        self, entries: Mapping[Any, Any], factory: Callable[[Any], Any]
+    ) -> None:
+        """Initialize the mapping.
+
+        :param entries: The raw entries (raw dicts or records) by id.
+        :param factory: Creates the resource of a raw entry.
+        """
+        self._entries = dict(entries)
+        self._factory = factory
+        self._resources: dict[Any, Any] = {}
+
+    def __getitem__(self, key):
+        try:
+            return self._resources[key]
+        except KeyError:
+            resource = self._resources[key] = self._factory(self._entries[key])
+            return resource
 
-from aiopvapi.hub import Hub
-from aiopvapi.resources.automation import Automation
-from aiopvapi.resources.room import Room
-from aiopvapi.resources.scene import Scene
-from aiopvapi.resources.shade import BaseShade
+    def __setitem__(self, key, value) -> None:
+        self._entries[key] = getattr(value, "raw_data", None)
+        self._resources[key] = value
+
+    def __delitem__(self, key) -> None:
+        del self._entries[key]
+        self._resources.pop(key, None)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def __repr__(self) -> str:
+        return (
+            f"<{type(self).__name__} {len(self._resources)} of"
+            f" {len(self._entries)} created>"
+        )
+
+    def peek(self, key):
+        """Return the resource of key if it was created, else None."""
+        return self._resources.get(key)
+
+    def entry(self, key):
+        """Return the raw entry of key."""
+        return self._entries[key]
 
 
 @dataclass
@@ -17,8 +82,16 @@ class PowerviewData:
 
     :raw - raw json from the hub
 
-    :processed - Class Object grouped by id
+    :processed - Class Object grouped by id, a LazyResources creating
+    them on first access
+
+    :sequence - next_sequence() when the data was requested, None when not
+    known
+
+    :store - the raw store of the hub holding raw, None when not stored
     """
 
     raw: Iterable[dict[str | int, Any]]
-    processed: dict[str, BaseShade | Hub | Automation | Scene | Room]
+    processed: MutableMapping[str, BaseShade | Hub | Automation | Scene | Room]
+    sequence: int | None = None
+    store: RawStore | None = None
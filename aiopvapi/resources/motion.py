@@ -0,0 +1,143 @@
+"""Motion model of the shades.
+
+The hub reports where a shade is, not where it is going or when it will
+get there. A MotionModel remembers the moves sent to a shade, estimates
+the position while the shade travels and the time it arrives, and learns
+the travel speed of the shade from the positions reported on the way.
+
+Speeds are kept in seconds per percent of travel of every axis, at full
+velocity. Gen 3 moves sent with a velocity (0.0 - 1.0 of the full speed)
+take proportionally longer.
+"""
+
+import asyncio
+from dataclasses import dataclass
+import time
+
+
+@dataclass
+class _Axis:
+    origin: float
+    target: float
+    duration: float
+
+
+class MotionModel:
+    """Travel of a single shade."""
+
+    # weight of a new observation in the learned speed
+    learning_rate = 0.5
+
+    def __init__(self, travel_times: dict[str, float]) -> None:
+        """Initialize the model.
+
+        :param travel_times: Seconds an axis takes for a full travel, the
+                    starting point of the learned speeds.
+        """
+        self.seconds_per_percent = {
+            axis: seconds / 100 for axis, seconds in travel_times.items()
+        }
+        self.started: float | None = None
+        self.velocity = 1.0
+        self._axes: dict[str, _Axis] = {}
+        # the refresh confirming the move, scheduled by the shade
+        self.confirmation: asyncio.Future | None = None
+
+    @property
+    def moving(self) -> bool:
+        """Return if a move is in progress."""
+        return self.started is not None
+
+    def start(
+        self,
+        origin: dict[str, float | None],
+        targets: dict[str, float],
+        velocity: float | None = None,
+        now: float | None = None,
+    ) -> float:
+        """Record a move sent to the shade and return its duration.
+
+        :param origin: Position of the axes when the move starts, in percent.
+        :param targets: Targets of the axes, in percent.
+        """
+        now = time.monotonic() if now is None else now
+        if self.moving:
+            # a new move starts where the previous one got to
+            origin = {**origin, **self.estimate(now)}
+        self.velocity = velocity if velocity and 0 < velocity <= 1 else 1.0
+        self._axes = {}
+        for axis, target in targets.items():
+            if (start := origin.get(axis)) is None:
+                # unknown, assume the longest way
+                start = 100 if target <= 50 else 0
+            self._axes[axis] = _Axis(start, target, self._duration(axis, start, target))
+        self.started = now
+        return self.eta(now)
+
+    def _duration(self, axis: str, origin: float, target: float) -> float:
+        seconds_per_percent = self.seconds_per_percent.get(axis, 0.0)
+        return abs(target - origin) * seconds_per_percent / self.velocity
+
+    def estimate(self, now: float | None = None) -> dict[str, float]:
+        """Return the estimated position of the moving axes, in percent."""
+        if not self.moving:
+            return {}
+        now = time.monotonic() if now is None else now
+        elapsed = now - self.started
+        estimate = {}
+        for axis, motion in self._axes.items():
+            if motion.duration <= 0 or elapsed >= motion.duration:
+                estimate[axis] = motion.target
+                continue
+            progress = elapsed / motion.duration
+            estimate[axis] = motion.origin + (motion.target - motion.origin) * progress
+        return estimate
+
+    def eta(self, now: float | None = None) -> float | None:
+        """Return the seconds until the move completes, None when not moving."""
+        if not self.moving:
+            return None
+        now = time.monotonic() if now is None else now
+        duration = max((motion.duration for motion in self._axes.values()), default=0)
+        return max(0.0, self.started + duration - now)
+
+    def observe(
+        self,
+        reported: dict[str, float | None],
+        tolerance: float,
+        now: float | None = None,
+    ) -> bool:
+        """Compare a reported position with the move and learn from it.
+
+        An axis reported on its way gives its speed, the remaining travel
+        is estimated again from it. A move is complete once all axes are
+        reported at their target.
+
+        :return: True while the move is still in progress.
+        """
+        if not self.moving:
+            return False
+        now = time.monotonic() if now is None else now
+        elapsed = now - self.started
+        arrived = True
+        for axis, motion in self._axes.items():
+            position = reported.get(axis)
+            if position is None or abs(position - motion.target) <= tolerance:
+                continue
+            arrived = False
+            travelled = abs(position - motion.origin)
+            # an axis that did not start yet has nothing to teach
+            if travelled > tolerance and elapsed > 0:
+                sample = elapsed / travelled * self.velocity
+                learned = self.seconds_per_percent.get(axis, sample)
+                learned += (sample - learned) * self.learning_rate
+                self.seconds_per_percent[axis] = learned
+            motion.duration = elapsed + self._duration(axis, position, motion.target)
+        if arrived:
+            self.stop()
+        return not arrived
+
+    def stop(self) -> None:
+        """Forget the move in progress."""
+        self.started = None
+        self._axes = {}
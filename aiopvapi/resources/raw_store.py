@@ -0,0 +1,111 @@
+"""Raw data of the resources of a hub, one dict per resource.
+
+The entry points keep the raw data of every resource they load in the
+RawStore of the hub. PowerviewData.raw, the resource instances and
+PowerviewShadeData all reference the dicts kept here, so an update of a
+resource (a refresh, an event, a poll) is applied once, in place, and seen
+by all of them. Instances of the same resource also share their derived
+attributes and (shades) the stamps of their state.
+
+Callers needing data that does not change under them take a copy().
+"""
+
+from collections.abc import Iterable, Iterator
+import copy
+from typing import Any
+import weakref
+
+from aiopvapi.helpers.aiorequest import AioRequest
+from aiopvapi.helpers.constants import ATTR_ID
+
+
+class RawStore:
+    """Raw data of the resources of one kind by id."""
+
+    __slots__ = ("records", "_derived", "_stamps")
+
+    def __init__(self) -> None:
+        """Initialize an empty store."""
+        self.records: dict[Any, dict] = {}
+        self._derived: dict[Any, dict[str, Any]] = {}
+        self._stamps: dict[Any, dict[str, Any]] = {}
+
+    def __contains__(self, resource_id) -> bool:
+        return resource_id in self.records
+
+    def __iter__(self) -> Iterator:
+        return iter(self.records)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def get(self, resource_id) -> dict | None:
+        """Return the stored raw data of a resource."""
+        return self.records.get(resource_id)
+
+    def put(self, raw: dict) -> dict:
+        """Store the raw data of a resource and return the stored dict.
+
+        The dict of a new resource is stored as is, the stored dict of a
+        known resource is updated in place.
+        """
+        resource_id = raw[ATTR_ID]
+        if (record := self.records.get(resource_id)) is None:
+            self.records[resource_id] = raw
+            return raw
+        self.update(resource_id, raw)
+        return record
+
+    def update(self, resource_id, raw: dict) -> None:
+        """Replace the content of the stored dict of a resource with raw."""
+        record = self.records[resource_id]
+        if raw is not record:
+            if raw == record:
+                # unchanged (ie loaded again), the derived attributes hold
+                return
+            # key by key, the dict keeps its table instead of allocating
+            # a new one as clear() and update() would
+            for key in record.keys() - raw.keys():
+                del record[key]
+            record.update(raw)
+        if (derived := self._derived.get(resource_id)) is not None:
+            derived.clear()
+
+    def copy(self, resource_id) -> dict:
+        """Return a copy of the raw data of a resource, free to change."""
+        return copy.deepcopy(self.records[resource_id])
+
+    def retain(self, resource_ids: Iterable) -> None:
+        """Forget the resources not in resource_ids, ie removed from the hub."""
+        keep = set(resource_ids)
+        for resource_id in self.records.keys() - keep:
+            del self.records[resource_id]
+            self._derived.pop(resource_id, None)
+            self._stamps.pop(resource_id, None)
+
+    def derived(self, resource_id) -> dict[str, Any]:
+        """Return the derived attributes shared by the instances of a resource."""
+        return self._derived.setdefault(resource_id, {})
+
+    def stamps(self, resource_id, create: bool = True) -> dict[str, Any] | None:
+        """Return the state stamps shared by the instances of a resource.
+
+        :param create: Create them when missing, else return None.
+        """
+        if create:
+            return self._stamps.setdefault(resource_id, {})
+        return self._stamps.get(resource_id)
+
+
+# stores by request (hub) and api endpoint
+_STORES: weakref.WeakKeyDictionary[AioRequest, dict[str, RawStore]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def raw_store(request: AioRequest, api_endpoint: str) -> RawStore:
+    """Return the store of the resources of an api endpoint of a hub."""
+    stores = _STORES.setdefault(request, {})
+    if (store := stores.get(api_endpoint)) is None:
+        store = stores[api_endpoint] = RawStore()
+    return store
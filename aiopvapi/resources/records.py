@@ -0,0 +1,152 @@
+"""Typed records of the resources returned by the hub.
+
+A record holds the decoded identity of a resource (id, name, room, type)
+in a slotted dataclass, names are decoded once on the way in. Resources
+created from a record read these fields from it instead of looking them up
+in their raw dict, the raw dict stays available as ``record.raw`` for
+backwards compatibility and for the state that changes (positions,
+battery).
+
+Records decode the json shared by Gen 2 and Gen 3 hubs, both generations
+use the same keys for the fields kept here except the room of a scene.
+"""
+
+from dataclasses import dataclass
+import json
+from typing import Any
+
+from aiopvapi.helpers.constants import (
+    ATTR_CAPABILITIES,
+    ATTR_ID,
+    ATTR_NAME,
+    ATTR_NAME_UNICODE,
+    ATTR_PTNAME,
+    ATTR_ROOM_ID,
+    ATTR_ROOM_IDS,
+    ATTR_SCENE_ID,
+    ATTR_SHADE_ID,
+    ATTR_TYPE,
+)
+from aiopvapi.helpers.tools import base64_to_name, intern_name
+
+
+def decode_name(raw: dict) -> str:
+    """Return the readable name of a raw resource.
+
+    Gen 3 hubs send the plain text ``ptName``, Gen 2 hubs a base64 encoded
+    ``name``. A name failing to decode is returned as is.
+    """
+    if name := raw.get(ATTR_PTNAME) or raw.get(ATTR_NAME_UNICODE):
+        return intern_name(name)
+    if name := raw.get(ATTR_NAME):
+        return base64_to_name(name)
+    return ""
+
+
+class Record:
+    """Base class of the records."""
+
+    __slots__ = ()
+
+    raw: dict[str, Any]
+
+    @classmethod
+    def decode(cls, raw: dict) -> "Record":
+        """Decode a raw resource."""
+        raise NotImplementedError
+
+
+@dataclass(slots=True)
+class ShadeRecord(Record):
+    """A shade."""
+
+    raw: dict[str, Any]
+    id: int
+    name: str
+    type: int | None
+    capabilities: int | None
+    room_id: int | None
+
+    @classmethod
+    def decode(cls, raw: dict) -> "ShadeRecord":
+        """Decode a raw shade."""
+        return cls(
+            raw,
+            raw[ATTR_ID],
+            decode_name(raw),
+            raw.get(ATTR_TYPE),
+            raw.get(ATTR_CAPABILITIES),
+            raw.get(ATTR_ROOM_ID),
+        )
+
+
+@dataclass(slots=True)
+class RoomRecord(Record):
+    """A room."""
+
+    raw: dict[str, Any]
+    id: int
+    name: str
+
+    @classmethod
+    def decode(cls, raw: dict) -> "RoomRecord":
+        """Decode a raw room."""
+        return cls(raw, raw[ATTR_ID], decode_name(raw))
+
+
+@dataclass(slots=True)
+class SceneRecord(Record):
+    """A scene."""
+
+    raw: dict[str, Any]
+    id: int
+    name: str
+    room_id: int | None
+
+    @classmethod
+    def decode(cls, raw: dict) -> "SceneRecord":
+        """Decode a raw scene, Gen 3 scenes list their rooms."""
+        if (room_ids := raw.get(ATTR_ROOM_IDS)) is not None:
+            room_id = room_ids[0] if room_ids else None
+        else:
+            room_id = raw.get(ATTR_ROOM_ID)
+        return cls(raw, raw[ATTR_ID], decode_name(raw), room_id)
+
+
+@dataclass(slots=True)
+class SceneMemberRecord(Record):
+    """A shade taking part in a scene."""
+
+    raw: dict[str, Any]
+    id: int | None
+    scene_id: int | None
+    shade_id: int | None
+
+    @classmethod
+    def decode(cls, raw: dict) -> "SceneMemberRecord":
+        """Decode a raw scene member."""
+        return cls(
+            raw, raw.get(ATTR_ID), raw.get(ATTR_SCENE_ID), raw.get(ATTR_SHADE_ID)
+        )
+
+
+@dataclass(slots=True)
+class AutomationRecord(Record):
+    """An automation (scheduled event)."""
+
+    raw: dict[str, Any]
+    id: int
+    scene_id: int | None
+    enabled: bool | None
+
+    @classmethod
+    def decode(cls, raw: dict) -> "AutomationRecord":
+        """Decode a raw automation."""
+        return cls(raw, raw[ATTR_ID], raw.get(ATTR_SCENE_ID), raw.get("enabled"))
+
+
+def load_payload(payload: bytes | str | Any) -> Any:
+    """Return a decoded response body, bodies already decoded are kept."""
+    if isinstance(payload, (bytes, bytearray, str)):
+        return json.loads(payload)
+    return payload
@@ -3,6 +3,7 @@
 from aiopvapi.helpers.aiorequest import AioRequest
 from aiopvapi.helpers.api_base import ApiResource
 from aiopvapi.helpers.constants import ATTR_ROOM
+from aiopvapi.resources.records import RoomRecord
 
 
 class Room(ApiResource):
@@ -10,8 +11,8 @@ class Room(ApiResource):
 
     api_endpoint = "rooms"
 
-    def __init__(self, raw_data: dict, request: AioRequest) -> None:
+    def __init__(self, raw_data: dict | RoomRecord, request: AioRequest) -> None:
         """Initialize the rooms."""
-        if ATTR_ROOM in raw_data:
+        if isinstance(raw_data, dict) and ATTR_ROOM in raw_data:
             raw_data = raw_data.get(ATTR_ROOM)
         super().__init__(request, self.api_endpoint, raw_data)
@@ -3,6 +3,7 @@
 from aiopvapi.helpers.aiorequest import AioRequest
 from aiopvapi.helpers.api_base import ApiResource
 from aiopvapi.helpers.constants import ATTR_SCENE_ID, ATTR_SCENE_MEMBER, ATTR_SHADE_ID
+from aiopvapi.resources.records import SceneMemberRecord
 
 
 class SceneMember(ApiResource):
@@ -10,20 +11,24 @@ class SceneMember(ApiResource):
 
     api_endpoint = "sceneMembers"
 
-    def __init__(self, raw_data: dict, request: AioRequest) -> None:
+    def __init__(self, raw_data: dict | SceneMemberRecord, request: AioRequest) -> None:
         """Initialize SceneMembers."""
-        if ATTR_SCENE_MEMBER in raw_data:
+        if isinstance(raw_data, dict) and ATTR_SCENE_MEMBER in raw_data:
             raw_data = raw_data.get(ATTR_SCENE_MEMBER)
         super().__init__(request, self.api_endpoint, raw_data)
 
     @property
     def scene_id(self) -> str:
         """Return scene id of the scene."""
+        if (record := self.record) is not None:
+            return record.scene_id
         return self._raw_data.get(ATTR_SCENE_ID)
 
     @property
     def shade_id(self) -> str:
         """Return shade id of scene members."""
+        if (record := self.record) is not None:
+            return record.shade_id
         return self._raw_data.get(ATTR_SHADE_ID)
 
     async def delete(self):
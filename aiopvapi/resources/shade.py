@@ -1,12 +1,16 @@
 """Shade class managing all shade types."""
 
 import asyncio
-from dataclasses import dataclass
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+import copy
+from dataclasses import dataclass, fields, replace
 import logging
+import time
 from typing import Any
+import weakref
 
-from aiopvapi.helpers.aiorequest import AioRequest, PvApiMaintenance
-from aiopvapi.helpers.api_base import ApiResource
+from aiopvapi.helpers.aiorequest import AioRequest, PvApiError, PvApiMaintenance
+from aiopvapi.helpers.api_base import ApiResource, derived
 from aiopvapi.helpers.constants import (
     ATTR_BATTERY_KIND,
     ATTR_CAPABILITIES,
@@ -55,10 +59,19 @@ from aiopvapi.helpers.constants import (
     SHADE_BATTERY_STATUS,
     SHADE_BATTERY_STRENGTH,
 )
-from aiopvapi.helpers.tools import deep_update_dict, join_path
+from aiopvapi.helpers.tools import deep_update_dict, join_path, next_sequence
+from aiopvapi.helpers.tracing import ATTR_ATTEMPT, ATTR_SHADE_ID, span
+from aiopvapi.resources import telemetry
+from aiopvapi.resources.motion import MotionModel
+from aiopvapi.resources.raw_store import RawStore
+from aiopvapi.resources.records import ShadeRecord
 
 _LOGGER = logging.getLogger(__name__)
 
+# power source names by the value the hub reports
+_POWER_SOURCES_V2 = {value: name for name, value in POWERTYPE_MAP_V2.items()}
+_POWER_SOURCES_V3 = {value: name for name, value in POWERTYPE_MAP_V3.items()}
+
 
 @dataclass
 class PowerviewCapabilities:
@@ -100,6 +113,170 @@ class ShadePosition:
     velocity: float | None = None  # float only a v3 only property
 
 
+@dataclass
+class MotionStats:
+    """Counters of the move commands of all shades."""
+
+    sent: int = 0
+    suppressed: int = 0
+    trimmed_axes: int = 0
+
+
+motion_stats = MotionStats()
+
+# the axes a move compares, velocity does not move a shade
+MOTION_AXES = tuple(
+    field.name for field in fields(ShadePosition) if field.name != "velocity"
+)
+
+# motion models by request (hub) and shade id, they outlive the shade
+# instances created by every fetch
+_MOTION_MODELS: weakref.WeakKeyDictionary[AioRequest, dict[int, MotionModel]] = (
+    weakref.WeakKeyDictionary()
+)
+# confirmations of a move a shade is refreshed for at most
+CONFIRM_ATTEMPTS = 3
+
+# parts of the state of a shade, each confirmed on its own
+STATE_POSITIONS = "positions"
+STATE_BATTERY = "battery"
+STATE_SIGNAL = "signal"
+# raw keys holding each part
+STATE_KEYS = {
+    STATE_POSITIONS: (ATTR_POSITIONS,),
+    STATE_BATTERY: (SHADE_BATTERY_STATUS, SHADE_BATTERY_STRENGTH),
+    STATE_SIGNAL: (ATTR_SIGNAL_STRENGTH,),
+}
+
+# where a part of the state was last confirmed
+SOURCE_POLL = "poll"  # the list of all shades
+SOURCE_REFRESH = "refresh"  # a radio refresh of the shade
+SOURCE_COMMAND = "command"  # a command sent, assumed to succeed
+SOURCE_EVENT = "event"  # an event pushed by the hub
+
+# state fetches in progress by request (hub) and (shade id, kind), shared
+# by the callers accepting state of a given age
+_STATE_FETCHES: weakref.WeakKeyDictionary[
+    AioRequest, dict[tuple[int, str], tuple["StateStamp", asyncio.Future]]
+] = weakref.WeakKeyDictionary()
+
+
+@dataclass(frozen=True, slots=True)
+class StateStamp:
+    """When and how a part of the state of a shade was confirmed."""
+
+    time: float  # time.monotonic()
+    source: str
+    # next_sequence() when the request was issued, 0 when not known
+    sequence: int = 0
+
+    @property
+    def age(self) -> float:
+        """Return the seconds since the state was confirmed."""
+        return time.monotonic() - self.time
+
+
+def merge_state(
+    current: dict,
+    raw: dict,
+    state_stamp: Callable[[str], StateStamp],
+    stamp: StateStamp,
+) -> tuple[dict, list[str]]:
+    """Merge raw data of a shade requested at stamp.sequence into current.
+
+    Return raw with the parts of the state updated by a later request
+    (according to state_stamp) taken from current, and those parts.
+    """
+    newer = [part for part in STATE_KEYS if state_stamp(part).sequence > stamp.sequence]
+    if newer:
+        raw = dict(raw)
+        for part in newer:
+            for key in STATE_KEYS[part]:
+                if key in current:
+                    raw[key] = current[key]
+                else:
+                    raw.pop(key, None)
+    return raw, newer
+
+
+# battery levels in percent by the batteryStatus of gen 3 hubs
+_BATTERY_LEVELS = {
+    4: 100,  # 4 is hardwired
+    3: 100,  # 3 = 100% to 51% power remaining
+    2: 50,  # 2 = 50% to 21% power remaining
+    1: 20,  # 1 = 20% or less power remaining
+    0: 0,  # 0 = No power remaining
+}
+# gen 2 positions by posKind
+_POSKIND_AXES = {
+    POSKIND_PRIMARY: ATTR_PRIMARY,
+    POSKIND_SECONDARY: ATTR_SECONDARY,
+    POSKIND_TILT: ATTR_TILT,
+}
+
+
+def battery_strength(raw: dict, api_version: int) -> int:
+    """Return the battery strength of raw shade data as a percentage."""
+    if api_version < 3:
+        # SHADE_BATTERY_STRENGTH is in tenths of a volt (e.g., 146 = 14.6V), max is 18.0V (180)
+        # use min to ensure we don't exceed 100% when more than 18.0V is supplied
+        return min(100, round((raw[SHADE_BATTERY_STRENGTH] / 180) * 100))
+
+    # gen 3 dont return the same information for batteries and
+    # while gen 2 do support the below, it is less accurate than the above
+    return _BATTERY_LEVELS.get(raw[SHADE_BATTERY_STATUS], 0)
+
+
+def signal_strength(raw: dict, api_version: int) -> int:
+    """Return the signal strength of raw shade data.
+
+    :v3 is RSSI
+    :v2 is calculated as a percentage
+    """
+    if api_version >= 3:
+        return raw[ATTR_SIGNAL_STRENGTH]
+    return round(raw[ATTR_SIGNAL_STRENGTH] / ATTR_SIGNAL_STRENGTH_MAX * 100)
+
+
+def state_samples(
+    raw: dict, parts: Iterable[str], api_version: int | None
+) -> Iterator[tuple[str, float]]:
+    """Return the telemetry (metric, value) of parts of raw shade data.
+
+    Positions are in percent of the range reported by the hub. There is
+    none while the api version is not known (None), its keys depend on it.
+    """
+    if api_version is None:
+        return
+    for part in parts:
+        if part == STATE_BATTERY:
+            key = SHADE_BATTERY_STATUS if api_version >= 3 else SHADE_BATTERY_STRENGTH
+            if raw.get(key) is not None:
+                yield telemetry.METRIC_BATTERY, battery_strength(raw, api_version)
+        elif part == STATE_SIGNAL:
+            if raw.get(ATTR_SIGNAL_STRENGTH) is not None:
+                yield telemetry.METRIC_SIGNAL, signal_strength(raw, api_version)
+        elif part == STATE_POSITIONS and (positions := raw.get(ATTR_POSITIONS)):
+            if api_version >= 3:
+                for axis in MOTION_AXES:
+                    if (value := positions.get(axis)) is not None:
+                        yield axis, value * 100
+                continue
+            for position_key, poskind_key in POSITIONS_V2:
+                axis = _POSKIND_AXES.get(positions.get(poskind_key))
+                if axis is not None and positions.get(position_key) is not None:
+                    yield axis, positions[position_key] / MAX_POSITION_V2 * 100
+
+
+def record_telemetry(
+    request: AioRequest, shade_id: int, raw: dict, parts: Iterable[str]
+) -> None:
+    """Record parts of the state of a shade if its hub records telemetry."""
+    if (recorder := telemetry.recorder(request)) is not None:
+        for metric, value in state_samples(raw, parts, request.api_version):
+            recorder.record(shade_id, metric, value)
+
+
 @dataclass
 class ShadeType:
     """Shade information based on type and description."""
@@ -133,11 +310,32 @@ class BaseShade(ApiResource):
 
     shade_limits: ShadeLimits = ShadeLimits()
 
+    # positions closer than this (in percent) to the target are not moved
+    motion_tolerance: float = 0.5
+    # time the target of a move is assumed to still be pending
+    pending_target_timeout: float = 60
+    # seconds of a full travel the motion model starts from, on the short
+    # side as a confirmation finding the shade on its way teaches its speed
+    travel_times: dict[str, float] = {
+        ATTR_PRIMARY: 10.0,
+        ATTR_SECONDARY: 10.0,
+        ATTR_TILT: 2.0,
+    }
+    # refresh the shade once a move is expected to be complete
+    confirm_moves: bool = True
+    # seconds added to the expected completion of a move
+    confirm_delay: float = 1.0
+
     def __init__(
         self, raw_data: dict, shade_type: ShadeType, request: AioRequest
     ) -> None:
         """Initialize Base shade."""
         self.shade_type = shade_type
+        # axes sent to the hub by the last moves, in percent
+        self._pending_targets: dict[str, int] = {}
+        # a shade is created from the list of all shades
+        self._created = StateStamp(time.monotonic(), SOURCE_POLL)
+        self._stamps: dict[str, StateStamp] = {}
         super().__init__(request, self.api_endpoint, raw_data=raw_data)
 
     def is_supported(self, function: str) -> bool:
@@ -169,17 +367,48 @@ class BaseShade(ApiResource):
         position = self.raw_to_structured(self._raw_data)
         return self.get_additional_positions(position)
 
+    @property
+    def motion(self) -> MotionModel:
+        """Return the motion model of the shade."""
+        models = _MOTION_MODELS.setdefault(self.request, {})
+        if (model := models.get(self.id)) is None:
+            model = models[self.id] = MotionModel(self.travel_times)
+        return model
+
+    @property
+    def estimated_position(self) -> ShadePosition:
+        """Return the estimated position of a moving shade as a percentage.
+
+        The position of the shade when it is not moving.
+        """
+        position = self.raw_to_structured(self._raw_data)
+        for axis, value in self.motion.estimate().items():
+            setattr(position, axis, round(value))
+        return self.get_additional_positions(position)
+
+    @property
+    def eta(self) -> float | None:
+        """Return the seconds until the shade completes its move.
+
+        None when the shade is not moving.
+        """
+        return self.motion.eta()
+
     @property
     def room_id(self) -> int:
         """Return the room id of the shade."""
+        if (record := self.record) is not None:
+            return record.room_id
         return self._raw_data.get(ATTR_ROOM_ID)
 
     @property
     def type_id(self) -> int:
         """Return the type id of the shade."""
+        if (record := self.record) is not None:
+            return record.type
         return self._raw_data.get(ATTR_TYPE)
 
-    @property
+    @derived
     def type_name(self) -> str:
         """Return the type name of the shade."""
         for shade in self.shade_types:
@@ -187,7 +416,7 @@ class BaseShade(ApiResource):
                 return shade.description
         return self.type_id
 
-    @property
+    @derived
     def firmware(self) -> str | None:
         """Return firmware string for the shade."""
         if FIRMWARE not in self.raw_data:
@@ -347,15 +576,9 @@ class BaseShade(ApiResource):
                     )
 
         else:
-            position_mapping = {
-                POSKIND_PRIMARY: ATTR_PRIMARY,
-                POSKIND_SECONDARY: ATTR_SECONDARY,
-                POSKIND_TILT: ATTR_TILT,
-            }
-
             for position_key, poskind_key in POSITIONS_V2:
                 if poskind_key in position_data:
-                    target_key = position_mapping.get(position_data[poskind_key])
+                    target_key = _POSKIND_AXES.get(position_data[poskind_key])
                     setattr(
                         position,
                         target_key,
@@ -379,6 +602,127 @@ class BaseShade(ApiResource):
             base[ATTR_SHADE][ATTR_ROOM_ID] = room_id
         return base
 
+    def state_stamp(self, part: str) -> StateStamp:
+        """Return when and how a part of the state was last confirmed.
+
+        :param part: STATE_POSITIONS, STATE_BATTERY or STATE_SIGNAL.
+        """
+        return self._stamps.get(part, self._created)
+
+    def confirm_state(
+        self,
+        parts: Iterable[str],
+        source: str,
+        when: float | None = None,
+        sequence: int | None = None,
+    ) -> None:
+        """Record parts of the state as confirmed, ie by an event of the hub.
+
+        :param when: time.monotonic() of the confirmation, defaults to now.
+        :param sequence: next_sequence() when the data was requested,
+                    defaults to a new one.
+        """
+        stamp = StateStamp(
+            time.monotonic() if when is None else when,
+            source,
+            next_sequence() if sequence is None else sequence,
+        )
+        for part in parts:
+            self._stamps[part] = stamp
+
+    def _bind(self, store: RawStore) -> None:
+        super()._bind(store)
+        self._stamps = store.stamps(self._id)
+
+    def _apply_state(self, raw: dict, parts: Iterable[str], stamp: StateStamp) -> None:
+        """Apply raw data of the shade requested at stamp.sequence.
+
+        The parts of the state already updated by a later request (ie a
+        move sent while a refresh was on its way) are kept, the others are
+        taken from raw. parts are confirmed by raw.
+        """
+        raw, newer = merge_state(self._raw_data, raw, self.state_stamp, stamp)
+        if newer:
+            _LOGGER.debug("Shade %s keeps its newer %s", self.name, newer)
+        self._raw_data = raw
+        confirmed = [part for part in parts if part not in newer]
+        for part in confirmed:
+            self._stamps[part] = stamp
+        record_telemetry(self.request, self._id, raw, confirmed)
+
+    def apply_event(self, raw: dict, sequence: int | None = None) -> None:
+        """Apply shade data pushed by the hub.
+
+        :param sequence: next_sequence() when the event was received,
+                    defaults to a new one.
+        """
+        raw = raw.get(ATTR_SHADE, raw)
+        stamp = StateStamp(
+            time.monotonic(),
+            SOURCE_EVENT,
+            next_sequence() if sequence is None else sequence,
+        )
+        self._apply_state(
+            deep_update_dict(copy.deepcopy(self._raw_data), raw),
+            [part for part, keys in STATE_KEYS.items() if keys[0] in raw],
+            stamp,
+        )
+
+    def _carry_over(
+        self,
+        previous: "BaseShade | None",
+        sequence: int,
+        when: float | None = None,
+    ) -> None:
+        """Take over the newer state of the instance this one replaces.
+
+        :param sequence: next_sequence() when the data of this instance was
+                    requested.
+        :param when: time.monotonic() of the request, defaults to the
+                    creation of this instance.
+        """
+        self._created = replace(
+            self._created,
+            sequence=sequence,
+            time=self._created.time if when is None else when,
+        )
+        if previous is None:
+            return
+        for part, keys in STATE_KEYS.items():
+            if (stamp := previous.state_stamp(part)).sequence > sequence:
+                for key in keys:
+                    if key in previous._raw_data:
+                        self._raw_data[key] = previous._raw_data[key]
+                self._stamps[part] = stamp
+
+    def _is_fresh(self, part: str, max_age: float | None) -> bool:
+        return max_age is not None and self.state_stamp(part).age <= max_age
+
+    async def _fetch_state(
+        self, kind: str, coalesce: bool, fetch: Callable[[], Awaitable]
+    ) -> tuple[StateStamp, Any]:
+        """Fetch state of the shade, return when it was issued and the data.
+
+        Coalesced fetches of the shade in progress are joined instead of
+        sending another one, callers joining get a copy of the data.
+        """
+        if not coalesce:
+            issued = StateStamp(time.monotonic(), SOURCE_REFRESH, next_sequence())
+            return issued, await fetch()
+        fetches = _STATE_FETCHES.setdefault(self.request, {})
+        key = (self.id, kind)
+        if (fetching := fetches.get(key)) is not None:
+            issued, future = fetching
+            return issued, copy.deepcopy(await asyncio.shield(future))
+        issued = StateStamp(time.monotonic(), SOURCE_REFRESH, next_sequence())
+        future = asyncio.ensure_future(fetch())
+        fetches[key] = (issued, future)
+        try:
+            return issued, await asyncio.shield(future)
+        finally:
+            if fetches.get(key, (None, None))[1] is future:
+                del fetches[key]
+
     def _update_position_from_dict(self, updates: dict) -> None:
         updates = updates.get(ATTR_SHADE, updates)  # Gen 2 position dict is embedded
         self._raw_data = deep_update_dict(self._raw_data, updates)
@@ -396,29 +740,155 @@ class BaseShade(ApiResource):
             # IDs are required in request params for gen 3.
             params = {"ids": self.id}
             resource_path = join_path(self.base_path, "positions")
+        issued = StateStamp(time.monotonic(), SOURCE_COMMAND, next_sequence())
         # store the requested position in the shade data
-        response = await self.request.put(resource_path, data=position_data, params=params)
-        self._update_position_from_dict(position_data)
+        response = await self.request.put(
+            resource_path, data=position_data, params=params
+        )
+        if self.state_stamp(STATE_POSITIONS).sequence < issued.sequence:
+            self._update_position_from_dict(position_data)
+            self._stamps[STATE_POSITIONS] = issued
+        else:
+            _LOGGER.debug("Shade %s was moved again since", self.name)
         return response
 
-    async def move(self, position_data: ShadePosition) -> ShadePosition:
-        """Move the shade to a set position."""
-        _LOGGER.debug("Shade %s move to: %s", self.name, position_data)
-        data = self.structured_to_raw(position_data)
-        await self._move(data)
+    def _targets(self, position_data: ShadePosition) -> dict[str, int]:
+        """Return the requested axes as the hub will report them."""
+        return {
+            axis: self.api_to_percent(self.percent_to_api(value, axis), axis)
+            for axis in MOTION_AXES
+            if (value := getattr(position_data, axis)) is not None
+        }
+
+    def _motion_needed(self, position_data: ShadePosition) -> ShadePosition | None:
+        """Return the part of a move that changes the shade.
+
+        An axis does not change when it is at the target or was sent there
+        less than pending_target_timeout ago and the hub has not reported
+        the positions since. Once that long after a move the hub has not
+        reported, the positions are not known and every axis changes. None
+        when no axis changes.
+        Gen 3 hubs keep the positions that are not sent, the axes that do
+        not change are dropped. Gen 2 hubs set all positions at once, a move
+        is sent as requested.
+        """
+        stamp = self.state_stamp(STATE_POSITIONS)
+        reported = self.raw_to_structured(self._raw_data)
+        if stamp.source != SOURCE_COMMAND:
+            # positions reported after the moves replace their targets
+            self._pending_targets = {}
+        elif stamp.age > self.pending_target_timeout:
+            # the raw data holds the targets of the moves, not confirmed
+            self._pending_targets = {}
+            reported = ShadePosition()
+        targets = self._targets(position_data)
+        moving = set()
+        for axis, target in targets.items():
+            current = self._pending_targets.get(axis, getattr(reported, axis))
+            if current is None or abs(current - target) > self.motion_tolerance:
+                moving.add(axis)
+        if not moving:
+            return None
+        if self.api_version < 3 or moving == set(targets):
+            return position_data
+        motion_stats.trimmed_axes += len(targets) - len(moving)
+        return ShadePosition(
+            **{axis: getattr(position_data, axis) for axis in moving},
+            velocity=position_data.velocity,
+        )
+
+    async def _move_structured(
+        self, name: str, position_data: ShadePosition, force: bool
+    ) -> ShadePosition:
+        with span(name, self.request, {ATTR_SHADE_ID: self.id}):
+            if not force:
+                motion = self._motion_needed(position_data)
+                if motion is None:
+                    _LOGGER.debug("Shade %s already at: %s", self.name, position_data)
+                    motion_stats.suppressed += 1
+                    return self.current_position
+                position_data = motion
+            with span("codec", self.request):
+                data = self.structured_to_raw(position_data)
+            origin = self.raw_to_structured(self._raw_data)
+            await self._move(data)
+            motion_stats.sent += 1
+            targets = self._targets(position_data)
+            self._pending_targets.update(targets)
+            self.motion.start(
+                {axis: getattr(origin, axis) for axis in targets},
+                targets,
+                position_data.velocity,
+            )
+            if self.confirm_moves:
+                self._schedule_confirmation()
         return self.current_position
 
+    def _schedule_confirmation(self) -> None:
+        model = self.motion
+        if model.confirmation is not None:
+            model.confirmation.cancel()
+        model.confirmation = asyncio.ensure_future(self._confirm_motion(model))
+
+    async def _confirm_motion(self, model: MotionModel) -> None:
+        """Refresh the shade when its move is expected to be complete."""
+        task = asyncio.current_task()
+        try:
+            for _ in range(CONFIRM_ATTEMPTS):
+                if (eta := model.eta()) is None:
+                    return
+                await asyncio.sleep(eta + self.confirm_delay)
+                await self.refresh()
+            _LOGGER.debug("Shade %s did not confirm its move", self.name)
+        except PvApiError as err:
+            _LOGGER.debug("Shade %s move not confirmed: %s", self.name, err)
+        finally:
+            if model.confirmation is task:
+                model.confirmation = None
+                model.stop()
+
+    def _observe_motion(self) -> None:
+        """Compare the reported position with the move in progress."""
+        if self.motion.moving:
+            reported = self.raw_to_structured(self._raw_data)
+            self.motion.observe(
+                {axis: getattr(reported, axis) for axis in MOTION_AXES},
+                self.motion_tolerance,
+            )
+
+    def _forget_motion(self) -> None:
+        """Forget the moves sent, the shade leaves their targets."""
+        self._pending_targets = {}
+        model = self.motion
+        model.stop()
+        if model.confirmation is not None:
+            model.confirmation.cancel()
+            model.confirmation = None
+
+    async def move(
+        self, position_data: ShadePosition, force: bool = False
+    ) -> ShadePosition:
+        """Move the shade to a set position.
+
+        A move to the position the shade is at, or is already moving to, is
+        not sent to the hub.
+
+        :param force: Send the move even if the shade is at the position.
+        """
+        _LOGGER.debug("Shade %s move to: %s", self.name, position_data)
+        return await self._move_structured("BaseShade.move", position_data, force)
+
     def get_additional_positions(self, positions: ShadePosition) -> ShadePosition:
         """Return additional positions not reported by the hub."""
         return positions
 
-    async def open(self):
+    async def open(self, force: bool = False):
         """Open the shade."""
-        return await self.move(position_data=self.open_position)
+        return await self.move(position_data=self.open_position, force=force)
 
-    async def close(self):
+    async def close(self, force: bool = False):
         """Close the shade."""
-        return await self.move(position_data=self.close_position)
+        return await self.move(position_data=self.close_position, force=force)
 
     def position_limit(self, position: int, position_type: str = ""):
         """Limit values that can be calculated."""
@@ -449,6 +919,7 @@ class BaseShade(ApiResource):
         return min(max(min_limit, position), max_limit)
 
     async def _motion(self, motion):
+        self._forget_motion()
         if self.api_version >= 3:
             path = join_path(self._resource_path, "motion")
             cmd = {"motion": motion}
@@ -476,6 +947,7 @@ class BaseShade(ApiResource):
             return
 
         if self.api_version >= 3:
+            self._forget_motion()
             await self.request.put(
                 join_path(self.base_path, MOTION_STOP), params={"ids": self.id}
             )
@@ -487,80 +959,126 @@ class BaseShade(ApiResource):
         data = self._create_shade_data(room_id=room_id)
         return await self.request.put(self._resource_path, data)
 
-    async def refresh(self, suppress_timeout: bool = False, **kwargs):
+    async def refresh(
+        self,
+        suppress_timeout: bool = False,
+        max_age: float | None = None,
+        **kwargs,
+    ):
         """Query the hub and refresh the most recent position state.
 
+        :param max_age: Skip the refresh when the position was confirmed
+                   less than this many seconds ago. Concurrent refreshes
+                   with a max_age share a single request.
         :param kwargs: Keyword arguments to be passed to the get request.
                    For example, timeout can be passed as kwargs.
         """
+        if self._is_fresh(STATE_POSITIONS, max_age):
+            return
         try:
             _LOGGER.debug("Refreshing position of: %s", self.name)
-            raw_data = await self.request.get(
-                self._resource_path,
-                {"refresh": "true"},
-                suppress_timeout=suppress_timeout,
-                **kwargs,
+            issued, raw_data = await self._fetch_state(
+                "refresh",
+                max_age is not None,
+                lambda: self.request.get(
+                    self._resource_path,
+                    {"refresh": "true"},
+                    suppress_timeout=suppress_timeout,
+                    **kwargs,
+                ),
             )
             if raw_data is None:
                 _LOGGER.debug("No update received for: %s", self.name)
                 return
             # Gen <= 2 API has raw data under shade key.  Gen >= 3 API this is flattened.
-            self._raw_data = raw_data.get(ATTR_SHADE, raw_data)
+            self._apply_state(
+                raw_data.get(ATTR_SHADE, raw_data),
+                (STATE_POSITIONS, STATE_SIGNAL),
+                issued,
+            )
+            self._observe_motion()
         except PvApiMaintenance:
             _LOGGER.debug("Hub undergoing maintenance. Please try again")
         return
 
-    async def refresh_battery(self, suppress_timeout: bool = False, **kwargs):
+    async def refresh_battery(
+        self,
+        suppress_timeout: bool = False,
+        max_age: float | None = None,
+        **kwargs,
+    ):
         """Query the hub and request the most recent battery state.
 
+        :param max_age: Skip the refresh when the battery state was
+                   confirmed less than this many seconds ago. Concurrent
+                   refreshes with a max_age share the requests.
         :param kwargs: Keyword arguments to be passed to the get request.
                    For example, timeout can be passed as kwargs.
         """
         if not self.is_battery_powered:
             _LOGGER.debug("Shade %s is not battery powered", self.name)
             return
+        if self._is_fresh(STATE_BATTERY, max_age):
+            return
 
         try:
-            # the refresh can sometimes first wake the shade, resulting in a timeout
-            # retry to try and get a true value
             _LOGGER.debug("Refreshing battery of: %s", self.name)
-            retries = 3
-            for attempt in range(retries):
+            issued, raw_data = await self._fetch_state(
+                "battery",
+                max_age is not None,
+                lambda: self._fetch_battery(suppress_timeout, **kwargs),
+            )
+            if raw_data is None:
+                return
+            confirmed = (
+                () if raw_data.get("timedOut", False) else (STATE_BATTERY, STATE_SIGNAL)
+            )
+            self._apply_state(raw_data, confirmed, issued)
+        except PvApiMaintenance:
+            _LOGGER.debug("Hub undergoing maintenance. Please try again")
+        return
+
+    async def _fetch_battery(self, suppress_timeout: bool, **kwargs) -> dict | None:
+        """Request the battery state, the last response or None."""
+        # the refresh can sometimes first wake the shade, resulting in a timeout
+        # retry to try and get a true value
+        retries = 3
+        for attempt in range(retries):
+            with span(
+                "BaseShade.refresh_battery",
+                self.request,
+                {ATTR_SHADE_ID: self.id, ATTR_ATTEMPT: attempt},
+            ):
                 raw_data = await self.request.get(
                     self._resource_path,
                     {"updateBatteryLevel": "true"},
                     suppress_timeout=suppress_timeout,
                     **kwargs,
                 )
-                if raw_data is None:
-                    _LOGGER.debug("No update received for: %s", self.name)
-                    return
-                # Gen <= 2 API has raw data under shade key.  Gen >= 3 API this is flattened.
-                self._raw_data = raw_data.get(ATTR_SHADE, raw_data)
+            if raw_data is None:
+                _LOGGER.debug("No update received for: %s", self.name)
+                return None
+            # Gen <= 2 API has raw data under shade key.  Gen >= 3 API this is flattened.
+            raw_data = raw_data.get(ATTR_SHADE, raw_data)
+            _LOGGER.debug("Shade battery %s %d: %s", self.name, attempt, raw_data)
+            if not raw_data.get("timedOut", False):
+                _LOGGER.debug("Shade battery %s %d: Refreshed", self.name, attempt)
+                break  # timeout is false, so we're done
+            if attempt < retries - 1:
                 _LOGGER.debug(
-                    "Shade battery %s %d: %s", self.name, attempt, self._raw_data
+                    "Shade %s timed out, retrying in 2 minutes (attempt %d/%d)",
+                    self.name,
+                    attempt + 1,
+                    retries,
                 )
-                if not self._raw_data.get("timedOut", False):
-                    _LOGGER.debug("Shade battery %s %d: Refreshed", self.name, attempt)
-                    break  # timeout is false, so we're done
-                if attempt < retries - 1:
-                    _LOGGER.debug(
-                        "Shade %s timed out, retrying in 2 minutes (attempt %d/%d)",
-                        self.name,
-                        attempt + 1,
-                        retries,
-                    )
-                    await asyncio.sleep(120)
-                else:
-                    _LOGGER.warning(
-                        "Shade battery refresh %s timed out after %d attempts",
-                        self.name,
-                        retries,
-                    )
-                    return
-        except PvApiMaintenance:
-            _LOGGER.debug("Hub undergoing maintenance. Please try again")
-        return
+                await asyncio.sleep(120)
+            else:
+                _LOGGER.warning(
+                    "Shade battery refresh %s timed out after %d attempts",
+                    self.name,
+                    retries,
+                )
+        return raw_data
 
     def has_battery_info(self) -> bool:
         """Confirm if the shade has battery info."""
@@ -583,9 +1101,10 @@ class BaseShade(ApiResource):
 
     def get_power_source(self) -> str:
         """Get from the hub the type of power source."""
-        version_map = POWERTYPE_MAP_V3 if self.api_version >= 3 else POWERTYPE_MAP_V2
+        powertype_map = (
+            _POWER_SOURCES_V3 if self.api_version >= 3 else _POWER_SOURCES_V2
+        )
         attr = ATTR_POWER_TYPE if self.api_version >= 3 else ATTR_BATTERY_KIND
-        powertype_map = {v: k for k, v in version_map.items()}
 
         raw_num = self.raw_data.get(attr)
         battery_type = powertype_map.get(raw_num)
@@ -611,22 +1130,7 @@ class BaseShade(ApiResource):
 
     def get_battery_strength(self) -> int:
         """Get battery strength from raw_data and return as a percentage."""
-        if self.api_version < 3:
-            # SHADE_BATTERY_STRENGTH is in tenths of a volt (e.g., 146 = 14.6V), max is 18.0V (180)
-            # use min to ensure we don't exceed 100% when more than 18.0V is supplied
-            return min(100, round((self.raw_data[SHADE_BATTERY_STRENGTH] / 180) * 100))
-
-        # gen 3 dont return the same information for batteries and
-        # while gen 2 do support the below, it is less accurate than the above
-        power_levels = {
-            4: 100,  # 4 is hardwired
-            3: 100,  # 3 = 100% to 51% power remaining
-            2: 50,  # 2 = 50% to 21% power remaining
-            1: 20,  # 1 = 20% or less power remaining
-            0: 0,  # 0 = No power remaining
-        }
-        battery_status = self.raw_data[SHADE_BATTERY_STATUS]
-        return power_levels.get(battery_status, 0)
+        return battery_strength(self.raw_data, self.api_version)
 
     def has_signal_strength(self) -> bool:
         """Confirm if the shade has signal data."""
@@ -638,29 +1142,33 @@ class BaseShade(ApiResource):
         :v3 is RSSI
         :v2 is calculated as a percentage
         """
-        if self.api_version >= 3:
-            return self.raw_data[ATTR_SIGNAL_STRENGTH]
-        return round(
-            self.raw_data[ATTR_SIGNAL_STRENGTH] / ATTR_SIGNAL_STRENGTH_MAX * 100
-        )
+        return signal_strength(self.raw_data, self.api_version)
 
-    async def get_current_position_raw(self, refresh=True) -> dict:
+    async def get_current_position_raw(
+        self, refresh=True, max_age: float | None = None
+    ) -> dict:
         """Return the current shade position.
 
         :param refresh: If True it queries the hub for the latest info.
+        :param max_age: Only query the hub when the position was confirmed
+                   more than this many seconds ago.
         :return: Dictionary with position data.
         """
-        if refresh:
-            await self.refresh()
+        if refresh or max_age is not None:
+            await self.refresh(max_age=max_age)
         return self._raw_data.get(ATTR_POSITIONS)
 
-    async def get_current_position(self, refresh=True) -> ShadePosition:
+    async def get_current_position(
+        self, refresh=True, max_age: float | None = None
+    ) -> ShadePosition:
         """Return the current shade position.
 
         :param refresh: If True it queries the hub for the latest info.
+        :param max_age: Only query the hub when the position was confirmed
+                   more than this many seconds ago.
         :return: Dictionary with position data.
         """
-        await self.get_current_position_raw(refresh)
+        await self.get_current_position_raw(refresh, max_age)
         return self.raw_to_structured(self._raw_data)
 
 
@@ -686,20 +1194,21 @@ class BaseShadeTilt(BaseShade):
         data = self._create_shade_data(position_data=position_data)
         return await self._move(data)
 
-    async def tilt(self, position_data: ShadePosition):
-        """Tilt the shade to a set position."""
+    async def tilt(self, position_data: ShadePosition, force: bool = False):
+        """Tilt the shade to a set position.
+
+        :param force: Send the move even if the shade is at the position.
+        """
         _LOGGER.debug("Shade %s move to: %s", self.name, position_data)
-        data = self.structured_to_raw(position_data)
-        await self._move(data)
-        return self.current_position
+        return await self._move_structured("BaseShade.tilt", position_data, force)
 
-    async def tilt_open(self):
+    async def tilt_open(self, force: bool = False):
         """Tilt to open position."""
-        return await self.tilt(position_data=self.open_position_tilt)
+        return await self.tilt(position_data=self.open_position_tilt, force=force)
 
-    async def tilt_close(self):
+    async def tilt_close(self, force: bool = False):
         """Tilt to close position."""
-        return await self.tilt(position_data=self.close_position_tilt)
+        return await self.tilt(position_data=self.close_position_tilt, force=force)
 
     def get_additional_positions(self, positions: ShadePosition) -> ShadePosition:
         """Return additional positions not reported by the hub."""
@@ -856,7 +1365,9 @@ class ShadeBottomUpTiltAnywhere(BaseShadeTilt):
         self._close_position_tilt = ShadePosition(tilt=MIN_POSITION)
         if self.api_version < 3:
             self._open_position = ShadePosition(primary=MAX_POSITION, tilt=MID_POSITION)
-            self._close_position = ShadePosition(primary=MIN_POSITION, tilt=MIN_POSITION)
+            self._close_position = ShadePosition(
+                primary=MIN_POSITION, tilt=MIN_POSITION
+            )
             self._open_position_tilt = ShadePosition(tilt=MID_POSITION)
 
 
@@ -1184,13 +1695,37 @@ class ShadeDualOverlappedIlluminated(ShadeDualOverlapped):
     )
 
 
-def factory(raw_data: dict, request: AioRequest):
-    """Class factory to create different shade types."""
+SHADE_CLASSES: tuple[type[BaseShade], ...] = (
+    ShadeBottomUp,
+    ShadeBottomUpTiltOnClosed90,
+    ShadeBottomUpTiltOnClosed180,  # to ensure capability match order here is important
+    ShadeBottomUpTiltAnywhere,
+    ShadeVerticalTiltAnywhere,
+    ShadeVertical,
+    ShadeTiltOnly,
+    ShadeTopDown,
+    ShadeTopDownBottomUp,
+    ShadeDualOverlapped,
+    ShadeDualOverlappedTilt90,
+    ShadeDualOverlappedTilt180,
+    ShadeDualOverlappedIlluminated,
+)
+
+
+def factory(raw_data: dict | ShadeRecord, request: AioRequest):
+    """Class factory to create different shade types.
 
-    if ATTR_SHADE in raw_data:
-        raw_data = raw_data.get(ATTR_SHADE)
+    :param raw_data: The raw dict of the shade or its typed ShadeRecord.
+    """
 
-    raw_type = raw_data.get(ATTR_TYPE)
+    if isinstance(raw_data, ShadeRecord):
+        raw_type = raw_data.type
+        shade_capability = raw_data.capabilities
+    else:
+        if ATTR_SHADE in raw_data:
+            raw_data = raw_data.get(ATTR_SHADE)
+        raw_type = raw_data.get(ATTR_TYPE)
+        shade_capability = raw_data.get(ATTR_CAPABILITIES)
 
     def find_type(shade: BaseShade):
         for type_def in shade.shade_types:
@@ -1198,37 +1733,19 @@ def factory(raw_data: dict, request: AioRequest):
                 return shade(raw_data, type_def, request)
         return None
 
-    shade_capability = raw_data.get(ATTR_CAPABILITIES)
-
     def find_capability(shade: BaseShade):
         if shade.capability.type == shade_capability:
             return shade(raw_data, shade, request)
         return None
 
-    classes = [
-        ShadeBottomUp,
-        ShadeBottomUpTiltOnClosed90,
-        ShadeBottomUpTiltOnClosed180,  # to ensure capability match order here is important
-        ShadeBottomUpTiltAnywhere,
-        ShadeVerticalTiltAnywhere,
-        ShadeVertical,
-        ShadeTiltOnly,
-        ShadeTopDown,
-        ShadeTopDownBottomUp,
-        ShadeDualOverlapped,
-        ShadeDualOverlappedTilt90,
-        ShadeDualOverlappedTilt180,
-        ShadeDualOverlappedIlluminated,
-    ]
-
-    for cls in classes:
+    for cls in SHADE_CLASSES:
         # class check is more concise as we have tested positioning
         _shade = find_type(cls)
         if _shade:
             _LOGGER.debug("Shade match on type: %s - %s", _shade, raw_data)
             return _shade
 
-    for cls in classes:
+    for cls in SHADE_CLASSES:
         # fallback to a capability check - this should future proof new shades
         # type 0 that contain tilt would not be caught here
         _shade = find_capability(cls)
@@ -5,7 +5,7 @@ from __future__ import annotations
 from dataclasses import fields
 from typing import Any
 
-from aiopvapi.helpers.tools import map_data_by_id
+from aiopvapi.helpers.tools import map_data_by_id, next_sequence
 
 from .model import PowerviewData
 from .shade import BaseShade, ShadePosition
@@ -28,6 +28,10 @@ class PowerviewShadeData:
         self._raw_data_by_id: dict[int, dict[str | int, Any]] = {}
         self._shade_group_data_by_id: dict[int, BaseShade] = {}
         self.positions: dict[int, ShadePosition] = {}
+        # next_sequence() of the stored group data and of the last update of
+        # the positions of every shade, older data arriving late is ignored
+        self._group_sequence = 0
+        self._position_sequences: dict[int, int] = {}
 
     def get_raw_data(self, shade_id: int) -> dict[str | int, Any]:
         """Get data for the shade."""
@@ -52,9 +56,15 @@ class PowerviewShadeData:
         return self.positions[shade_id]
 
     def update_from_group_data(self, shade_id: int) -> None:
-        """Process an update from the group data."""
+        """Process an update from the group data.
+
+        Positions updated after the group data was requested are kept.
+        """
+        if self._position_sequences.get(shade_id, 0) > self._group_sequence:
+            return
         data = self._shade_group_data_by_id[shade_id]
         copy_position_data(data.current_position, self.get_shade_position(data.id))
+        self._position_sequences[shade_id] = self._group_sequence
 
     def store_group_data(self, shade_data: PowerviewData) -> None:
         """Store data from the all shades endpoint.
@@ -63,13 +73,36 @@ class PowerviewShadeData:
         as the data may be stale. update_from_group_data
         with a shade_id will update a specific shade
         from the group data.
+
+        Group data requested before the stored one is ignored.
         """
+        sequence = shade_data.sequence
+        if sequence is None:
+            sequence = next_sequence()
+        elif sequence < self._group_sequence:
+            return
+        self._group_sequence = sequence
         self._shade_group_data_by_id = shade_data.processed
+        # the shades of this group data, the raw store may hold others since
         self._raw_data_by_id = map_data_by_id(shade_data.raw)
 
-    def update_shade_position(self, shade_id: int, new_position: ShadePosition) -> None:
-        """Update a single shades position."""
+    def update_shade_position(
+        self,
+        shade_id: int,
+        new_position: ShadePosition,
+        sequence: int | None = None,
+    ) -> None:
+        """Update a single shades position.
+
+        :param sequence: next_sequence() when the position was requested,
+                    defaults to now. Older than the last update is ignored.
+        """
+        if sequence is None:
+            sequence = next_sequence()
+        elif sequence < self._position_sequences.get(shade_id, 0):
+            return
         copy_position_data(new_position, self.get_shade_position(shade_id))
+        self._position_sequences[shade_id] = sequence
 
     def update_shade_velocity(self, shade_id: int, shade_data: ShadePosition) -> None:
         """Update a single shades velocity."""
@@ -0,0 +1,376 @@
+"""History of the battery, signal and positions of the shades of a hub.
+
+Telemetry is off by default. Enable it per hub::
+
+    from aiopvapi.resources import telemetry
+
+    recorder = telemetry.enable(request)
+    ...
+    recorder.window(shade_id, telemetry.METRIC_BATTERY, 7 * 86400).min
+    recorder.rate(shade_id, telemetry.METRIC_BATTERY, 7 * 86400)
+
+Every state the hub reports for a shade (lists of shades and polls,
+refreshes, battery refreshes and events) is recorded, commands are not.
+Samples are kept in ring buffers per shade and metric backed by arrays
+(12 bytes a sample), along with tiers of minute and hour aggregates
+reaching further back. Queries over a window use the finest tier covering
+it.
+
+The samples can also be appended to a file (``enable(request, path=...)``)
+and loaded back with TelemetryRecorder.load(). They are written in batches,
+the last one when telemetry is disabled or the request is dropped.
+"""
+
+from array import array
+from collections.abc import Iterator
+from dataclasses import dataclass
+import os
+import struct
+import time
+import weakref
+
+from aiopvapi.helpers.aiorequest import AioRequest
+
+METRIC_BATTERY = "battery"  # get_battery_strength(), percent
+METRIC_SIGNAL = "signal"  # get_signal_strength()
+# positions in percent of the range reported by the hub
+METRIC_PRIMARY = "primary"
+METRIC_SECONDARY = "secondary"
+METRIC_TILT = "tilt"
+# the index of a metric is its code in files, only ever append
+METRICS = (METRIC_BATTERY, METRIC_SIGNAL, METRIC_PRIMARY, METRIC_SECONDARY, METRIC_TILT)
+_METRIC_CODES = {metric: code for code, metric in enumerate(METRICS)}
+
+# raw samples kept per shade and metric
+RAW_CAPACITY = 256
+# (seconds, buckets kept) of the aggregated tiers: a day of minutes and
+# a month of hours
+TIERS = ((60, 1440), (3600, 720))
+
+# file format: a header, then records of time, shade id, metric code, value
+FILE_HEADER = b"PVTELEM1"
+_RECORD = struct.Struct("<dIBf")
+# bytes of samples buffered before they are written to the file
+FLUSH_BYTES = 16384
+
+
+@dataclass(frozen=True)
+class Sample:
+    """A value of a metric and when it was recorded."""
+
+    time: float  # time.time()
+    value: float
+
+
+@dataclass(frozen=True)
+class WindowStats:
+    """Statistics of a metric over a window, to the resolution of its tier."""
+
+    count: int
+    min: float
+    max: float
+    avg: float
+    first: Sample
+    last: Sample
+
+
+class _Ring:
+    """Columns of arrays used as a ring buffer, ordered by the first column."""
+
+    __slots__ = ("capacity", "columns", "size", "head", "tail", "dropped")
+
+    def __init__(self, capacity: int, typecodes: str) -> None:
+        self.capacity = capacity
+        self.columns = tuple(array(typecode) for typecode in typecodes)
+        self.size = 0
+        # physical index of the oldest row once the ring is full
+        self.head = 0
+        # physical index of the newest row
+        self.tail = 0
+        # rows were overwritten, the ring does not reach back to the start
+        self.dropped = False
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, *row) -> None:
+        if self.size < self.capacity:
+            for column, value in zip(self.columns, row):
+                column.append(value)
+            self.tail = self.size
+            self.size += 1
+            return
+        for column, value in zip(self.columns, row):
+            column[self.head] = value
+        self.tail = self.head
+        self.head = (self.head + 1) % self.capacity
+        self.dropped = True
+
+    def physical(self, index: int) -> int:
+        """Return the physical index of the logical (oldest first) index."""
+        return (self.head + index) % self.size
+
+    def bisect(self, when: float) -> int:
+        """Return the logical index of the first row at or after when."""
+        times = self.columns[0]
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if times[self.physical(middle)] < when:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def rows(self, start: int) -> Iterator[int]:
+        """Return the physical indexes from the logical index start."""
+        size = self.size
+        return ((self.head + index) % size for index in range(start, size))
+
+
+class Series:
+    """Samples of a metric of a shade: raw and aggregated by minute and hour."""
+
+    __slots__ = ("raw", "tiers")
+
+    def __init__(self, capacity: int = RAW_CAPACITY, tiers=TIERS) -> None:
+        """Initialize an empty series."""
+        # time, value
+        self.raw = _Ring(capacity, "df")
+        # (seconds, bucket start, min, max, total, count)
+        self.tiers = tuple(
+            (seconds, _Ring(buckets, "dffdI")) for seconds, buckets in tiers
+        )
+
+    def add(self, when: float, value: float) -> None:
+        """Add a sample, samples older than the last one are taken as its time."""
+        raw = self.raw
+        if raw.size and when < (last := raw.columns[0][raw.tail]):
+            when = last
+        raw.append(when, value)
+        for seconds, ring in self.tiers:
+            start = when - when % seconds
+            starts, low, high, total, count = ring.columns
+            if not ring.size or starts[index := ring.tail] < start:
+                ring.append(start, value, value, value, 1)
+                continue
+            if value < low[index]:
+                low[index] = value
+            elif value > high[index]:
+                high[index] = value
+            total[index] += value
+            count[index] += 1
+
+    def last(self) -> Sample | None:
+        """Return the last sample."""
+        if not self.raw.size:
+            return None
+        times, values = self.raw.columns
+        return Sample(times[self.raw.tail], values[self.raw.tail])
+
+    def window(self, start: float) -> WindowStats | None:
+        """Return the statistics of the samples since start, None if none.
+
+        The raw samples are used when they reach back to start, else the
+        first tier of aggregates that does (or the coarsest). Aggregates
+        count from the start of the bucket holding start.
+        """
+        raw = self.raw
+        if not raw.dropped or raw.columns[0][raw.head] <= start:
+            first = raw.bisect(start)
+            if first == raw.size:
+                return None
+            times, values = raw.columns
+            rows = list(raw.rows(first))
+            selected = [values[index] for index in rows]
+            return WindowStats(
+                count=len(rows),
+                min=min(selected),
+                max=max(selected),
+                avg=sum(selected) / len(rows),
+                first=Sample(times[rows[0]], values[rows[0]]),
+                last=Sample(times[rows[-1]], values[rows[-1]]),
+            )
+        for seconds, ring in self.tiers:
+            if not ring.dropped or ring.columns[0][ring.head] <= start:
+                break
+        first = ring.bisect(start - start % seconds)
+        if first == ring.size:
+            return None
+        starts, low, high, total, count = ring.columns
+        rows = list(ring.rows(first))
+        samples = sum(count[index] for index in rows)
+        return WindowStats(
+            count=samples,
+            min=min(low[index] for index in rows),
+            max=max(high[index] for index in rows),
+            avg=sum(total[index] for index in rows) / samples,
+            first=Sample(starts[rows[0]], total[rows[0]] / count[rows[0]]),
+            last=self.last(),
+        )
+
+
+def _open_file(path: str) -> None:
+    """Prepare a file for samples to be appended to.
+
+    A new or empty file gets the header, a record cut short at the end of
+    an existing one is dropped.
+
+    :raises ValueError when the file is not a telemetry file.
+    """
+    if not os.path.exists(path) or not (size := os.path.getsize(path)):
+        with open(path, "wb") as file:
+            file.write(FILE_HEADER)
+        return
+    with open(path, "rb") as file:
+        if file.read(len(FILE_HEADER)) != FILE_HEADER:
+            raise ValueError(f"{path} is not a telemetry file")
+    if cut := (size - len(FILE_HEADER)) % _RECORD.size:
+        os.truncate(path, size - cut)
+
+
+class TelemetryRecorder:
+    """Series of the metrics of the shades of a hub."""
+
+    def __init__(self, path: str | None = None) -> None:
+        """Initialize the recorder.
+
+        :param path: Append the samples to this file.
+        :raises ValueError when the file is not a telemetry file.
+        """
+        self.series: dict[tuple[int, str], Series] = {}
+        self.path = path
+        self._pending = bytearray()
+        if path is not None:
+            _open_file(path)
+
+    def record(
+        self, shade_id: int, metric: str, value: float, when: float | None = None
+    ) -> None:
+        """Record a value of a metric of a shade.
+
+        :param when: time.time() of the value, defaults to now.
+        """
+        if when is None:
+            when = time.time()
+        key = (shade_id, metric)
+        if (series := self.series.get(key)) is None:
+            series = self.series[key] = Series()
+        series.add(when, value)
+        if self.path is not None:
+            self._pending += _RECORD.pack(when, shade_id, _METRIC_CODES[metric], value)
+            if len(self._pending) >= FLUSH_BYTES:
+                self.flush()
+
+    def flush(self) -> None:
+        """Write the samples recorded since the last flush to the file."""
+        if self.path is None or not self._pending:
+            return
+        with open(self.path, "ab") as file:
+            file.write(self._pending)
+        self._pending.clear()
+
+    @classmethod
+    def load(cls, path: str, append: bool = False) -> "TelemetryRecorder":
+        """Return a recorder holding the samples of a file.
+
+        :param append: Keep appending the samples recorded to the file.
+        :raises ValueError when the file is not a telemetry file.
+        """
+        recorder = cls()
+        with open(path, "rb") as file:
+            if file.read(len(FILE_HEADER)) != FILE_HEADER:
+                raise ValueError(f"{path} is not a telemetry file")
+            data = file.read()
+        # a record cut short by a crash is left out
+        end = len(data) - len(data) % _RECORD.size
+        for when, shade_id, code, value in _RECORD.iter_unpack(data[:end]):
+            key = (shade_id, METRICS[code])
+            if (series := recorder.series.get(key)) is None:
+                series = recorder.series[key] = Series()
+            series.add(when, value)
+        if append:
+            _open_file(path)
+            recorder.path = path
+        return recorder
+
+    def shade_ids(self) -> set[int]:
+        """Return the ids of the shades with samples."""
+        return {shade_id for shade_id, _ in self.series}
+
+    def last(self, shade_id: int, metric: str) -> Sample | None:
+        """Return the last sample of a metric of a shade."""
+        if (series := self.series.get((shade_id, metric))) is None:
+            return None
+        return series.last()
+
+    def window(
+        self, shade_id: int, metric: str, seconds: float, now: float | None = None
+    ) -> WindowStats | None:
+        """Return the statistics of a metric over the last seconds.
+
+        None when there is no sample in the window.
+
+        :param now: time.time() the window ends at, defaults to now.
+        """
+        if (series := self.series.get((shade_id, metric))) is None:
+            return None
+        return series.window((time.time() if now is None else now) - seconds)
+
+    def rate(
+        self, shade_id: int, metric: str, seconds: float, now: float | None = None
+    ) -> float | None:
+        """Return the change of a metric per hour over the last seconds.
+
+        From the first to the last sample of the window, None when they do
+        not span any time.
+        """
+        stats = self.window(shade_id, metric, seconds, now)
+        if stats is None or stats.last.time <= stats.first.time:
+            return None
+        elapsed = stats.last.time - stats.first.time
+        return (stats.last.value - stats.first.value) / elapsed * 3600
+
+
+# recorders by request (hub)
+_RECORDERS: weakref.WeakKeyDictionary[AioRequest, TelemetryRecorder] = (
+    weakref.WeakKeyDictionary()
+)
+# flushing the files of the recorders when their request is dropped
+_FINALIZERS: weakref.WeakKeyDictionary[AioRequest, weakref.finalize] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def enable(request: AioRequest, path: str | None = None) -> TelemetryRecorder:
+    """Record the telemetry of the shades of a hub, return its recorder.
+
+    :param path: Append the samples to this file (see TelemetryRecorder).
+    :raises ValueError when the hub already records to another file (or
+                none), or the file is not a telemetry file.
+    """
+    if (recorder := _RECORDERS.get(request)) is None:
+        recorder = _RECORDERS[request] = TelemetryRecorder(path)
+        if path is not None:
+            _FINALIZERS[request] = weakref.finalize(request, recorder.flush)
+    elif path is not None and path != recorder.path:
+        raise ValueError(
+            f"Telemetry of the hub is recorded to {recorder.path or 'no file'},"
+            " disable it first"
+        )
+    return recorder
+
+
+def disable(request: AioRequest) -> None:
+    """Stop recording the telemetry of a hub, flushing its file."""
+    if (finalizer := _FINALIZERS.pop(request, None)) is not None:
+        finalizer.detach()
+    if (recorder := _RECORDERS.pop(request, None)) is not None:
+        recorder.flush()
+
+
+def recorder(request: AioRequest) -> TelemetryRecorder | None:
+    """Return the recorder of a hub, None when telemetry is disabled."""
+    if not _RECORDERS:
+        return None
+    return _RECORDERS.get(request)
@@ -7,13 +7,13 @@ from aiopvapi.helpers.api_base import ApiEntryPoint
 from aiopvapi.helpers.constants import (
     ATTR_COLOR_ID,
     ATTR_ICON_ID,
-    ATTR_ID,
     ATTR_NAME,
     ATTR_ROOM,
     ATTR_ROOM_DATA,
 )
 from aiopvapi.helpers.tools import unicode_to_base64
 from aiopvapi.resources.model import PowerviewData
+from aiopvapi.resources.records import RoomRecord
 from aiopvapi.resources.room import Room
 
 _LOGGER = logging.getLogger(__name__)
@@ -23,6 +23,7 @@ class Rooms(ApiEntryPoint):
     """Rooms entry point."""
 
     api_endpoint = "rooms"
+    record_type = RoomRecord
 
     def __init__(self, request: AioRequest) -> None:
         """Initialize the rooms."""
@@ -54,18 +55,19 @@ class Rooms(ApiEntryPoint):
             return raw
         return raw.get("room")
 
-    async def get_rooms(self, **kwargs) -> PowerviewData:
+    async def get_rooms(self, typed: bool = False, **kwargs) -> PowerviewData:
         """Get a list of rooms.
 
+        :param typed: Create the rooms from typed records.
         :returns PowerviewData object
         :raises PvApiError when an error occurs.
         """
+        if typed:
+            return await self.get_typed_data(**kwargs)
         resources = await self.get_resources(**kwargs)
         if self.api_version < 3:
             resources = resources[ATTR_ROOM_DATA]
 
         _LOGGER.debug("Raw rooms data: %s", resources)
 
-        processed = {entry[ATTR_ID]: Room(entry, self.request) for entry in resources}
-
-        return PowerviewData(raw=resources, processed=processed)
+        return self._stored_data(resources, complete=not kwargs.get("params"))
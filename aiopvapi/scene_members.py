@@ -5,13 +5,13 @@ import logging
 from aiopvapi.helpers.aiorequest import AioRequest
 from aiopvapi.helpers.api_base import ApiEntryPoint
 from aiopvapi.helpers.constants import (
-    ATTR_ID,
     ATTR_POSITIONS,
     ATTR_SCENE_ID,
     ATTR_SHADE_ID,
     SCENE_MEMBER_DATA,
 )
 from aiopvapi.resources.model import PowerviewData
+from aiopvapi.resources.records import SceneMemberRecord
 from aiopvapi.resources.scene_member import ATTR_SCENE_MEMBER, SceneMember
 
 _LOGGER = logging.getLogger("__name__")
@@ -21,6 +21,7 @@ class SceneMembers(ApiEntryPoint):
     """A scene member is a device, like a shade, being a member of a specific scene."""
 
     api_endpoint = "sceneMembers"
+    record_type = SceneMemberRecord
 
     def __init__(self, request: AioRequest) -> None:
         """Initialize SceneMembers."""
@@ -64,19 +65,18 @@ class SceneMembers(ApiEntryPoint):
             params={ATTR_SCENE_ID: scene_id, ATTR_SHADE_ID: shade_id},
         )
 
-    async def get_scene_members(self, **kwargs) -> PowerviewData:
+    async def get_scene_members(self, typed: bool = False, **kwargs) -> PowerviewData:
         """Get a list of scene members.
 
+        :param typed: Create the scene members from typed records.
         :raises PvApiError when an error occurs.
         """
+        if typed:
+            return await self.get_typed_data(**kwargs)
         resources = await self.get_resources(**kwargs)
         if self.api_version < 3:
             resources = resources[SCENE_MEMBER_DATA]
 
         _LOGGER.debug("Raw scene_member data: %s", resources)
 
-        processed = {
-            entry[ATTR_ID]: SceneMember(entry, self.request) for entry in resources
-        }
-
-        return PowerviewData(raw=resources, processed=processed)
+        return self._stored_data(resources, complete=not kwargs.get("params"))
@@ -7,13 +7,13 @@ from aiopvapi.helpers.api_base import ApiEntryPoint
 from aiopvapi.helpers.constants import (
     ATTR_COLOR_ID,
     ATTR_ICON_ID,
-    ATTR_ID,
     ATTR_NAME,
     ATTR_ROOM_ID,
     ATTR_SCENE_DATA,
 )
 from aiopvapi.helpers.tools import unicode_to_base64
 from aiopvapi.resources.model import PowerviewData
+from aiopvapi.resources.records import SceneRecord
 from aiopvapi.resources.scene import Scene
 
 _LOGGER = logging.getLogger(__name__)
@@ -23,6 +23,7 @@ class Scenes(ApiEntryPoint):
     """Powerview Scenes."""
 
     api_endpoint = "scenes"
+    record_type = SceneRecord
 
     def __init__(self, request: AioRequest) -> None:
         """Initialize Scenes."""
@@ -52,11 +53,14 @@ class Scenes(ApiEntryPoint):
             return resources[ATTR_SCENE_DATA]
         return resources
 
-    async def get_scenes(self, **kwargs) -> PowerviewData:
+    async def get_scenes(self, typed: bool = False, **kwargs) -> PowerviewData:
         """Get a list of scenes.
 
+        :param typed: Create the scenes from typed records.
         :raises PvApiError when an error occurs.
         """
+        if typed:
+            return await self.get_typed_data(**kwargs)
         resources = await self.get_resources(**kwargs)
         if self.api_version < 3:
             resources = resources[ATTR_SCENE_DATA]
@@ -64,9 +68,7 @@ class Scenes(ApiEntryPoint):
         _LOGGER.debug("Raw scenes data: %s", resources)
 
         # return array of scenes attached to a shade
-        processed = {entry[ATTR_ID]: Scene(entry, self.request) for entry in resources}
-
-        return PowerviewData(raw=resources, processed=processed)
+        return self._stored_data(resources, complete=not kwargs.get("params"))
 
     async def create_scene(self, room_id, name, color_id=0, icon_id=0):
         """Create an empty scene.
@@ -1,6 +1,10 @@
 """Scenes class managing all scene data."""
 
+import asyncio
+from collections.abc import Iterable, Mapping
 import logging
+import time
+import weakref
 
 from aiopvapi.helpers.aiorequest import AioRequest
 from aiopvapi.helpers.api_base import ApiEntryPoint
@@ -10,21 +14,33 @@ from aiopvapi.helpers.constants import (
     ATTR_NAME_UNICODE,
     ATTR_SHADE_DATA,
 )
-from aiopvapi.helpers.tools import base64_to_unicode
+from aiopvapi.helpers.tools import base64_to_name, next_sequence
+from aiopvapi.helpers.tracing import ATTR_COUNT, span
 from aiopvapi.resources import shade
 from aiopvapi.resources.model import PowerviewData
+from aiopvapi.resources.records import ShadeRecord
 
 _LOGGER = logging.getLogger(__name__)
 
+# cost of a request (round trip, headers) in shades of a list response
+BULK_REQUEST_COST = 20
+
+# whether a hub answers GET /home/shades?ids= with the listed shades only,
+# learned from the first answer
+_IDS_FILTER: weakref.WeakKeyDictionary[AioRequest, bool] = weakref.WeakKeyDictionary()
+
 
 class Shades(ApiEntryPoint):
     """Shades entry point."""
 
     api_endpoint = "shades"
+    record_type = ShadeRecord
 
     def __init__(self, request: AioRequest) -> None:
         """Initialize the shades."""
         super().__init__(request, self.api_endpoint)
+        # stamp of the last list stored, shared by all its shades
+        self._list_stamp: shade.StateStamp | None = None
 
     def _sanitize_resources(self, resources: dict) -> dict | None:
         """Clean up incoming shade data.
@@ -39,13 +55,45 @@ class Shades(ApiEntryPoint):
             for _shade in resources:
                 _name = _shade.get(ATTR_NAME)
                 if _name:
-                    _shade[ATTR_NAME_UNICODE] = base64_to_unicode(_name)
+                    _shade[ATTR_NAME_UNICODE] = base64_to_name(_name)
         except (KeyError, TypeError):
             _LOGGER.debug("No shade data available")
             return None
         else:
             return resources
 
+    def _store_raw(self, raw: dict, sequence: int | None, fetched: float) -> dict:
+        """Store the raw data of a shade, keeping its newer state.
+
+        The parts of the state of a stored shade updated by a later request
+        (ie a move sent while the list was on its way) are kept.
+        """
+        # only shades created since have stamps, the others were last
+        # updated by an older list
+        shade_id = raw[ATTR_ID]
+        stamps = self.raw_store.stamps(shade_id, create=False)
+        newer = []
+        if stamps is not None:
+            stamp = shade.StateStamp(fetched, shade.SOURCE_POLL, sequence or 0)
+            if stamp == self._list_stamp:
+                stamp = self._list_stamp
+            else:
+                self._list_stamp = stamp
+            record = self.raw_store.get(shade_id)
+            raw, newer = shade.merge_state(
+                record, raw, lambda part: stamps.get(part, stamp), stamp
+            )
+            for part in shade.STATE_KEYS:
+                if part not in newer:
+                    stamps[part] = stamp
+        shade.record_telemetry(
+            self.request,
+            shade_id,
+            raw,
+            [part for part in shade.STATE_KEYS if part not in newer],
+        )
+        return self.raw_store.put(raw)
+
     def _resource_factory(self, raw):
         return shade.factory(raw, self.request)
 
@@ -60,23 +108,96 @@ class Shades(ApiEntryPoint):
             return raw
         return raw.get("shade")
 
-    async def get_shades(self, **kwargs) -> PowerviewData:
+    async def get_shades(self, typed: bool = False, **kwargs) -> PowerviewData:
         """Get a list of shades.
 
+        :param typed: Create the shades from typed records, leaving the raw
+                    data untouched.
         :returns PowerviewData object
         :raises PvApiError when an error occurs.
         """
-        resources = await self.get_resources(**kwargs)
-        if self.api_version < 3:
-            resources = resources[ATTR_SHADE_DATA]
-
-        _LOGGER.debug("Raw shades data: %s", resources)
-
-        processed = {
-            entry[ATTR_ID]: shade.factory(entry, self.request) for entry in resources
-        }
-
-        return PowerviewData(raw=resources, processed=processed)
+        with span("Shades.get_shades", self.request) as trace:
+            if typed:
+                data = await self.get_typed_data(**kwargs)
+                trace.set_attribute(ATTR_COUNT, len(data.processed))
+                return data
+            sequence = next_sequence()
+            resources = await self.get_resources(**kwargs)
+            if self.api_version < 3:
+                resources = resources[ATTR_SHADE_DATA]
+
+            _LOGGER.debug("Raw shades data: %s", resources)
+
+            with span("factory", self.request):
+                data = self._stored_data(resources, sequence, not kwargs.get("params"))
+            trace.set_attribute(ATTR_COUNT, len(data.processed))
+
+        return data
+
+    async def refresh_many(
+        self,
+        ids: Iterable[int],
+        shades: Mapping[int, shade.BaseShade],
+        **kwargs,
+    ) -> None:
+        """Refresh a subset of the shades with as few requests as possible.
+
+        Gen 3 hubs filtering the list of shades by id are asked for the
+        subset in one request. Otherwise the list of all shades is fetched
+        when cheaper than refreshing the shades one by one, judged from
+        the size of the subset and of the home (BULK_REQUEST_COST).
+        The shades are updated in place.
+
+        :param ids: Ids of the shades to refresh.
+        :param shades: The shades of the home by id, ie
+                    get_shades().processed.
+        :param kwargs: Keyword arguments to be passed to the get requests.
+        :raises PvApiError when an error occurs.
+        """
+        ids = {shade_id for shade_id in ids if shade_id in shades}
+        if not ids:
+            return
+        with span("Shades.refresh_many", self.request) as trace:
+            trace.set_attribute(ATTR_COUNT, len(ids))
+            filtering = _IDS_FILTER.get(self.request)
+            if self.api_version >= 3 and filtering is not False:
+                await self._refresh_listed(ids, shades, ids, **kwargs)
+                return
+            separate = len(ids) * (BULK_REQUEST_COST + 1)
+            if separate < BULK_REQUEST_COST + len(shades):
+                await asyncio.gather(
+                    *(shades[shade_id].refresh(**kwargs) for shade_id in ids)
+                )
+                return
+            await self._refresh_listed(ids, shades, **kwargs)
+
+    async def _refresh_listed(
+        self,
+        ids: set[int],
+        shades: Mapping[int, shade.BaseShade],
+        ids_filter: set[int] | None = None,
+        **kwargs,
+    ) -> None:
+        """Update shades from the list of shades, filtered by ids_filter."""
+        params = None
+        if ids_filter is not None:
+            params = {"ids": ",".join(str(shade_id) for shade_id in sorted(ids))}
+        sequence = next_sequence()
+        resources = await self.request.get(self.base_path, params, **kwargs)
+        issued = shade.StateStamp(time.monotonic(), shade.SOURCE_POLL, sequence)
+        resources = self._sanitize_resources(resources) or []
+        if ids_filter is not None and self.request not in _IDS_FILTER:
+            listed = {raw[ATTR_ID] for raw in resources}
+            _IDS_FILTER[self.request] = listed <= ids_filter
+            _LOGGER.debug(
+                "Hub %s filters shades by id: %s",
+                self.request.hub_ip,
+                _IDS_FILTER[self.request],
+            )
+        for raw in resources:
+            if (shade_id := raw[ATTR_ID]) in ids:
+                shades[shade_id]._apply_state(raw, shade.STATE_KEYS, issued)
+                shades[shade_id]._observe_motion()
 
         # async def get_shade(self, shade_id: int):
 
@@ -0,0 +1,429 @@
+"""Sharded fleet distributing PowerView hubs over worker processes.
+
+Every worker process runs its own event loop and HubFleet. The parent
+only routes commands to the worker owning a hub and merges the compact
+json deltas the workers send back, so decoding, shade construction and
+position conversion are spread over all worker processes.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass, field
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from typing import Any
+
+from aiopvapi.helpers.aiorequest import PvApiError
+
+_LOGGER = logging.getLogger(__name__)
+
+CMD_ADD_HUB = "add_hub"
+CMD_REMOVE_HUB = "remove_hub"
+CMD_RUN = "run"
+CMD_STOP = "stop"
+
+OPERATION_REFRESH = "refresh"
+OPERATION_FIRMWARE = "firmware"
+OPERATION_CLOSE_SHADES = "close_shades"
+
+
+class PvApiWorkerError(PvApiError):
+    """A fleet worker process failed."""
+
+
+def _dumps(data) -> bytes:
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def shade_summary(shade) -> dict[str, Any]:
+    """Return the compact state of a shade shipped between processes."""
+    position = shade.current_position
+    summary = {
+        "name": shade.name,
+        "room_id": shade.room_id,
+        "type": shade.type_id,
+        "capability": shade.capability.type,
+        "position": [position.primary, position.secondary, position.tilt],
+    }
+    if shade.has_battery_info():
+        summary["battery"] = shade.get_battery_strength()
+    if shade.has_signal_strength():
+        summary["signal"] = shade.get_signal_strength()
+    return summary
+
+
+def shade_delta(
+    previous: dict[int, dict] | None, current: dict[int, dict]
+) -> dict[str, Any]:
+    """Return the changes between two shade summary snapshots.
+
+    Without a previous snapshot the delta is a full snapshot.
+    """
+    if previous is None:
+        return {"full": True, "changed": list(current.items()), "removed": []}
+    return {
+        "full": False,
+        "changed": [
+            [shade_id, summary]
+            for shade_id, summary in current.items()
+            if previous.get(shade_id) != summary
+        ],
+        "removed": [shade_id for shade_id in previous if shade_id not in current],
+    }
+
+
+def apply_shade_delta(state: dict[int, dict], delta: dict[str, Any]) -> None:
+    """Merge a shade delta into a shade summary snapshot."""
+    if delta["full"]:
+        state.clear()
+    for shade_id, summary in delta["changed"]:
+        state[shade_id] = summary
+    for shade_id in delta["removed"]:
+        state.pop(shade_id, None)
+
+
+class _ShardWorker:
+    """Worker side of a shard, running inside the worker process."""
+
+    def __init__(self, conn, fleet_kwargs: dict) -> None:
+        self.conn = conn
+        self.fleet_kwargs = fleet_kwargs
+        self.fleet = None
+        self.snapshots: dict[str, dict[int, dict]] = {}
+
+    async def serve(self) -> None:
+        # imported here so the parent process never loads the fleet stack
+        from aiopvapi.fleet import HubFleet  # pylint: disable=import-outside-toplevel
+
+        self.fleet = HubFleet(**self.fleet_kwargs)
+        loop = asyncio.get_running_loop()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    message = await loop.run_in_executor(None, self.conn.recv)
+                except (EOFError, OSError):
+                    break
+                command = message[0]
+                if command == CMD_STOP:
+                    break
+                if command == CMD_ADD_HUB:
+                    _, host, api_version, tags = message
+                    self.fleet.add_hub(host, api_version=api_version, tags=tags)
+                elif command == CMD_REMOVE_HUB:
+                    self.fleet.remove_hub(message[1])
+                    self.snapshots.pop(message[1], None)
+                elif command == CMD_RUN:
+                    task = asyncio.ensure_future(self._run(*message[1:]))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await self.fleet.close()
+
+    async def _refresh(self, fleet_hub) -> dict[str, Any]:
+        await self.fleet._refresh(fleet_hub)  # pylint: disable=protected-access
+        current = {
+            shade.id: shade_summary(shade)
+            for shade in fleet_hub.shades.processed.values()
+        }
+        delta = shade_delta(self.snapshots.get(fleet_hub.host), current)
+        self.snapshots[fleet_hub.host] = current
+        hub = fleet_hub.hub
+        delta["hub"] = {
+            "name": hub.name,
+            "serial_number": hub.serial_number,
+            "firmware": hub.firmware,
+            "api_version": hub.api_version,
+        }
+        return delta
+
+    def _operation(self, name: str):
+        # pylint: disable=protected-access
+        return {
+            OPERATION_REFRESH: self._refresh,
+            OPERATION_FIRMWARE: self.fleet._firmware,
+            OPERATION_CLOSE_SHADES: self.fleet._close_shades,
+        }[name]
+
+    async def _run(self, request_id: int, name: str, hosts: list[str], timeout):
+        hubs = [self.fleet.hubs[host] for host in hosts if host in self.fleet.hubs]
+        for host in hosts:
+            if host not in self.fleet.hubs:
+                self.conn.send((request_id, host, "Hub not owned by worker", b"", 0))
+        async for result in self.fleet.run(self._operation(name), hubs, timeout):
+            error = None if result.ok else repr(result.error)
+            payload = _dumps(result.result) if result.ok else b""
+            self.conn.send((request_id, result.host, error, payload, result.duration))
+
+
+def _worker_main(conn, fleet_kwargs: dict) -> None:
+    """Entry point of a worker process."""
+    asyncio.run(_ShardWorker(conn, fleet_kwargs).serve())
+
+
+@dataclass
+class ShardResult:
+    """Result of a sharded operation on a single hub."""
+
+    host: str
+    result: Any = None
+    error: str | None = None
+    duration: float = 0
+
+    @property
+    def ok(self) -> bool:
+        """Return if the operation succeeded for this hub."""
+        return self.error is None
+
+
+@dataclass
+class _WorkerHandle:
+    index: int
+    process: Any
+    conn: Any
+    hosts: set[str] = field(default_factory=set)
+    alive: bool = True
+
+
+@dataclass
+class _PendingRun:
+    queue: asyncio.Queue
+    outstanding: dict[str, _WorkerHandle]
+    operation: str
+
+
+class ShardedFleet:
+    """Distribute a fleet of hubs over a pool of worker processes.
+
+    Each hub is owned by exactly one worker. When a worker dies its hubs
+    are handed to the remaining workers (and a replacement worker is
+    started when restart_workers is set). Shade state of refreshed hubs is
+    merged from worker deltas into self.state.
+
+    Use from within a running event loop::
+
+        async with ShardedFleet(workers=4) as fleet:
+            fleet.add_hub("192.168.1.10", tags=["building-a"])
+            async for result in fleet.refresh_all():
+                ...
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        restart_workers: bool = True,
+        **fleet_kwargs,
+    ) -> None:
+        """Initialize the sharded fleet.
+
+        :param workers: Number of worker processes, defaults to cpu count.
+        :param restart_workers: Start a replacement when a worker dies.
+        :param fleet_kwargs: Passed to the HubFleet of every worker.
+        """
+        self.worker_count = workers or os.cpu_count() or 1
+        self.restart_workers = restart_workers
+        self.fleet_kwargs = fleet_kwargs
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.state: dict[str, dict[str, Any]] = {}
+        self._context = multiprocessing.get_context("spawn")
+        self._workers: list[_WorkerHandle] = []
+        self._owner: dict[str, _WorkerHandle] = {}
+        self._hubs: dict[str, tuple[int | None, list[str]]] = {}
+        self._requests: dict[int, _PendingRun] = {}
+        self._request_id = 0
+        self._next_index = 0
+        self._closing = False
+
+    async def __aenter__(self) -> "ShardedFleet":
+        """Start the workers."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Stop the workers."""
+        await self.close()
+
+    async def start(self) -> None:
+        """Start the worker processes."""
+        self.loop = asyncio.get_running_loop()
+        for _ in range(self.worker_count):
+            self._start_worker()
+
+    async def close(self) -> None:
+        """Stop all worker processes."""
+        self._closing = True
+        for worker in self._workers:
+            try:
+                worker.conn.send((CMD_STOP,))
+            except OSError:
+                pass
+        for worker in self._workers:
+            await self.loop.run_in_executor(None, worker.process.join, 5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        self._workers.clear()
+
+    def _start_worker(self) -> _WorkerHandle:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.fleet_kwargs),
+            name=f"aiopvapi-shard-{self._next_index}",
+            daemon=True,
+        )
+        process.start()
+        # only the child keeps its end, so a dead child results in EOF
+        child_conn.close()
+        worker = _WorkerHandle(self._next_index, process, parent_conn)
+        self._next_index += 1
+        self._workers.append(worker)
+        threading.Thread(
+            target=self._reader, args=(worker,), name=process.name, daemon=True
+        ).start()
+        return worker
+
+    def _reader(self, worker: _WorkerHandle) -> None:
+        """Read worker messages in a thread and hand them to the loop."""
+        while True:
+            try:
+                message = worker.conn.recv()
+            except (EOFError, OSError):
+                break
+            self.loop.call_soon_threadsafe(self._dispatch, message)
+        self.loop.call_soon_threadsafe(self._worker_died, worker)
+
+    def _dispatch(self, message) -> None:
+        request_id, host, error, payload, duration = message
+        pending = self._requests.get(request_id)
+        if pending is None or pending.outstanding.pop(host, None) is None:
+            return
+        result = None
+        if error is None:
+            result = json.loads(payload)
+            if pending.operation == OPERATION_REFRESH:
+                hub_state = self.state.setdefault(host, {"hub": {}, "shades": {}})
+                hub_state["hub"] = result["hub"]
+                apply_shade_delta(hub_state["shades"], result)
+        pending.queue.put_nowait(ShardResult(host, result, error, duration))
+
+    def _worker_died(self, worker: _WorkerHandle) -> None:
+        if not worker.alive or self._closing:
+            return
+        worker.alive = False
+        self._workers.remove(worker)
+        _LOGGER.warning(
+            "Fleet worker %s died, moving %s hubs", worker.index, len(worker.hosts)
+        )
+        for pending in self._requests.values():
+            for host, owner in list(pending.outstanding.items()):
+                if owner is worker:
+                    del pending.outstanding[host]
+                    pending.queue.put_nowait(
+                        ShardResult(host, error=repr(PvApiWorkerError(worker.index)))
+                    )
+        if self.restart_workers or not self._workers:
+            self._start_worker()
+        for host in worker.hosts:
+            del self._owner[host]
+            self._assign(host)
+
+    def _assign(self, host: str) -> _WorkerHandle:
+        worker = min(self._workers, key=lambda handle: len(handle.hosts))
+        api_version, tags = self._hubs[host]
+        worker.conn.send((CMD_ADD_HUB, host, api_version, tags))
+        worker.hosts.add(host)
+        self._owner[host] = worker
+        return worker
+
+    def add_hub(
+        self,
+        host: str,
+        api_version: int | None = None,
+        tags: Iterable[str] | None = None,
+    ) -> int:
+        """Add a hub to the least loaded worker.
+
+        :returns: index of the worker owning the hub.
+        """
+        if host in self._owner:
+            return self._owner[host].index
+        self._hubs[host] = (api_version, list(tags or ()))
+        return self._assign(host).index
+
+    def remove_hub(self, host: str) -> None:
+        """Remove a hub from its worker."""
+        self._hubs.pop(host, None)
+        self.state.pop(host, None)
+        if (worker := self._owner.pop(host, None)) is not None:
+            worker.hosts.discard(host)
+            worker.conn.send((CMD_REMOVE_HUB, host))
+
+    def owner(self, host: str) -> int:
+        """Return the index of the worker owning a hub."""
+        return self._owner[host].index
+
+    def select(self, tag: str | None = None) -> list[str]:
+        """Return the hubs carrying a tag, or all hubs."""
+        return [
+            host for host, (_, tags) in self._hubs.items() if tag is None or tag in tags
+        ]
+
+    async def run(
+        self,
+        operation: str,
+        hosts: Iterable[str] | None = None,
+        timeout: float | None = None,
+    ) -> AsyncIterator[ShardResult]:
+        """Route an operation to the owning workers and stream the results."""
+        hosts = self.select() if hosts is None else list(hosts)
+        self._request_id += 1
+        request_id = self._request_id
+        pending = _PendingRun(
+            asyncio.Queue(), {host: self._owner[host] for host in hosts}, operation
+        )
+        self._requests[request_id] = pending
+        by_worker: dict[int, tuple[_WorkerHandle, list[str]]] = {}
+        for host, worker in pending.outstanding.items():
+            by_worker.setdefault(worker.index, (worker, []))[1].append(host)
+        try:
+            for worker, worker_hosts in by_worker.values():
+                worker.conn.send(
+                    (CMD_RUN, request_id, operation, worker_hosts, timeout)
+                )
+            for _ in hosts:
+                yield await pending.queue.get()
+        finally:
+            del self._requests[request_id]
+
+    async def command(self, host: str, operation: str, timeout: float | None = None):
+        """Run an operation on a single hub and return its result.
+
+        :raises PvApiWorkerError when the operation failed.
+        """
+        async for result in self.run(operation, [host], timeout):
+            if not result.ok:
+                raise PvApiWorkerError(result.error)
+            return result.result
+
+    def refresh_all(
+        self, tag: str | None = None, timeout: float | None = None
+    ) -> AsyncIterator[ShardResult]:
+        """Refresh all hubs and merge their shade deltas into state."""
+        return self.run(OPERATION_REFRESH, self.select(tag), timeout)
+
+    def firmware_inventory(
+        self, tag: str | None = None, timeout: float | None = None
+    ) -> AsyncIterator[ShardResult]:
+        """Query the firmware information of every hub."""
+        return self.run(OPERATION_FIRMWARE, self.select(tag), timeout)
+
+    def close_shades(
+        self, tag: str | None = None, timeout: float | None = None
+    ) -> AsyncIterator[ShardResult]:
+        """Close all shades of every hub carrying a tag."""
+        return self.run(OPERATION_CLOSE_SHADES, self.select(tag), timeout)
@@ -0,0 +1 @@
+"""Simulated PowerView hubs for offline testing and benchmarking."""
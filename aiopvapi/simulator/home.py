@@ -0,0 +1,312 @@
+"""Simulated home with rooms, moving shades, scenes and automations."""
+
+from dataclasses import dataclass, field
+import random
+
+from aiopvapi.helpers.constants import (
+    ATTR_PRIMARY,
+    ATTR_SECONDARY,
+    ATTR_TILT,
+    MAX_POSITION_V2,
+    POSKIND_PRIMARY,
+    POSKIND_SECONDARY,
+    POSKIND_TILT,
+)
+from aiopvapi.helpers.tools import unicode_to_base64
+from aiopvapi.resources.shade import SHADE_CLASSES
+
+# position axes reported by a shade, by capability
+CAPABILITY_AXES: dict[int, tuple[str, ...]] = {
+    0: (ATTR_PRIMARY,),
+    1: (ATTR_PRIMARY, ATTR_TILT),
+    2: (ATTR_PRIMARY, ATTR_TILT),
+    3: (ATTR_PRIMARY,),
+    4: (ATTR_PRIMARY, ATTR_TILT),
+    5: (ATTR_TILT,),
+    6: (ATTR_PRIMARY,),
+    7: (ATTR_PRIMARY, ATTR_SECONDARY),
+    8: (ATTR_PRIMARY, ATTR_SECONDARY),
+    9: (ATTR_PRIMARY, ATTR_SECONDARY, ATTR_TILT),
+    10: (ATTR_PRIMARY, ATTR_SECONDARY, ATTR_TILT),
+    11: (ATTR_PRIMARY, ATTR_SECONDARY),
+}
+
+AXIS_POSKIND = {
+    ATTR_PRIMARY: POSKIND_PRIMARY,
+    ATTR_SECONDARY: POSKIND_SECONDARY,
+    ATTR_TILT: POSKIND_TILT,
+}
+POSKIND_AXIS = {poskind: axis for axis, poskind in AXIS_POSKIND.items()}
+
+# type id used for capabilities without a known shade type
+UNKNOWN_TYPE = 999
+
+
+def shade_type_catalog() -> list[tuple[int, int]]:
+    """Return (type, capability) of every shade class of the library."""
+    catalog = []
+    for cls in SHADE_CLASSES:
+        if cls.shade_types:
+            catalog.extend(
+                (shade_type.type, cls.capability.type) for shade_type in cls.shade_types
+            )
+        else:
+            catalog.append((UNKNOWN_TYPE, cls.capability.type))
+    return catalog
+
+
+@dataclass
+class _Motion:
+    start: float
+    target: float
+    start_time: float
+    duration: float
+
+
+@dataclass
+class SimulatedShade:
+    """A shade moving over time, with its own radio latency.
+
+    Positions are fractions (0.0 - 1.0) of the full travel.
+    """
+
+    id: int
+    name: str
+    type: int
+    capability: int
+    room_id: int
+    battery_status: int = 3
+    battery_strength: int = 170
+    battery_powered: bool = True
+    signal_strength: int = 4
+    latency: float = 0.1
+    jitter: float = 0.05
+    speed: float = 0.1
+    firmware: tuple[int, int, int] = (2, 2, 54)
+    positions: dict[str, float] = field(default_factory=dict)
+    motion: dict[str, _Motion] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        """Start all axes closed."""
+        for axis in self.axes:
+            self.positions.setdefault(axis, 0.0)
+
+    @property
+    def axes(self) -> tuple[str, ...]:
+        """Return the position axes of the shade."""
+        return CAPABILITY_AXES.get(self.capability, (ATTR_PRIMARY,))
+
+    def position(self, axis: str, now: float) -> float:
+        """Return the position of an axis at a given time."""
+        if (motion := self.motion.get(axis)) is None:
+            return self.positions[axis]
+        if now >= motion.start_time + motion.duration:
+            self.positions[axis] = motion.target
+            del self.motion[axis]
+            return motion.target
+        progress = (now - motion.start_time) / motion.duration
+        return motion.start + (motion.target - motion.start) * progress
+
+    def current_positions(self, now: float) -> dict[str, float]:
+        """Return the position of every axis at a given time."""
+        return {axis: self.position(axis, now) for axis in self.axes}
+
+    def move(self, targets: dict[str, float], now: float) -> float:
+        """Start moving towards targets, returns the time the motion ends."""
+        end = now
+        for axis, target in targets.items():
+            if axis not in self.axes:
+                continue
+            target = min(max(target, 0.0), 1.0)
+            start = self.position(axis, now)
+            duration = abs(target - start) / self.speed
+            if duration == 0:
+                self.motion.pop(axis, None)
+                self.positions[axis] = target
+                continue
+            self.positions[axis] = start
+            self.motion[axis] = _Motion(start, target, now, duration)
+            end = max(end, now + duration)
+        return end
+
+    def stop(self, now: float) -> None:
+        """Stop all motion at the current position."""
+        for axis in list(self.motion):
+            self.positions[axis] = self.position(axis, now)
+            self.motion.pop(axis, None)
+
+    def is_moving(self, now: float) -> bool:
+        """Return if any axis is still travelling."""
+        for axis in list(self.motion):
+            # settles axes that reached their target
+            self.position(axis, now)
+        return bool(self.motion)
+
+    def radio_delay(self, rng: random.Random) -> float:
+        """Return the time a radio round trip to the shade takes."""
+        return max(0.0, rng.gauss(self.latency, self.jitter))
+
+    def to_v2(self, now: float) -> dict:
+        """Return the gen 2 representation of the shade."""
+        positions = {}
+        # gen 2 only reports two positions
+        for index, axis in enumerate(self.axes[:2], start=1):
+            positions[f"posKind{index}"] = AXIS_POSKIND[axis]
+            positions[f"position{index}"] = round(
+                self.position(axis, now) * MAX_POSITION_V2
+            )
+        return {
+            "id": self.id,
+            "type": self.type,
+            "capabilities": self.capability,
+            "batteryKind": 2 if self.battery_powered else 1,
+            "batteryStatus": self.battery_status,
+            "batteryStrength": self.battery_strength,
+            "name": unicode_to_base64(self.name),
+            "roomId": self.room_id,
+            "groupId": self.room_id,
+            "positions": positions,
+            "firmware": dict(
+                zip(("revision", "subRevision", "build"), self.firmware, strict=True)
+            ),
+            "signalStrength": self.signal_strength,
+        }
+
+    def to_v3(self, now: float) -> dict:
+        """Return the gen 3 representation of the shade."""
+        positions = {
+            axis: round(value, 4) for axis, value in self.current_positions(now).items()
+        }
+        positions["velocity"] = 0
+        return {
+            "id": self.id,
+            "type": self.type,
+            "capabilities": self.capability,
+            "ptName": self.name,
+            "name": unicode_to_base64(self.name),
+            "roomId": self.room_id,
+            "powerType": 0 if self.battery_powered else 1,
+            "batteryStatus": self.battery_status,
+            "signalStrength": -40 - 10 * (4 - self.signal_strength),
+            "positions": positions,
+            "firmware": dict(
+                zip(("revision", "subRevision", "build"), self.firmware, strict=True)
+            ),
+        }
+
+    def move_from_v2(self, positions: dict, now: float) -> float:
+        """Start a move from a gen 2 positions dict."""
+        targets = {}
+        for index in (1, 2):
+            poskind = positions.get(f"posKind{index}")
+            if poskind in POSKIND_AXIS and f"position{index}" in positions:
+                targets[POSKIND_AXIS[poskind]] = (
+                    positions[f"position{index}"] / MAX_POSITION_V2
+                )
+        return self.move(targets, now)
+
+    def move_from_v3(self, positions: dict, now: float) -> float:
+        """Start a move from a gen 3 positions dict."""
+        return self.move(
+            {
+                axis: float(value)
+                for axis, value in positions.items()
+                if axis in self.axes and value is not None
+            },
+            now,
+        )
+
+
+@dataclass
+class SimulatedHome:
+    """All resources of a simulated home."""
+
+    api_version: int
+    serial_number: str
+    rooms: dict[int, dict] = field(default_factory=dict)
+    shades: dict[int, SimulatedShade] = field(default_factory=dict)
+    # scene id -> scene, scene["members"] is shade id -> position fractions
+    scenes: dict[int, dict] = field(default_factory=dict)
+    automations: dict[int, dict] = field(default_factory=dict)
+
+
+def generate_home(
+    api_version: int = 3,
+    rooms: int = 4,
+    shades: int = 20,
+    scenes: int = 8,
+    automations: int = 4,
+    latency: float = 0.1,
+    jitter: float = 0.05,
+    speed: float = 0.1,
+    seed: int = 0,
+) -> SimulatedHome:
+    """Generate a home cycling through every shade type of the library.
+
+    :param latency: Mean radio latency of the shades in seconds.
+    :param jitter: Standard deviation of the radio latency.
+    :param speed: Fraction of the full travel a shade moves per second.
+    """
+    rng = random.Random(seed)
+    home = SimulatedHome(api_version, f"{rng.getrandbits(64):016X}")
+    catalog = shade_type_catalog()
+
+    for index in range(rooms):
+        room_id = 1000 + index
+        home.rooms[room_id] = {"id": room_id, "name": f"Room {index + 1}"}
+    room_ids = list(home.rooms) or [0]
+
+    for index in range(shades):
+        shade_type, capability = catalog[index % len(catalog)]
+        shade_id = 10000 + index
+        home.shades[shade_id] = SimulatedShade(
+            id=shade_id,
+            name=f"Shade {index + 1}",
+            type=shade_type,
+            capability=capability,
+            room_id=room_ids[index % len(room_ids)],
+            battery_status=rng.choice((1, 2, 3, 3, 3)),
+            battery_strength=rng.randint(120, 185),
+            battery_powered=rng.random() < 0.8,
+            signal_strength=rng.randint(1, 4),
+            latency=max(0.0, rng.gauss(latency, latency / 4)),
+            jitter=jitter,
+            speed=speed,
+        )
+
+    shade_ids = list(home.shades)
+    for index in range(scenes):
+        scene_id = 20000 + index
+        room_id = room_ids[index % len(room_ids)]
+        members = [
+            shade_id
+            for shade_id in shade_ids
+            if home.shades[shade_id].room_id == room_id
+        ]
+        home.scenes[scene_id] = {
+            "id": scene_id,
+            "name": f"Scene {index + 1}",
+            "room_id": room_id,
+            "members": {
+                shade_id: {
+                    axis: rng.choice((0.0, 0.5, 1.0))
+                    for axis in home.shades[shade_id].axes
+                }
+                for shade_id in members
+            },
+        }
+
+    scene_ids = list(home.scenes)
+    for index in range(automations if scene_ids else 0):
+        automation_id = 30000 + index
+        home.automations[automation_id] = {
+            "id": automation_id,
+            "scene_id": scene_ids[index % len(scene_ids)],
+            "enabled": rng.random() < 0.8,
+            "type": rng.choice((0, 0, 2, 6, 10, 14)),
+            "days": rng.randint(1, 127),
+            "hour": rng.randint(0, 23),
+            "minute": rng.choice((0, 15, 30, 45)),
+        }
+
+    return home
@@ -0,0 +1,645 @@
+"""Simulated PowerView hub serving the gen 2 or gen 3 api of a home.
+
+The hub answers on the same routes as a real hub, so the library (or any
+other client) can connect to it with ``AioRequest(hub.address)``. Shade
+moves take time, shade queries wait for a simulated radio round trip and
+the hub can be configured to rate limit, go into maintenance or hang.
+
+Run it with ``python -m aiopvapi.simulator.server``.
+"""
+
+import argparse
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+import json
+import logging
+import random
+
+from aiohttp import web
+
+from aiopvapi.helpers.constants import MAX_POSITION_V2
+from aiopvapi.helpers.tools import unicode_to_base64
+from aiopvapi.simulator.home import (
+    AXIS_POSKIND,
+    SimulatedHome,
+    SimulatedShade,
+    generate_home,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENTS_PATH = "/home/shades/events"
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+@dataclass
+class SimulatorConfig:
+    """Behaviour of a simulated hub.
+
+    :param latency: Processing time of the hub for every request.
+    :param rate_limit: Sustained requests per second before answering
+                with 429, None disables rate limiting.
+    :param burst: Requests allowed in a burst above the rate limit.
+    :param maintenance: (start, end) windows in seconds after the hub
+                started during which the hub answers with 423.
+    :param hang_probability: Chance a request never gets an answer
+                (within hang_time).
+    :param hang_time: Time a hanging request is held open.
+    :param seed: Seed of the random generator of the hub.
+    :param ids_filter: Answer GET /home/shades?ids= with the listed shades
+                only, like the hub ignoring the filter by default.
+    """
+
+    latency: float = 0.0
+    rate_limit: float | None = None
+    burst: int = 10
+    maintenance: tuple[tuple[float, float], ...] = ()
+    hang_probability: float = 0.0
+    hang_time: float = 30.0
+    seed: int = 0
+    ids_filter: bool = False
+
+
+class SimulatedHub:
+    """PowerView hub serving a simulated home."""
+
+    def __init__(
+        self, home: SimulatedHome | None = None, config: SimulatorConfig | None = None
+    ) -> None:
+        """Initialize the hub, by default with a generated gen 3 home."""
+        self.home = home or generate_home()
+        self.config = config or SimulatorConfig()
+        self.maintenance = False
+        self.requests: Counter[str] = Counter()
+        self.rate_limited = 0
+        self.port: int | None = None
+        self._rng = random.Random(self.config.seed)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._started = 0.0
+        self._tokens = float(self.config.burst)
+        self._refilled = 0.0
+        self._subscribers: set[asyncio.Queue] = set()
+        self._timers: dict[int, asyncio.TimerHandle] = {}
+        self._runner: web.AppRunner | None = None
+        self.app = web.Application(middlewares=[self._middleware])
+        if self.home.api_version >= 3:
+            self._add_v3_routes()
+        else:
+            self._add_v2_routes()
+
+    @property
+    def api_version(self) -> int:
+        """Return the api generation of the hub."""
+        return self.home.api_version
+
+    @property
+    def address(self) -> str:
+        """Return the address to use as hub ip."""
+        return f"127.0.0.1:{self.port}"
+
+    @property
+    def total_requests(self) -> int:
+        """Return the number of requests the hub received."""
+        return sum(self.requests.values())
+
+    def now(self) -> float:
+        """Return the clock driving the shade motion."""
+        return self._loop.time() if self._loop else 0.0
+
+    async def start(self, host: str = "127.0.0.1", port: int | None = None) -> None:
+        """Start serving, on a free port by default."""
+        self._loop = asyncio.get_running_loop()
+        self._started = self._refilled = self.now()
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port or 0).start()
+        # the port the system picked
+        self.port = self._runner.addresses[0][1]
+        _LOGGER.debug("Simulated gen %s hub on %s", self.api_version, self.address)
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        for queue in self._subscribers:
+            queue.put_nowait(None)
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "SimulatedHub":
+        """Start serving."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        """Stop serving."""
+        await self.stop()
+
+    def in_maintenance(self) -> bool:
+        """Return if the hub currently answers with 423."""
+        elapsed = self.now() - self._started
+        return self.maintenance or any(
+            start <= elapsed < end for start, end in self.config.maintenance
+        )
+
+    def _take_token(self) -> bool:
+        if self.config.rate_limit is None:
+            return True
+        now = self.now()
+        self._tokens = min(
+            self.config.burst,
+            self._tokens + (now - self._refilled) * self.config.rate_limit,
+        )
+        self._refilled = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        self.requests[f"{request.method} {request.path}"] += 1
+        if request.path == EVENTS_PATH:
+            return await handler(request)
+        if self.config.latency:
+            await asyncio.sleep(self.config.latency)
+        if self.in_maintenance():
+            return web.Response(status=423)
+        if not self._take_token():
+            self.rate_limited += 1
+            return web.json_response({}, status=429)
+        if (
+            self.config.hang_probability
+            and self._rng.random() < self.config.hang_probability
+        ):
+            await asyncio.sleep(self.config.hang_time)
+        return await handler(request)
+
+    def _shade(self, request: web.Request) -> SimulatedShade:
+        try:
+            return self.home.shades[int(request.match_info["shade_id"])]
+        except (KeyError, ValueError) as err:
+            raise web.HTTPNotFound from err
+
+    async def _radio(self, shade: SimulatedShade) -> None:
+        await asyncio.sleep(shade.radio_delay(self._rng))
+
+    def _move(self, shade: SimulatedShade, end: float) -> None:
+        """Publish the motion of a shade and when it stops."""
+        if timer := self._timers.pop(shade.id, None):
+            timer.cancel()
+        now = self.now()
+        if end <= now:
+            return
+        targets = {axis: motion.target for axis, motion in shade.motion.items()}
+        self._publish(
+            {
+                "evt": "motion-started",
+                "id": shade.id,
+                "currentPositions": shade.to_v3(now)["positions"],
+                "targetPositions": targets,
+            }
+        )
+        self._timers[shade.id] = self._loop.call_at(end, self._motion_stopped, shade)
+
+    def _motion_stopped(self, shade: SimulatedShade) -> None:
+        self._timers.pop(shade.id, None)
+        self._publish(
+            {
+                "evt": "motion-stopped",
+                "id": shade.id,
+                "currentPositions": shade.to_v3(self.now())["positions"],
+            }
+        )
+
+    def _stop(self, shade: SimulatedShade) -> None:
+        shade.stop(self.now())
+        if timer := self._timers.pop(shade.id, None):
+            timer.cancel()
+            self._motion_stopped(shade)
+
+    def _activate(self, scene: dict) -> list[int]:
+        now = self.now()
+        for shade_id, targets in scene["members"].items():
+            shade = self.home.shades[shade_id]
+            self._move(shade, shade.move(targets, now))
+        return list(scene["members"])
+
+    def _publish(self, event: dict) -> None:
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    async def _handle_events(self, request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        try:
+            while (event := await queue.get()) is not None:
+                await response.write(f"data: {json.dumps(event)}\n\n".encode())
+        finally:
+            self._subscribers.discard(queue)
+        return response
+
+    # gen 2
+
+    def _add_v2_routes(self) -> None:
+        self.app.router.add_routes(
+            [
+                web.get("/api/fwversion", self._v2_fwversion),
+                web.get("/api/userdata", self._v2_userdata),
+                web.get("/api/shades", self._v2_shades),
+                web.get("/api/shades/{shade_id}", self._v2_shade),
+                web.put("/api/shades/{shade_id}", self._v2_put_shade),
+                web.get("/api/scenes", self._v2_scenes),
+                web.get("/api/scenes/{scene_id}", self._v2_scene),
+                web.get("/api/rooms", self._v2_rooms),
+                web.get("/api/sceneMembers", self._v2_scene_members),
+                web.get("/api/scheduledevents", self._v2_scheduled_events),
+            ]
+        )
+
+    def _firmware(self) -> dict:
+        if self.api_version >= 3:
+            main = {"build": 1510, "name": "PowerView G3", "revision": 3}
+        else:
+            main = {"build": 395, "name": "PV Hub2.0", "revision": 2}
+        return {
+            "mainProcessor": {"subRevision": 1, **main},
+            "radio": {"build": 1307, "revision": 2, "subRevision": 0},
+        }
+
+    async def _v2_fwversion(self, request: web.Request) -> web.Response:
+        return web.json_response({"firmware": self._firmware()})
+
+    async def _v2_userdata(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "userData": {
+                    "firmware": self._firmware(),
+                    "hubName": unicode_to_base64("Simulated Hub"),
+                    "ip": "127.0.0.1",
+                    "macAddress": "00:26:74:00:00:01",
+                    "serialNumber": self.home.serial_number,
+                    "ssid": "simulator",
+                }
+            }
+        )
+
+    async def _v2_shades(self, request: web.Request) -> web.Response:
+        now = self.now()
+        return web.json_response(
+            {
+                "shadeIds": list(self.home.shades),
+                "shadeData": [shade.to_v2(now) for shade in self.home.shades.values()],
+            }
+        )
+
+    async def _v2_shade(self, request: web.Request) -> web.Response:
+        shade = self._shade(request)
+        if "refresh" in request.query or "updateBatteryLevel" in request.query:
+            await self._radio(shade)
+        return web.json_response({"shade": shade.to_v2(self.now())})
+
+    async def _v2_put_shade(self, request: web.Request) -> web.Response:
+        shade = self._shade(request)
+        data = (await request.json()).get("shade", {})
+        if "roomId" in data:
+            shade.room_id = data["roomId"]
+        if "positions" in data:
+            await self._radio(shade)
+            self._move(shade, shade.move_from_v2(data["positions"], self.now()))
+        if data.get("motion") == "stop":
+            self._stop(shade)
+        return web.json_response({"shade": shade.to_v2(self.now())})
+
+    def _v2_scene_data(self, scene: dict) -> dict:
+        return {
+            "id": scene["id"],
+            "name": unicode_to_base64(scene["name"]),
+            "roomId": scene["room_id"],
+            "colorId": 0,
+            "iconId": 0,
+            "order": 0,
+        }
+
+    async def _v2_scenes(self, request: web.Request) -> web.Response:
+        if (scene_id := request.query.get("sceneId")) is not None:
+            scene = self.home.scenes.get(int(scene_id))
+            if scene is None:
+                raise web.HTTPNotFound
+            return web.json_response({"shadeIds": self._activate(scene)})
+        return web.json_response(
+            {
+                "sceneIds": list(self.home.scenes),
+                "sceneData": [
+                    self._v2_scene_data(scene) for scene in self.home.scenes.values()
+                ],
+            }
+        )
+
+    async def _v2_scene(self, request: web.Request) -> web.Response:
+        scene = self.home.scenes.get(int(request.match_info["scene_id"]))
+        if scene is None:
+            raise web.HTTPNotFound
+        return web.json_response({"scene": self._v2_scene_data(scene)})
+
+    async def _v2_rooms(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "roomIds": list(self.home.rooms),
+                "roomData": [
+                    {"id": room["id"], "name": unicode_to_base64(room["name"])}
+                    for room in self.home.rooms.values()
+                ],
+            }
+        )
+
+    async def _v2_scene_members(self, request: web.Request) -> web.Response:
+        members = []
+        for scene in self.home.scenes.values():
+            for shade_id, targets in scene["members"].items():
+                positions = {}
+                for index, (axis, value) in enumerate(
+                    list(targets.items())[:2], start=1
+                ):
+                    positions[f"posKind{index}"] = AXIS_POSKIND[axis]
+                    positions[f"position{index}"] = round(value * MAX_POSITION_V2)
+                members.append(
+                    {
+                        "id": len(members) + 1,
+                        "sceneId": scene["id"],
+                        "shadeId": shade_id,
+                        "positions": positions,
+                    }
+                )
+        return web.json_response(
+            {
+                "sceneMemberIds": [member["id"] for member in members],
+                "sceneMemberData": members,
+            }
+        )
+
+    async def _v2_scheduled_events(self, request: web.Request) -> web.Response:
+        days = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday")
+        events = [
+            {
+                "id": automation["id"],
+                "enabled": automation["enabled"],
+                "sceneId": automation["scene_id"],
+                # gen 2 only knows clock (0), sunrise (1) and sunset (2)
+                "eventType": min(automation["type"], 2),
+                "hour": automation["hour"],
+                "minute": automation["minute"],
+                "daySunday": bool(automation["days"] & 0x40),
+                **{
+                    f"day{day}": bool(automation["days"] & (1 << bit))
+                    for bit, day in enumerate(days)
+                },
+            }
+            for automation in self.home.automations.values()
+        ]
+        return web.json_response(
+            {
+                "scheduledEventIds": [event["id"] for event in events],
+                "scheduledEventData": events,
+            }
+        )
+
+    # gen 3
+
+    def _add_v3_routes(self) -> None:
+        self.app.router.add_routes(
+            [
+                web.get("/gateway", self._v3_gateway),
+                web.get("/gateway/info", self._v3_gateway_info),
+                web.get("/home", self._v3_home),
+                web.get(EVENTS_PATH, self._handle_events),
+                web.get("/home/shades", self._v3_shades),
+                web.put("/home/shades/positions", self._v3_positions),
+                web.put("/home/shades/stop", self._v3_stop),
+                web.get("/home/shades/{shade_id}", self._v3_shade),
+                web.put("/home/shades/{shade_id}", self._v3_put_shade),
+                web.put("/home/shades/{shade_id}/motion", self._v3_motion),
+                web.get("/home/scenes", self._v3_scenes),
+                web.get("/home/scenes/{scene_id}", self._v3_scene),
+                web.put("/home/scenes/{scene_id}/activate", self._v3_activate),
+                web.get("/home/rooms", self._v3_rooms),
+                web.get("/home/sceneMembers", self._v3_scene_members),
+                web.get("/home/automations", self._v3_automations),
+            ]
+        )
+
+    def _v3_config(self) -> dict:
+        firmware = self._firmware()
+        return {
+            "firmware": {
+                "mainProcessor": firmware["mainProcessor"],
+                "radios": [firmware["radio"]],
+            },
+            "networkStatus": {
+                "ipAddress": "127.0.0.1",
+                "primaryMacAddress": "00:26:74:00:00:01",
+                "ssid": "simulator",
+            },
+            "serialNumber": self.home.serial_number,
+            "mgwStatus": {"running": False},
+        }
+
+    async def _v3_gateway(self, request: web.Request) -> web.Response:
+        return web.json_response({"config": self._v3_config()})
+
+    async def _v3_gateway_info(self, request: web.Request) -> web.Response:
+        return web.json_response({"config": self._v3_config()})
+
+    async def _v3_home(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "gateways": [
+                    {
+                        "name": "Simulated Hub",
+                        "ip": "127.0.0.1",
+                        "serial": self.home.serial_number,
+                    }
+                ]
+            }
+        )
+
+    async def _v3_shades(self, request: web.Request) -> web.Response:
+        now = self.now()
+        shades = self.home.shades.values()
+        if self.config.ids_filter and "ids" in request.query:
+            shades = self._v3_ids(request)
+        return web.json_response([shade.to_v3(now) for shade in shades])
+
+    async def _v3_shade(self, request: web.Request) -> web.Response:
+        shade = self._shade(request)
+        if "refresh" in request.query or "updateBatteryLevel" in request.query:
+            await self._radio(shade)
+        return web.json_response(shade.to_v3(self.now()))
+
+    async def _v3_put_shade(self, request: web.Request) -> web.Response:
+        shade = self._shade(request)
+        data = await request.json()
+        data = data.get("shade", data)
+        if "roomId" in data:
+            shade.room_id = data["roomId"]
+        return web.json_response(shade.to_v3(self.now()))
+
+    def _v3_ids(self, request: web.Request) -> list[SimulatedShade]:
+        try:
+            ids = [int(i) for i in request.query.get("ids", "").split(",") if i]
+            return [self.home.shades[shade_id] for shade_id in ids]
+        except (KeyError, ValueError) as err:
+            raise web.HTTPNotFound from err
+
+    async def _v3_positions(self, request: web.Request) -> web.Response:
+        shades = self._v3_ids(request)
+        positions = (await request.json()).get("positions", {})
+        if shades:
+            await self._radio(shades[0])
+        now = self.now()
+        for shade in shades:
+            self._move(shade, shade.move_from_v3(positions, now))
+        return web.json_response({"responses": [{"id": s.id} for s in shades]})
+
+    async def _v3_stop(self, request: web.Request) -> web.Response:
+        shades = self._v3_ids(request)
+        for shade in shades:
+            self._stop(shade)
+        return web.json_response({"responses": [{"id": s.id} for s in shades]})
+
+    async def _v3_motion(self, request: web.Request) -> web.Response:
+        shade = self._shade(request)
+        if (await request.json()).get("motion") == "stop":
+            self._stop(shade)
+        return web.json_response({})
+
+    def _v3_scene_data(self, scene: dict) -> dict:
+        return {
+            "id": scene["id"],
+            "name": unicode_to_base64(scene["name"]),
+            "ptName": scene["name"],
+            "roomIds": [scene["room_id"]],
+            "shadeIds": list(scene["members"]),
+            "color": "0",
+            "icon": "0",
+        }
+
+    async def _v3_scenes(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            [self._v3_scene_data(scene) for scene in self.home.scenes.values()]
+        )
+
+    async def _v3_scene(self, request: web.Request) -> web.Response:
+        scene = self.home.scenes.get(int(request.match_info["scene_id"]))
+        if scene is None:
+            raise web.HTTPNotFound
+        return web.json_response(self._v3_scene_data(scene))
+
+    async def _v3_activate(self, request: web.Request) -> web.Response:
+        scene = self.home.scenes.get(int(request.match_info["scene_id"]))
+        if scene is None:
+            raise web.HTTPNotFound
+        return web.json_response(self._activate(scene))
+
+    async def _v3_rooms(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            [
+                {
+                    "id": room["id"],
+                    "name": unicode_to_base64(room["name"]),
+                    "ptName": room["name"],
+                    "shadeIds": [
+                        shade.id
+                        for shade in self.home.shades.values()
+                        if shade.room_id == room["id"]
+                    ],
+                }
+                for room in self.home.rooms.values()
+            ]
+        )
+
+    async def _v3_scene_members(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            [
+                {
+                    "id": index,
+                    "sceneId": scene["id"],
+                    "shadeId": shade_id,
+                    "positions": targets,
+                }
+                for index, (scene, shade_id, targets) in enumerate(
+                    (
+                        (scene, shade_id, targets)
+                        for scene in self.home.scenes.values()
+                        for shade_id, targets in scene["members"].items()
+                    ),
+                    start=1,
+                )
+            ]
+        )
+
+    async def _v3_automations(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            [
+                {
+                    "id": automation["id"],
+                    "enabled": automation["enabled"],
+                    "sceneId": automation["scene_id"],
+                    "type": automation["type"],
+                    "days": automation["days"],
+                    "hour": automation["hour"],
+                    "min": automation["minute"],
+                }
+                for automation in self.home.automations.values()
+            ]
+        )
+
+
+async def _serve(args) -> None:
+    home = generate_home(
+        api_version=args.api_version,
+        rooms=args.rooms,
+        shades=args.shades,
+        scenes=args.scenes,
+        latency=args.radio_latency,
+        seed=args.seed,
+    )
+    config = SimulatorConfig(latency=args.latency, rate_limit=args.rate_limit)
+    hub = SimulatedHub(home, config)
+    await hub.start(args.host, args.port)
+    print(f"Simulated gen {args.api_version} hub on {args.host}:{hub.port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await hub.stop()
+
+
+def main() -> None:
+    """Run a simulated hub from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--api-version", type=int, default=3, choices=(2, 3))
+    parser.add_argument("--rooms", type=int, default=4)
+    parser.add_argument("--shades", type=int, default=20)
+    parser.add_argument("--scenes", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--radio-latency", type=float, default=0.1)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,475 @@
+"""Memory-mapped snapshot of the hubs, rooms and shades of a fleet.
+
+A snapshot keeps the state of every hub of a fleet in one file of fixed
+width columns (one array per field: shade ids, types, positions, battery,
+...) and a table of the strings (names, hosts). Opening it maps the file
+into memory and decodes nothing, a query only reads the columns it needs
+and a hub is decoded only when its data is asked for::
+
+    fleet.write_snapshot("fleet.pvsnap")
+    ...
+    with FleetSnapshot("fleet.pvsnap") as snapshot:
+        snapshot.low_battery(20)  # shade ids by host
+        snapshot.seed(fleet.add_hub(host, snapshot.hub(host).api_version))
+
+The file is written in the byte order of the machine and only opened on
+machines of the same byte order.
+"""
+
+from array import array
+from collections.abc import Iterable
+from dataclasses import dataclass
+import math
+import mmap
+import os
+import struct
+import sys
+from typing import Any
+
+from aiopvapi.helpers.aiorequest import AioRequest
+from aiopvapi.helpers.constants import (
+    ATTR_BATTERY_KIND,
+    ATTR_CAPABILITIES,
+    ATTR_ID,
+    ATTR_NAME,
+    ATTR_NAME_UNICODE,
+    ATTR_POSITIONS,
+    ATTR_POWER_TYPE,
+    ATTR_PRIMARY,
+    ATTR_PTNAME,
+    ATTR_ROOM_ID,
+    ATTR_SECONDARY,
+    ATTR_SIGNAL_STRENGTH,
+    ATTR_TILT,
+    ATTR_TYPE,
+    FIRMWARE,
+    FIRMWARE_BUILD,
+    FIRMWARE_REVISION,
+    FIRMWARE_SUB_REVISION,
+    MAX_POSITION_V2,
+    POSITIONS_V2,
+    POSITIONS_V3,
+    POSKIND_PRIMARY,
+    POSKIND_SECONDARY,
+    POSKIND_TILT,
+    POWER_SOURCE_HARDWIRED,
+    SHADE_BATTERY_STATUS,
+    SHADE_BATTERY_STRENGTH,
+)
+from aiopvapi.helpers.tools import unicode_to_base64
+from aiopvapi.resources import shade
+from aiopvapi.resources.model import LazyResources, PowerviewData
+from aiopvapi.resources.records import decode_name
+from aiopvapi.resources.room import Room
+
+MAGIC = b"PVSNAP01"
+# magic, byte order, number of sections
+_HEADER = struct.Struct("<8scxxxI")
+# name, typecode, offset, rows
+_SECTION = struct.Struct("<24sc7xQQ")
+_BYTE_ORDER = b"<" if sys.byteorder == "little" else b">"
+
+# missing values of the integer columns
+MISSING = -1
+MISSING_SIGNAL = -32768
+MISSING_BATTERY = 255
+
+_POSKINDS = {
+    ATTR_PRIMARY: POSKIND_PRIMARY,
+    ATTR_SECONDARY: POSKIND_SECONDARY,
+    ATTR_TILT: POSKIND_TILT,
+}
+_AXES_BY_POSKIND = {poskind: axis for axis, poskind in _POSKINDS.items()}
+
+# columns by section name: the typecode of the array holding them
+HUB_COLUMNS = {
+    "hub_host": "i",  # string index
+    "hub_api": "b",
+    "hub_name": "i",
+    "hub_serial": "i",
+    "hub_model": "i",
+    "hub_firmware": "i",
+    # rows of the shades and rooms of the hub
+    "hub_shades": "I",
+    "hub_shade_count": "I",
+    "hub_rooms": "I",
+    "hub_room_count": "I",
+}
+ROOM_COLUMNS = {"room_id": "i", "room_name": "i"}
+SHADE_COLUMNS = {
+    "shade_id": "i",
+    "shade_type": "h",
+    "shade_capability": "h",
+    "shade_room": "i",
+    "shade_name": "i",
+    "shade_power": "b",  # powerType or batteryKind
+    "shade_battery_raw": "h",  # batteryStatus or batteryStrength
+    "shade_battery": "B",  # percent, see battery_strength()
+    "shade_signal": "h",
+    # fraction of the range reported by the hub, nan when missing
+    "shade_primary": "d",
+    "shade_secondary": "d",
+    "shade_tilt": "d",
+    "shade_velocity": "d",  # gen 3
+    "shade_fw_revision": "h",
+    "shade_fw_sub_revision": "h",
+    "shade_fw_build": "h",
+}
+STRING_COLUMNS = {"str_data": "B", "str_offsets": "Q"}
+
+
+@dataclass(frozen=True)
+class SnapshotHub:
+    """A hub of a snapshot."""
+
+    host: str
+    api_version: int | None
+    name: str | None
+    serial_number: str | None
+    model: str | None
+    firmware: str | None
+    shade_count: int
+    room_count: int
+
+
+class _StringTable:
+    """Strings of a snapshot being written, each stored once."""
+
+    def __init__(self) -> None:
+        self.indexes: dict[str, int] = {}
+        self.data = bytearray()
+        self.offsets = array("Q", [0])
+
+    def add(self, string: str | None) -> int:
+        if string is None:
+            return MISSING
+        if (index := self.indexes.get(string)) is None:
+            index = self.indexes[string] = len(self.offsets) - 1
+            self.data += string.encode()
+            self.offsets.append(len(self.data))
+        return index
+
+
+def _int(value: Any, missing: int = MISSING) -> int:
+    return missing if value is None else int(value)
+
+
+def _add_shade(columns: dict[str, array], raw: dict, api_version: int) -> None:
+    columns["shade_id"].append(raw[ATTR_ID])
+    columns["shade_type"].append(_int(raw.get(ATTR_TYPE)))
+    columns["shade_capability"].append(_int(raw.get(ATTR_CAPABILITIES)))
+    columns["shade_room"].append(_int(raw.get(ATTR_ROOM_ID)))
+    power_key = ATTR_POWER_TYPE if api_version >= 3 else ATTR_BATTERY_KIND
+    columns["shade_power"].append(_int(raw.get(power_key)))
+    battery_key = SHADE_BATTERY_STATUS if api_version >= 3 else SHADE_BATTERY_STRENGTH
+    if raw.get(battery_key) is None:
+        columns["shade_battery_raw"].append(MISSING)
+        columns["shade_battery"].append(MISSING_BATTERY)
+    else:
+        columns["shade_battery_raw"].append(raw[battery_key])
+        columns["shade_battery"].append(shade.battery_strength(raw, api_version))
+    columns["shade_signal"].append(_int(raw.get(ATTR_SIGNAL_STRENGTH), MISSING_SIGNAL))
+    positions = dict.fromkeys(POSITIONS_V3, math.nan)
+    reported = raw.get(ATTR_POSITIONS) or {}
+    if api_version >= 3:
+        for axis in POSITIONS_V3:
+            if (value := reported.get(axis)) is not None:
+                positions[axis] = value
+    else:
+        for position_key, poskind_key in POSITIONS_V2:
+            axis = _AXES_BY_POSKIND.get(reported.get(poskind_key))
+            if axis is not None and reported.get(position_key) is not None:
+                positions[axis] = reported[position_key] / MAX_POSITION_V2
+    for axis, value in positions.items():
+        columns[f"shade_{axis}"].append(value)
+    firmware = raw.get(FIRMWARE) or {}
+    columns["shade_fw_revision"].append(_int(firmware.get(FIRMWARE_REVISION)))
+    columns["shade_fw_sub_revision"].append(_int(firmware.get(FIRMWARE_SUB_REVISION)))
+    columns["shade_fw_build"].append(_int(firmware.get(FIRMWARE_BUILD)))
+
+
+def write_snapshot(path: str, hubs: Iterable) -> None:
+    """Write a snapshot of hubs, ie the FleetHubs of a HubFleet.
+
+    The file is replaced atomically, processes having the previous one
+    open keep reading it. Hubs whose shades or rooms were not fetched yet
+    are written without them.
+    """
+    strings = _StringTable()
+    columns = {
+        name: array(typecode)
+        for name, typecode in {**HUB_COLUMNS, **ROOM_COLUMNS, **SHADE_COLUMNS}.items()
+    }
+    for fleet_hub in hubs:
+        hub = fleet_hub.hub
+        api_version = fleet_hub.api_version or 0
+        version = hub.main_processor_version
+        shades = fleet_hub.shades.raw if fleet_hub.shades is not None else []
+        rooms = fleet_hub.rooms.raw if fleet_hub.rooms is not None else []
+        for name, value in (
+            ("hub_host", strings.add(fleet_hub.host)),
+            ("hub_api", api_version),
+            ("hub_name", strings.add(hub.name)),
+            ("hub_serial", strings.add(hub.serial_number)),
+            ("hub_model", strings.add(hub.model if version else None)),
+            ("hub_firmware", strings.add(hub.firmware if version else None)),
+            ("hub_shades", len(columns["shade_id"])),
+            ("hub_shade_count", len(shades)),
+            ("hub_rooms", len(columns["room_id"])),
+            ("hub_room_count", len(rooms)),
+        ):
+            columns[name].append(value)
+        for raw in rooms:
+            columns["room_id"].append(raw[ATTR_ID])
+            columns["room_name"].append(strings.add(decode_name(raw)))
+        for raw in shades:
+            columns["shade_name"].append(strings.add(decode_name(raw)))
+            _add_shade(columns, raw, api_version)
+    columns["str_data"] = array("B", strings.data)
+    columns["str_offsets"] = strings.offsets
+
+    table_size = _HEADER.size + _SECTION.size * len(columns)
+    sections = []
+    offset = table_size
+    for name, column in columns.items():
+        # every column starts 8 byte aligned
+        offset += -offset % 8
+        sections.append(
+            _SECTION.pack(name.encode(), column.typecode.encode(), offset, len(column))
+        )
+        offset += len(column) * column.itemsize
+
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, _BYTE_ORDER, len(columns)))
+        file.write(b"".join(sections))
+        for column in columns.values():
+            file.write(b"\0" * (-file.tell() % 8))
+            column.tofile(file)
+    os.replace(temporary, path)
+
+
+class FleetSnapshot:
+    """A snapshot file mapped into memory.
+
+    The columns are memoryviews of the mapped file, see HUB_COLUMNS,
+    ROOM_COLUMNS and SHADE_COLUMNS. Use it as a context manager or close()
+    it.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Map a snapshot file.
+
+        :raises ValueError when the file is not a snapshot of this byte order.
+        """
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.columns: dict[str, memoryview] = {}
+        self._hosts: dict[str, int] | None = None
+        try:
+            self._map_columns()
+        except (ValueError, TypeError, struct.error):
+            self.close()
+            raise
+
+    def _map_columns(self) -> None:
+        data = self._mmap
+        magic, byte_order, count = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a fleet snapshot")
+        if byte_order != _BYTE_ORDER:
+            raise ValueError("Fleet snapshot of another byte order")
+        with memoryview(data) as view:
+            for index in range(count):
+                name, typecode, offset, rows = _SECTION.unpack_from(
+                    data, _HEADER.size + index * _SECTION.size
+                )
+                typecode = typecode.decode()
+                end = offset + rows * array(typecode).itemsize
+                if end > len(data):
+                    raise ValueError("Fleet snapshot is truncated")
+                with view[offset:end] as section:
+                    self.columns[name.rstrip(b"\0").decode()] = section.cast(typecode)
+        expected = {*HUB_COLUMNS, *ROOM_COLUMNS, *SHADE_COLUMNS, *STRING_COLUMNS}
+        if missing := expected - self.columns.keys():
+            raise ValueError(f"Fleet snapshot lacks {sorted(missing)}")
+
+    def __enter__(self) -> "FleetSnapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmap the file."""
+        for column in self.columns.values():
+            column.release()
+        self.columns = {}
+        self._mmap.close()
+
+    def string(self, index: int) -> str | None:
+        """Return a string of the string table."""
+        if index == MISSING:
+            return None
+        offsets = self.columns["str_offsets"]
+        return bytes(
+            self.columns["str_data"][offsets[index] : offsets[index + 1]]
+        ).decode()
+
+    @property
+    def hosts(self) -> dict[str, int]:
+        """Return the row of every hub by host."""
+        if self._hosts is None:
+            self._hosts = {
+                self.string(index): row
+                for row, index in enumerate(self.columns["hub_host"])
+            }
+        return self._hosts
+
+    def hub(self, host: str) -> SnapshotHub:
+        """Return a hub of the snapshot.
+
+        :raises KeyError when the hub is not in the snapshot.
+        """
+        row = self.hosts[host]
+        columns = self.columns
+        return SnapshotHub(
+            host,
+            columns["hub_api"][row] or None,
+            self.string(columns["hub_name"][row]),
+            self.string(columns["hub_serial"][row]),
+            self.string(columns["hub_model"][row]),
+            self.string(columns["hub_firmware"][row]),
+            columns["hub_shade_count"][row],
+            columns["hub_room_count"][row],
+        )
+
+    def _rows(self, host: str, kind: str) -> range:
+        row = self.hosts[host]
+        start = self.columns[f"hub_{kind}s"][row]
+        return range(start, start + self.columns[f"hub_{kind}_count"][row])
+
+    def low_battery(self, threshold: int = 20) -> dict[str, list[int]]:
+        """Return the ids of the shades at threshold percent or less by host.
+
+        Only battery powered shades reporting their battery are listed.
+        """
+        columns = self.columns
+        battery = columns["shade_battery"]
+        power = columns["shade_power"]
+        shade_ids = columns["shade_id"]
+        low: dict[str, list[int]] = {}
+        for host in self.hosts:
+            found = [
+                shade_ids[index]
+                for index in self._rows(host, "shade")
+                if battery[index] <= threshold
+                and power[index] not in POWER_SOURCE_HARDWIRED
+            ]
+            if found:
+                low[host] = found
+        return low
+
+    def room_raw(self, host: str) -> list[dict]:
+        """Return the raw rooms of a hub, as returned by Rooms.get_rooms()."""
+        columns = self.columns
+        api_version = columns["hub_api"][self.hosts[host]]
+        rooms = []
+        for index in self._rows(host, "room"):
+            name = self.string(columns["room_name"][index]) or ""
+            raw = {ATTR_ID: columns["room_id"][index]}
+            if api_version >= 3:
+                raw[ATTR_PTNAME] = name
+            else:
+                raw[ATTR_NAME] = unicode_to_base64(name)
+                raw[ATTR_NAME_UNICODE] = name
+            rooms.append(raw)
+        return rooms
+
+    def shade_raw(self, host: str) -> list[dict]:
+        """Return the raw shades of a hub, as returned by Shades.get_shades().
+
+        Only the fields of the snapshot are present.
+        """
+        api_version = self.columns["hub_api"][self.hosts[host]]
+        return [self._shade(index, api_version) for index in self._rows(host, "shade")]
+
+    def _shade(self, index: int, api_version: int) -> dict:
+        columns = self.columns
+
+        def value(name: str, missing: int = MISSING):
+            return None if (found := columns[name][index]) == missing else found
+
+        name = self.string(columns["shade_name"][index]) or ""
+        raw = {ATTR_ID: columns["shade_id"][index]}
+        for key, column in (
+            (ATTR_TYPE, "shade_type"),
+            (ATTR_CAPABILITIES, "shade_capability"),
+            (ATTR_ROOM_ID, "shade_room"),
+        ):
+            if (found := value(column)) is not None:
+                raw[key] = found
+        if api_version >= 3:
+            raw[ATTR_PTNAME] = name
+            power_key, battery_key = ATTR_POWER_TYPE, SHADE_BATTERY_STATUS
+        else:
+            raw[ATTR_NAME] = unicode_to_base64(name)
+            raw[ATTR_NAME_UNICODE] = name
+            power_key, battery_key = ATTR_BATTERY_KIND, SHADE_BATTERY_STRENGTH
+        if (power := value("shade_power")) is not None:
+            raw[power_key] = power
+        if (battery := value("shade_battery_raw")) is not None:
+            raw[battery_key] = battery
+        if (signal := value("shade_signal", MISSING_SIGNAL)) is not None:
+            raw[ATTR_SIGNAL_STRENGTH] = signal
+        positions = {
+            axis: position
+            for axis in POSITIONS_V3
+            if not math.isnan(position := columns[f"shade_{axis}"][index])
+        }
+        if api_version >= 3:
+            raw[ATTR_POSITIONS] = positions
+        else:
+            raw[ATTR_POSITIONS] = {}
+            for (position_key, poskind_key), (axis, position) in zip(
+                POSITIONS_V2, positions.items()
+            ):
+                raw[ATTR_POSITIONS][poskind_key] = _POSKINDS[axis]
+                raw[ATTR_POSITIONS][position_key] = round(position * MAX_POSITION_V2)
+        if (revision := value("shade_fw_revision")) is not None:
+            raw[FIRMWARE] = {
+                FIRMWARE_REVISION: revision,
+                FIRMWARE_SUB_REVISION: value("shade_fw_sub_revision"),
+                FIRMWARE_BUILD: value("shade_fw_build"),
+            }
+        return raw
+
+    def shade_data(self, host: str, request: AioRequest) -> PowerviewData:
+        """Return the shades of a hub as PowerviewData, created on access."""
+        raw = self.shade_raw(host)
+        return PowerviewData(
+            raw=raw,
+            processed=LazyResources(
+                {entry[ATTR_ID]: entry for entry in raw},
+                lambda entry: shade.factory(entry, request),
+            ),
+        )
+
+    def seed(self, fleet_hub) -> None:
+        """Give a hub of a fleet its rooms and shades of the snapshot.
+
+        Meant for a cold start, before the hub is refreshed.
+        """
+        request = fleet_hub.request
+        if request.api_version is None:
+            request.api_version = self.hub(fleet_hub.host).api_version
+        rooms = self.room_raw(fleet_hub.host)
+        fleet_hub.rooms = PowerviewData(
+            raw=rooms,
+            processed=LazyResources(
+                {entry[ATTR_ID]: entry for entry in rooms},
+                lambda entry: Room(entry, request),
+            ),
+        )
+        fleet_hub.shades = self.shade_data(fleet_hub.host, request)
+        fleet_hub.shade_data.store_group_data(fleet_hub.shades)
@@ -0,0 +1,5 @@
+"""Benchmarks of aiopvapi, run them from the repository root.
+
+``python -m benchmarks.micro`` times the CPU hot paths of the library,
+``python -m benchmarks.compare`` flags regressions against a baseline.
+"""
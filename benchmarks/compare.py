@@ -0,0 +1,124 @@
+"""Store benchmark results and compare them against a baseline.
+
+Results are JSON files mapping a benchmark name to its metrics, with
+lower values being better (times, latencies, bytes)::
+
+    {"meta": {...}, "results": {"factory[v2]": {"ns_per_op": 5012.3}}}
+
+Compare a run against the recorded baseline with::
+
+    python -m benchmarks.compare benchmarks/baselines/micro.json current.json
+"""
+
+import argparse
+from dataclasses import dataclass
+import json
+import platform
+import sys
+import time
+
+DEFAULT_THRESHOLD = 0.10
+
+
+@dataclass
+class Change:
+    """Change of a single metric between baseline and current run."""
+
+    name: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        """Return current / baseline."""
+        if not self.baseline:
+            return float("inf") if self.current else 1.0
+        return self.current / self.baseline
+
+    def __str__(self) -> str:
+        """Return a one line summary."""
+        return (
+            f"{self.name} {self.metric}: {self.baseline:.6g} -> {self.current:.6g} "
+            f"({(self.ratio - 1) * 100:+.1f}%)"
+        )
+
+
+def metadata() -> dict:
+    """Return information about the machine running the benchmarks."""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def save_results(path: str, results: dict[str, dict[str, float]]) -> None:
+    """Write results to a JSON file."""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"meta": metadata(), "results": results}, file, indent=2)
+        file.write("\n")
+
+
+def load_results(path: str) -> dict[str, dict[str, float]]:
+    """Read the results of a JSON file."""
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)["results"]
+
+
+def compare(
+    baseline: dict[str, dict[str, float]],
+    current: dict[str, dict[str, float]],
+    threshold: float = DEFAULT_THRESHOLD,
+    metrics: tuple[str, ...] | None = None,
+) -> tuple[list[Change], list[Change]]:
+    """Return (regressions, improvements) beyond threshold.
+
+    Benchmarks or metrics missing in one of the runs are ignored.
+    """
+    regressions = []
+    improvements = []
+    for name in sorted(baseline.keys() & current.keys()):
+        for metric in sorted(baseline[name].keys() & current[name].keys()):
+            if metrics and metric not in metrics:
+                continue
+            change = Change(name, metric, baseline[name][metric], current[name][metric])
+            if change.ratio > 1 + threshold:
+                regressions.append(change)
+            elif change.ratio < 1 - threshold:
+                improvements.append(change)
+    return regressions, improvements
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Compare two result files, exits with 1 on regressions."""
+    parser = argparse.ArgumentParser(description="Compare benchmark results.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="relative change flagged as regression (default %(default)s)",
+    )
+    parser.add_argument("--metric", action="append", help="only compare these metrics")
+    args = parser.parse_args(argv)
+
+    regressions, improvements = compare(
+        load_results(args.baseline),
+        load_results(args.current),
+        args.threshold,
+        tuple(args.metric) if args.metric else None,
+    )
+    for change in improvements:
+        print(f"improved   {change}")
+    for change in regressions:
+        print(f"REGRESSION {change}")
+    if not regressions:
+        print(f"No regressions beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Import time of the common entry points, measured with -X importtime.
+
+Every entry point is imported in a fresh interpreter, the best of a few
+runs is reported in milliseconds together with the heavy dependencies it
+pulled in::
+
+    python -m benchmarks.importtime
+    python -m benchmarks.importtime --record
+
+Budgets are kept in benchmarks/baselines/import_budgets.json and enforced
+by tests/test_importtime.py when AIOPVAPI_BENCHMARKS is set. The heavy
+dependencies are always checked.
+"""
+
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+
+BUDGETS = os.path.join(os.path.dirname(__file__), "baselines", "import_budgets.json")
+ENTRY_POINTS = (
+    "aiopvapi",
+    "aiopvapi.helpers.constants",
+    "aiopvapi.helpers.aiorequest",
+    "aiopvapi.resources.model",
+    "aiopvapi.resources.shade",
+    "aiopvapi.shades",
+    "aiopvapi.hub",
+)
+# modules none of the entry points should import
+HEAVY = ("aiohttp", "multiprocessing")
+# budgets are recorded with this much room above the measured value, the
+# time depends on the machine a lot more than the memory footprint
+HEADROOM = 3.0
+MIN_BUDGET = 20
+
+
+def import_time(module: str) -> tuple[float, list[str]]:
+    """Import a module in a fresh interpreter.
+
+    :returns: the cumulative import time in ms and the heavy modules loaded.
+    """
+    code = (
+        f"import sys, {module}; "
+        f"print(','.join(name for name in {HEAVY!r} if name in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    package = module.split(".")[0]
+    micros = 0
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _self, cumulative, name = line[len("import time:") :].split("|")
+        # top level imports of the package, leaving out the startup of the
+        # interpreter (site, encodings)
+        if not name.startswith("  ") and name.strip().split(".")[0] == package:
+            micros += int(cumulative)
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return micros / 1000, loaded
+
+
+def measure(
+    entry_points: tuple[str, ...] = ENTRY_POINTS, runs: int = 3
+) -> dict[str, dict]:
+    """Return the best import time and the heavy modules of every entry point."""
+    results = {}
+    for module in entry_points:
+        times, loaded = [], []
+        for _ in range(runs):
+            elapsed, loaded = import_time(module)
+            times.append(elapsed)
+        results[module] = {"ms": round(min(times), 2), "heavy": loaded}
+    return results
+
+
+def load_budgets(path: str = BUDGETS) -> dict[str, float]:
+    """Return the recorded budgets."""
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)["budgets"]
+
+
+def over_budget(results: dict[str, dict], budgets: dict[str, float]) -> list[str]:
+    """Return a description of every entry point exceeding its budget."""
+    failures = []
+    for module, result in sorted(results.items()):
+        if result["heavy"]:
+            failures.append(f"{module} imports {', '.join(result['heavy'])}")
+        if module in budgets and result["ms"] > budgets[module]:
+            failures.append(f"{module}: {result['ms']}ms > budget {budgets[module]}ms")
+    return failures
+
+
+def record_budgets(results: dict[str, dict], path: str = BUDGETS) -> None:
+    """Record budgets with some headroom above the measured values."""
+    budgets = {
+        module: max(MIN_BUDGET, math.ceil(result["ms"] * HEADROOM / 10) * 10)
+        for module, result in sorted(results.items())
+    }
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(
+            {"units": "ms cumulative import time", "budgets": budgets},
+            file,
+            indent=2,
+        )
+        file.write("\n")
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Measure the import times from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=list(ENTRY_POINTS))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument(
+        "--record", action="store_true", help="record new budgets from this run"
+    )
+    args = parser.parse_args(argv)
+
+    results = measure(tuple(args.modules), args.runs)
+    for module, result in results.items():
+        print(f"{module:32} {result['ms']:8.1f}ms {' '.join(result['heavy'])}")
+    if args.record:
+        record_budgets(results)
+        return 0
+    failures = over_budget(results, load_budgets())
+    for failure in failures:
+        print(f"OVER BUDGET {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
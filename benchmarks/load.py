@@ -0,0 +1,320 @@
+"""End to end load tests against a simulated hub.
+
+A workload drives the real AioRequest, Shades, Scenes and BaseShade apis
+against a local SimulatedHub. Reported per workload are command
+throughput, p50/p95/p99 command latency, the requests the hub received
+and the lag of the event loop::
+
+    python -m benchmarks.load poll scenes --shades 200 --duration 10
+    python -m benchmarks.load --output current.json
+    python -m benchmarks.compare benchmarks/baselines/load.json current.json
+"""
+
+import argparse
+import asyncio
+from collections import Counter, defaultdict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+import random
+import sys
+
+import aiohttp
+
+from aiopvapi.helpers.aiorequest import AioRequest, PvApiError
+from aiopvapi.resources.shade import BaseShade, ShadePosition
+from aiopvapi.scenes import Scenes
+from aiopvapi.shades import Shades
+from aiopvapi.simulator.home import generate_home
+from aiopvapi.simulator.server import SimulatedHub, SimulatorConfig
+from benchmarks.compare import save_results
+
+LAG_INTERVAL = 0.01
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Return the nearest rank percentile of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+@dataclass
+class LoadRun:
+    """Measurements of a single workload."""
+
+    name: str
+    duration: float = 0.0
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: Counter[str] = field(default_factory=Counter)
+    hub_requests: Counter[str] = field(default_factory=Counter)
+    loop_lag: list[float] = field(default_factory=list)
+
+    @property
+    def commands(self) -> int:
+        """Return the number of commands that completed."""
+        return sum(len(values) for values in self.latencies.values())
+
+    def summary(self) -> dict[str, float]:
+        """Return the metrics of the run, lower is better for all of them."""
+        latencies = [value for values in self.latencies.values() for value in values]
+        return {
+            "ms_per_command": (
+                self.duration / self.commands * 1000 if self.commands else 0.0
+            ),
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "errors": sum(self.errors.values()),
+            "hub_requests": sum(self.hub_requests.values()),
+            "loop_lag_p99_ms": percentile(self.loop_lag, 99) * 1000,
+            "loop_lag_max_ms": max(self.loop_lag, default=0.0) * 1000,
+        }
+
+    def report(self) -> str:
+        """Return a human readable report of the run."""
+        summary = self.summary()
+        lines = [
+            f"{self.name}: {self.commands} commands in {self.duration:.1f}s "
+            f"({self.commands / self.duration if self.duration else 0:.1f}/s), "
+            f"{summary['errors']} errors, {summary['hub_requests']} hub requests",
+            f"  loop lag p99 {summary['loop_lag_p99_ms']:.1f}ms "
+            f"max {summary['loop_lag_max_ms']:.1f}ms",
+        ]
+        for kind, values in sorted(self.latencies.items()):
+            lines.append(
+                f"  {kind:16} n={len(values):<6} "
+                + " ".join(
+                    f"p{pct}={percentile(values, pct) * 1000:.1f}ms"
+                    for pct in (50, 95, 99)
+                )
+            )
+        return "\n".join(lines)
+
+
+class LoadContext:
+    """State shared with a workload."""
+
+    def __init__(
+        self,
+        run: LoadRun,
+        request: AioRequest,
+        hub: SimulatedHub,
+        duration: float,
+        seed: int,
+    ) -> None:
+        """Initialize the context."""
+        self.run = run
+        self.request = request
+        self.hub = hub
+        self.duration = duration
+        self.rng = random.Random(seed)
+        self.shades: dict[int, BaseShade] = {}
+        self.scenes: dict = {}
+        self._loop = asyncio.get_running_loop()
+        self._end = self._loop.time() + duration
+
+    @property
+    def running(self) -> bool:
+        """Return if the workload should continue."""
+        return self._loop.time() < self._end
+
+    async def timed(self, kind: str, command: Awaitable):
+        """Await a command and record its latency."""
+        start = self._loop.time()
+        try:
+            result = await command
+        except PvApiError as err:
+            self.run.errors[type(err).__name__] += 1
+            return None
+        self.run.latencies[kind].append(self._loop.time() - start)
+        return result
+
+    async def every(self, interval: float, action: Callable[[], Awaitable]) -> None:
+        """Run an action every interval until the workload ends."""
+        while self.running:
+            started = self._loop.time()
+            await action()
+            await asyncio.sleep(max(0.0, interval - (self._loop.time() - started)))
+
+
+async def poll(ctx: LoadContext, interval: float = 1.0, refresh: int = 10) -> None:
+    """Poll all shades, like an integration refreshing its state.
+
+    Every poll also refreshes the position of the next few shades.
+    """
+    shade_list = list(ctx.shades.values())
+    cursor = 0
+
+    async def get_shades():
+        nonlocal cursor
+        await ctx.timed("get_shades", Shades(ctx.request).get_shades())
+        batch = [
+            shade_list[(cursor + index) % len(shade_list)]
+            for index in range(min(refresh, len(shade_list)))
+        ]
+        cursor += len(batch)
+        await asyncio.gather(
+            *(ctx.timed("refresh", shade.refresh()) for shade in batch)
+        )
+
+    await ctx.every(interval, get_shades)
+
+
+async def scenes(ctx: LoadContext, interval: float = 1.0, burst: int = 5) -> None:
+    """Activate bursts of scenes at the same time."""
+    scene_list = list(ctx.scenes.values())
+
+    async def activate():
+        await asyncio.gather(
+            *(
+                ctx.timed("activate", scene.activate())
+                for scene in ctx.rng.sample(scene_list, min(burst, len(scene_list)))
+            )
+        )
+
+    await ctx.every(interval, activate)
+
+
+async def sliders(ctx: LoadContext, interval: float = 0.05, count: int = 5) -> None:
+    """Move storms of shades dragged with a slider in a user interface."""
+
+    async def drag(shade: BaseShade):
+        position = ctx.rng.randint(0, 100)
+        while ctx.running:
+            position = min(100, max(0, position + ctx.rng.randint(-10, 10)))
+            await ctx.timed("move", shade.move(ShadePosition(primary=position)))
+            await asyncio.sleep(interval)
+
+    movable = [
+        shade for shade in ctx.shades.values() if shade.capability.capabilities.primary
+    ]
+    await asyncio.gather(
+        *(drag(shade) for shade in ctx.rng.sample(movable, min(count, len(movable))))
+    )
+
+
+async def battery(ctx: LoadContext, concurrency: int = 10) -> None:
+    """Sweep the battery level of all battery powered shades."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def refresh(shade: BaseShade):
+        async with semaphore:
+            await ctx.timed("refresh_battery", shade.refresh_battery())
+
+    async def sweep():
+        await asyncio.gather(
+            *(
+                refresh(shade)
+                for shade in ctx.shades.values()
+                if shade.is_battery_powered()
+            )
+        )
+
+    await ctx.every(0, sweep)
+
+
+WORKLOADS: dict[str, Callable[[LoadContext], Awaitable]] = {
+    "poll": poll,
+    "scenes": scenes,
+    "sliders": sliders,
+    "battery": battery,
+}
+
+
+async def _monitor_lag(samples: list[float]) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append(max(0.0, loop.time() - start - LAG_INTERVAL))
+
+
+async def run_workload(
+    name: str,
+    api_version: int = 3,
+    shades: int = 200,
+    duration: float = 10.0,
+    radio_latency: float = 0.05,
+    config: SimulatorConfig | None = None,
+    seed: int = 0,
+) -> LoadRun:
+    """Run a workload against a freshly generated simulated hub."""
+    home = generate_home(
+        api_version,
+        rooms=max(1, shades // 10),
+        shades=shades,
+        scenes=max(1, shades // 10),
+        latency=radio_latency,
+        jitter=radio_latency / 2,
+        speed=0.5,
+        seed=seed,
+    )
+    run = LoadRun(name)
+    loop = asyncio.get_running_loop()
+    async with SimulatedHub(home, config) as hub, aiohttp.ClientSession() as session:
+        request = AioRequest(
+            hub.address, loop=loop, websession=session, api_version=api_version
+        )
+        ctx = LoadContext(run, request, hub, duration, seed)
+        ctx.shades = (await Shades(request).get_shades()).processed
+        ctx.scenes = (await Scenes(request).get_scenes()).processed
+        hub.requests.clear()
+
+        monitor = asyncio.ensure_future(_monitor_lag(run.loop_lag))
+        start = loop.time()
+        try:
+            await WORKLOADS[name](ctx)
+        finally:
+            run.duration = loop.time() - start
+            monitor.cancel()
+        run.hub_requests.update(hub.requests)
+    return run
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run load tests from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "workloads", nargs="*", help=f"workloads to run: {', '.join(WORKLOADS)}"
+    )
+    parser.add_argument("--api-version", type=int, default=3, choices=(2, 3))
+    parser.add_argument("--shades", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--radio-latency", type=float, default=0.05)
+    parser.add_argument("--hub-latency", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", "-o", help="write the results to this file")
+    args = parser.parse_args(argv)
+    if unknown := set(args.workloads) - set(WORKLOADS):
+        parser.error(f"unknown workloads: {', '.join(sorted(unknown))}")
+
+    config = SimulatorConfig(
+        latency=args.hub_latency, rate_limit=args.rate_limit, seed=args.seed
+    )
+    results = {}
+    for name in args.workloads or WORKLOADS:
+        run = asyncio.run(
+            run_workload(
+                name,
+                args.api_version,
+                args.shades,
+                args.duration,
+                args.radio_latency,
+                config,
+                args.seed,
+            )
+        )
+        print(run.report())
+        results[f"{name}[v{args.api_version}]"] = {
+            metric: round(value, 3) for metric, value in run.summary().items()
+        }
+    if args.output:
+        save_results(args.output, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+"""Memory footprint of large homes, measured with tracemalloc.
+
+A generated home is loaded from a SimulatedHub through the regular entry
+points. Reported is the memory each resource keeps alive after the load
+(bytes per shade, per shade of a home loaded twice, per shade never
+accessed, scene, automation, PowerviewShadeData entry and shade summary
+snapshot) and the number of distinct copies of the raw data of a shade
+held by PowerviewData.raw, PowerviewData.processed and
+PowerviewShadeData::
+
+    python -m benchmarks.memory --shades 100 1000 10000
+    python -m benchmarks.memory --record
+
+Budgets are kept in benchmarks/baselines/memory_budgets.json and enforced
+by tests/test_memory.py, for the larger homes when AIOPVAPI_BENCHMARKS is
+set.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import math
+import os
+import sys
+import tracemalloc
+
+import aiohttp
+
+from aiopvapi.automations import Automations
+from aiopvapi.helpers.aiorequest import AioRequest
+from aiopvapi.resources.shade_data import PowerviewShadeData
+from aiopvapi.scenes import Scenes
+from aiopvapi.sharding import shade_summary
+from aiopvapi.shades import Shades
+from aiopvapi.simulator.home import generate_home
+from aiopvapi.simulator.server import SimulatedHub
+
+BUDGETS = os.path.join(os.path.dirname(__file__), "baselines", "memory_budgets.json")
+SIZES = (100, 1000, 10000)
+# budgets are recorded with this much room above the measured value
+HEADROOM = 1.2
+
+
+class _Retained:
+    """Measure the traced memory still allocated after a block."""
+
+    def __enter__(self) -> "_Retained":
+        gc.collect()
+        self.start = tracemalloc.get_traced_memory()[0]
+        self.bytes = 0
+        return self
+
+    def __exit__(self, *exc) -> None:
+        gc.collect()
+        self.bytes = tracemalloc.get_traced_memory()[0] - self.start
+
+
+def raw_copies(shade_data: PowerviewShadeData, data) -> float:
+    """Return the distinct raw dicts held per shade.
+
+    1.0 means PowerviewData.raw, the shade instances and the shade data
+    all share the same raw dict.
+    """
+    copies = {}
+    for raw in data.raw:
+        copies.setdefault(raw["id"], set()).add(id(raw))
+    for shade_id, shade in data.processed.items():
+        copies.setdefault(shade_id, set()).add(id(shade.raw_data))
+    for shade_id, raw in shade_data.get_all_raw_data().items():
+        copies.setdefault(shade_id, set()).add(id(raw))
+    return sum(len(ids) for ids in copies.values()) / max(1, len(copies))
+
+
+async def measure_home(shades: int, api_version: int = 3) -> dict[str, float]:
+    """Load a home of a number of shades and measure what it retains."""
+    home = generate_home(
+        api_version,
+        rooms=max(1, shades // 10),
+        shades=shades,
+        scenes=max(1, shades // 5),
+        automations=max(1, shades // 10),
+    )
+    results = {}
+    async with SimulatedHub(home) as hub, aiohttp.ClientSession() as session:
+        request = AioRequest(
+            hub.address,
+            loop=asyncio.get_running_loop(),
+            websession=session,
+            api_version=api_version,
+        )
+        shades_entry = Shades(request)
+        scenes_entry = Scenes(request)
+        automations_entry = Automations(request)
+
+        async def fetch_shades():
+            # every shade created, as by a consumer of the whole home
+            data = await shades_entry.get_shades()
+            for _shade in data.processed.values():
+                pass
+            return data
+
+        async def fetch_automations():
+            return await automations_entry.get_automations(fetch_scene_data=False)
+
+        async def retained(fetch, entry, loads: int = 1) -> tuple[object, int]:
+            # the first fetch warms up connection buffers of that size, the
+            # loads are measured from an empty raw store
+            await fetch()
+            entry.raw_store.retain(())
+            with _Retained() as measured:
+                for _load in range(loads):
+                    result = await fetch()
+            return result, measured.bytes
+
+        tracemalloc.start()
+        try:
+            unused, size = await retained(shades_entry.get_shades, shades_entry)
+            results["shade_unused"] = size / len(home.shades)
+            del unused
+
+            reloaded, size = await retained(fetch_shades, shades_entry, loads=2)
+            results["shade_reloaded"] = size / len(home.shades)
+            del reloaded
+
+            shade_data, size = await retained(fetch_shades, shades_entry)
+            results["shade"] = size / len(home.shades)
+
+            with _Retained() as measured:
+                store = PowerviewShadeData()
+                store.store_group_data(shade_data)
+                for shade_id in shade_data.processed:
+                    store.get_shade_position(shade_id)
+            results["shade_data"] = measured.bytes / len(home.shades)
+
+            with _Retained() as measured:
+                snapshot = {
+                    shade_id: shade_summary(shade)
+                    for shade_id, shade in shade_data.processed.items()
+                }
+            results["snapshot"] = measured.bytes / len(home.shades)
+            del snapshot
+
+            # kept alive until the end, so later measurements do not
+            # see their memory being released
+            _scenes, size = await retained(scenes_entry.get_scenes, scenes_entry)
+            results["scene"] = size / len(home.scenes)
+
+            _automations, size = await retained(fetch_automations, automations_entry)
+            results["automation"] = size / len(home.automations)
+        finally:
+            tracemalloc.stop()
+
+        results["raw_copies"] = raw_copies(store, shade_data)
+    return results
+
+
+def measure(
+    sizes: tuple[int, ...] = SIZES, api_versions: tuple[int, ...] = (2, 3)
+) -> dict[str, dict[str, float]]:
+    """Return the measurements by "resource[v<api version>]" and home size."""
+    results: dict[str, dict[str, float]] = {}
+    for api_version in api_versions:
+        for size in sizes:
+            measured = asyncio.run(measure_home(size, api_version))
+            for resource, value in measured.items():
+                results.setdefault(f"{resource}[v{api_version}]", {})[str(size)] = (
+                    round(value, 2)
+                )
+    return results
+
+
+def load_budgets(path: str = BUDGETS) -> dict[str, float]:
+    """Return the recorded budgets."""
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)["budgets"]
+
+
+def over_budget(
+    results: dict[str, dict[str, float]], budgets: dict[str, float]
+) -> list[str]:
+    """Return a description of every measurement exceeding its budget."""
+    failures = []
+    for name, by_size in sorted(results.items()):
+        if name not in budgets:
+            continue
+        for size, value in by_size.items():
+            if value > budgets[name]:
+                failures.append(
+                    f"{name} with {size} shades: {value} > budget {budgets[name]}"
+                )
+    return failures
+
+
+def record_budgets(results: dict[str, dict[str, float]], path: str = BUDGETS) -> None:
+    """Record budgets with some headroom above the measured values."""
+    budgets = {}
+    for name, by_size in sorted(results.items()):
+        worst = max(by_size.values())
+        if name.startswith("raw_copies"):
+            # a count, an increase is always a regression
+            budgets[name] = math.ceil(worst * 100) / 100
+        else:
+            budgets[name] = math.ceil(worst * HEADROOM / 10) * 10
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                "units": "bytes retained per resource, raw dict copies per shade",
+                "budgets": budgets,
+            },
+            file,
+            indent=2,
+        )
+        file.write("\n")
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Measure the memory footprint from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shades", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument(
+        "--record", action="store_true", help="record new budgets from this run"
+    )
+    args = parser.parse_args(argv)
+
+    results = measure(tuple(args.shades))
+    for name, by_size in sorted(results.items()):
+        print(
+            f"{name:22} "
+            + " ".join(f"{size:>6}: {value:10.1f}" for size, value in by_size.items())
+        )
+    if args.record:
+        record_budgets(results)
+        return 0
+    failures = over_budget(results, load_budgets())
+    for failure in failures:
+        print(f"OVER BUDGET {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
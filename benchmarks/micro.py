@@ -0,0 +1,354 @@
+"""Micro benchmarks of the CPU hot paths of the library.
+
+Every benchmark processes a batch of synthetic hub data and reports the
+best time per processed item (ns_per_op) over a number of repeats::
+
+    python -m benchmarks.micro --output current.json
+    python -m benchmarks.compare benchmarks/baselines/micro.json current.json
+
+Record a new baseline with ``--output benchmarks/baselines/micro.json``.
+"""
+
+import argparse
+from collections.abc import Callable
+import copy
+import fnmatch
+import json
+import statistics
+import sys
+import timeit
+from types import SimpleNamespace
+
+from aiopvapi.helpers.aiorequest import AioRequest
+from aiopvapi.helpers.constants import ATTR_ID
+from aiopvapi.helpers.tools import (
+    base64_to_unicode,
+    deep_update_dict,
+    map_data_by_id,
+    unicode_to_base64,
+)
+from aiopvapi.resources.automation import Automation
+from aiopvapi.resources.model import PowerviewData
+from aiopvapi.resources.shade import STATE_KEYS, ShadePosition, factory, state_samples
+from aiopvapi.resources.shade_data import PowerviewShadeData
+from aiopvapi.resources.telemetry import TelemetryRecorder
+from aiopvapi.shades import Shades
+from aiopvapi.simulator.home import generate_home
+from benchmarks.compare import save_results
+
+SHADES = 2000
+AUTOMATIONS = 500
+
+# name -> (setup(api_version) returning (batch function, items per batch))
+BENCHMARKS: dict[str, Callable] = {}
+
+
+def benchmark(name: str, api_versions: tuple[int, ...] = (2, 3)):
+    """Register a benchmark for every api version."""
+
+    def register(setup):
+        for api_version in api_versions:
+            BENCHMARKS[f"{name}[v{api_version}]"] = (
+                lambda setup=setup, api_version=api_version: setup(api_version)
+            )
+        return setup
+
+    return register
+
+
+def offline_request(api_version: int) -> AioRequest:
+    """Return a request that is never used to talk to a hub."""
+    return AioRequest(
+        "127.0.0.1",
+        loop=SimpleNamespace(),
+        websession=SimpleNamespace(),
+        api_version=api_version,
+    )
+
+
+def raw_shades(api_version: int, count: int = SHADES) -> list[dict]:
+    """Return raw shades of mixed types as returned by the hub."""
+    home = generate_home(api_version, rooms=20, shades=count, scenes=0)
+    if api_version >= 3:
+        return [shade.to_v3(0) for shade in home.shades.values()]
+    return [shade.to_v2(0) for shade in home.shades.values()]
+
+
+def raw_automations(api_version: int, count: int = AUTOMATIONS) -> list[dict]:
+    """Return raw automations covering all event types."""
+    automations = []
+    for index in range(count):
+        event_type = (0, 1, 2, 6, 10, 14)[index % 6]
+        days = (index * 37) % 128
+        if api_version >= 3:
+            raw = {"type": event_type, "days": days, "min": index % 60}
+        else:
+            raw = {
+                "eventType": min(event_type, 2),
+                "minute": (index % 120) - 60,
+                **{
+                    f"day{day}": bool(days & (1 << bit))
+                    for bit, day in enumerate(
+                        (
+                            "Monday",
+                            "Tuesday",
+                            "Wednesday",
+                            "Thursday",
+                            "Friday",
+                            "Saturday",
+                            "Sunday",
+                        )
+                    )
+                },
+            }
+        automations.append(
+            {ATTR_ID: index, "sceneId": index, "hour": index % 24, **raw}
+        )
+    return automations
+
+
+@benchmark("factory")
+def _factory(api_version):
+    request = offline_request(api_version)
+    raws = raw_shades(api_version)
+    return lambda: [factory(raw, request) for raw in raws], len(raws)
+
+
+@benchmark("percent_to_api")
+def _percent_to_api(api_version):
+    shades = [
+        factory(raw, offline_request(api_version))
+        for raw in raw_shades(api_version, 200)
+    ]
+    positions = range(0, 101, 5)
+
+    def run():
+        for shade in shades:
+            for position in positions:
+                shade.percent_to_api(position, "primary")
+
+    return run, len(shades) * len(positions)
+
+
+@benchmark("api_to_percent")
+def _api_to_percent(api_version):
+    shades = [
+        factory(raw, offline_request(api_version))
+        for raw in raw_shades(api_version, 200)
+    ]
+    top = 1.0 if api_version >= 3 else 65535
+    positions = [top * step / 20 for step in range(21)]
+
+    def run():
+        for shade in shades:
+            for position in positions:
+                shade.api_to_percent(position, "primary")
+
+    return run, len(shades) * len(positions)
+
+
+@benchmark("structured_to_raw")
+def _structured_to_raw(api_version):
+    request = offline_request(api_version)
+    shades = [factory(raw, request) for raw in raw_shades(api_version, 500)]
+    position = ShadePosition(primary=50, secondary=20, tilt=10)
+    return lambda: [shade.structured_to_raw(position) for shade in shades], len(shades)
+
+
+@benchmark("raw_to_structured")
+def _raw_to_structured(api_version):
+    request = offline_request(api_version)
+    shades = [factory(raw, request) for raw in raw_shades(api_version, 500)]
+    return (
+        lambda: [shade.raw_to_structured(shade.raw_data) for shade in shades],
+        len(shades),
+    )
+
+
+@benchmark("current_position")
+def _current_position(api_version):
+    request = offline_request(api_version)
+    shades = [factory(raw, request) for raw in raw_shades(api_version, 500)]
+    return lambda: [shade.current_position for shade in shades], len(shades)
+
+
+@benchmark("shade_attributes")
+def _shade_attributes(api_version):
+    request = offline_request(api_version)
+    shades = [factory(raw, request) for raw in raw_shades(api_version, 500)]
+
+    def run():
+        for shade in shades:
+            (shade.name, shade.firmware, shade.type_name, shade.get_power_source())
+
+    return run, len(shades)
+
+
+@benchmark("base64_to_unicode", api_versions=(2,))
+def _base64_to_unicode(api_version):
+    names = [unicode_to_base64(f"Living Room Shade {index}") for index in range(1000)]
+    names += [unicode_to_base64(f"Schlafzimmer Süd {index}") for index in range(1000)]
+    return lambda: [base64_to_unicode(name) for name in names], len(names)
+
+
+@benchmark("sanitize_resources")
+def _sanitize_resources(api_version):
+    entry = Shades(offline_request(api_version))
+    raws = raw_shades(api_version)
+    resources = {"shadeData": raws} if api_version < 3 else raws
+    return lambda: entry._sanitize_resources(resources), len(raws)
+
+
+def _shade_payload(api_version: int) -> tuple[bytes, int]:
+    raws = raw_shades(api_version)
+    payload = {"shadeData": raws} if api_version < 3 else raws
+    return json.dumps(payload).encode(), len(raws)
+
+
+def _read_identity(shades) -> None:
+    for shade in shades:
+        _ = shade.name, shade.room_id, shade.type_id
+
+
+@benchmark("decode_construct")
+def _decode_construct(api_version):
+    """Response body to shades through dicts, sanitize and factory."""
+    request = offline_request(api_version)
+    entry = Shades(request)
+    payload, count = _shade_payload(api_version)
+
+    def run():
+        resources = entry._sanitize_resources(json.loads(payload))
+        _read_identity([factory(raw, request) for raw in resources])
+
+    return run, count
+
+
+@benchmark("decode_construct_typed")
+def _decode_construct_typed(api_version):
+    """Response body to shades through typed records."""
+    request = offline_request(api_version)
+    entry = Shades(request)
+    payload, count = _shade_payload(api_version)
+
+    def run():
+        records = entry.decode_records(payload)
+        _read_identity([factory(record, request) for record in records])
+
+    return run, count
+
+
+@benchmark("deep_update_dict")
+def _deep_update_dict(api_version):
+    raws = raw_shades(api_version, 500)
+    updates = [
+        {"positions": dict(raw["positions"]), "batteryStatus": 2} for raw in raws
+    ]
+    return (
+        lambda: [
+            deep_update_dict(raw, update)
+            for raw, update in zip(raws, updates, strict=True)
+        ],
+        len(raws),
+    )
+
+
+@benchmark("map_data_by_id")
+def _map_data_by_id(api_version):
+    raws = raw_shades(api_version)
+    return lambda: map_data_by_id(raws), len(raws)
+
+
+@benchmark("shade_data_update")
+def _shade_data_update(api_version):
+    request = offline_request(api_version)
+    raws = raw_shades(api_version)
+    processed = {raw[ATTR_ID]: factory(raw, request) for raw in raws}
+    data = PowerviewData(raw=raws, processed=processed)
+    position = ShadePosition(primary=40)
+    velocity = ShadePosition(velocity=0.5)
+
+    def run():
+        shade_data = PowerviewShadeData()
+        shade_data.store_group_data(data)
+        for shade_id in processed:
+            shade_data.update_from_group_data(shade_id)
+            shade_data.update_shade_position(shade_id, position)
+            shade_data.update_shade_velocity(shade_id, velocity)
+
+    return run, len(raws)
+
+
+@benchmark("telemetry_record")
+def _telemetry_record(api_version):
+    raws = raw_shades(api_version)
+    recorder = TelemetryRecorder()
+
+    def run():
+        for raw in raws:
+            for metric, value in state_samples(raw, STATE_KEYS, api_version):
+                recorder.record(raw[ATTR_ID], metric, value)
+
+    return run, len(raws)
+
+
+@benchmark("automation_execution")
+def _automation_execution(api_version):
+    request = offline_request(api_version)
+    automations = [
+        Automation(raw, request) for raw in copy.deepcopy(raw_automations(api_version))
+    ]
+
+    def run():
+        for automation in automations:
+            automation.get_execution_time()
+            automation.get_execution_days()
+
+    return run, len(automations)
+
+
+def run_benchmark(
+    setup: Callable, repeat: int = 5, min_time: float = 0.2
+) -> dict[str, float]:
+    """Time a benchmark, returns the best and median time per item."""
+    batch, items = setup()
+    timer = timeit.Timer(batch)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    times = [elapsed / number for elapsed in timer.repeat(repeat, number)]
+    return {
+        "ns_per_op": round(min(times) / items * 1e9, 1),
+        "median_ns_per_op": round(statistics.median(times) / items * 1e9, 1),
+    }
+
+
+def run_benchmarks(
+    patterns: list[str] | None = None, repeat: int = 5, min_time: float = 0.2
+) -> dict[str, dict[str, float]]:
+    """Run all benchmarks matching one of the patterns."""
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if patterns and not any(fnmatch.fnmatch(name, p) for p in patterns):
+            continue
+        results[name] = run_benchmark(setup, repeat, min_time)
+        print(f"{name:32} {results[name]['ns_per_op']:12.1f} ns/op", file=sys.stderr)
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the micro benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("patterns", nargs="*", help="glob patterns of benchmarks")
+    parser.add_argument("--output", "-o", help="write the results to this file")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.patterns, args.repeat, args.min_time)
+    if args.output:
+        save_results(args.output, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
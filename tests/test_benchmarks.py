@@ -0,0 +1,77 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from aiopvapi.resources.shade import BaseShade
+from benchmarks.compare import compare, load_results, main, save_results
+from benchmarks.load import WORKLOADS, percentile, run_workload
+from benchmarks.micro import BENCHMARKS, run_benchmark
+
+BASELINE = os.path.join(
+    os.path.dirname(__file__), "..", "benchmarks", "baselines", "micro.json"
+)
+
+
+class TestCompare(unittest.TestCase):
+    def test_regressions_beyond_threshold(self):
+        baseline = {"a": {"ns_per_op": 100}, "b": {"ns_per_op": 100}, "c": {}}
+        current = {"a": {"ns_per_op": 115}, "b": {"ns_per_op": 80}, "d": {}}
+
+        regressions, improvements = compare(baseline, current, threshold=0.1)
+
+        self.assertEqual(["a"], [change.name for change in regressions])
+        self.assertAlmostEqual(1.15, regressions[0].ratio)
+        self.assertEqual(["b"], [change.name for change in improvements])
+
+    def test_command_exit_code(self):
+        with tempfile.TemporaryDirectory() as folder:
+            baseline = os.path.join(folder, "baseline.json")
+            current = os.path.join(folder, "current.json")
+            save_results(baseline, {"a": {"ns_per_op": 100}})
+            save_results(current, {"a": {"ns_per_op": 150}})
+
+            self.assertEqual({"a": {"ns_per_op": 150}}, load_results(current))
+            self.assertEqual(1, main([baseline, current]))
+            self.assertEqual(0, main([baseline, current, "--threshold", "0.6"]))
+
+
+class TestMicroBenchmarks(unittest.TestCase):
+    def test_baseline_covers_all_benchmarks(self):
+        with open(BASELINE, encoding="utf-8") as file:
+            self.assertEqual(set(BENCHMARKS), set(json.load(file)["results"]))
+
+    def test_benchmarks_run(self):
+        for name, setup in BENCHMARKS.items():
+            with self.subTest(name):
+                batch, items = setup()
+                self.assertGreater(items, 0)
+                batch()
+
+    def test_run_benchmark(self):
+        result = run_benchmark(BENCHMARKS["map_data_by_id[v3]"], 1, 0.001)
+        self.assertGreater(result["ns_per_op"], 0)
+
+
+class TestLoad(unittest.TestCase):
+    @mock.patch.object(BaseShade, "confirm_moves", False)
+    def test_workloads(self):
+        for name in WORKLOADS:
+            with self.subTest(name):
+                run = asyncio.run(
+                    run_workload(name, shades=20, duration=0.3, radio_latency=0)
+                )
+                summary = run.summary()
+                self.assertGreater(run.commands, 0)
+                self.assertEqual(0, summary["errors"])
+                self.assertGreater(summary["hub_requests"], 0)
+                self.assertLessEqual(summary["p50_ms"], summary["p99_ms"])
+                self.assertTrue(run.loop_lag)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(50, percentile(values, 50))
+        self.assertEqual(99, percentile(values, 99))
+        self.assertEqual(0.0, percentile([], 99))
@@ -0,0 +1,72 @@
+import asyncio
+
+import aiohttp
+
+from aiopvapi.fleet import HUB_STATE_OFFLINE, HUB_STATE_ONLINE, HubFleet
+from tests.fake_server import FAKE_BASE_URL, FakeResolver, TestFakeServer
+
+DEAD_HUB = "127.0.0.1:1"
+
+
+class TestHubFleet(TestFakeServer):
+    async def make_fleet(self, **kwargs):
+        info = await self.server.start()
+        resolver = FakeResolver(info, loop=self.loop)
+        connector = aiohttp.TCPConnector(resolver=resolver)
+        self.session = aiohttp.ClientSession(connector=connector)
+        fleet = HubFleet(websession=self.session, timeout=1, **kwargs)
+        fleet.add_hub(FAKE_BASE_URL, api_version=2, tags=["building-a"])
+        fleet.add_hub(DEAD_HUB, api_version=2, tags=["building-b"])
+        return fleet
+
+    def tearDown(self):
+        self.loop.run_until_complete(self.session.close())
+        super().tearDown()
+
+    def test_firmware_inventory(self):
+        async def go():
+            fleet = await self.make_fleet()
+            results = [result async for result in fleet.firmware_inventory()]
+            return fleet, results
+
+        fleet, results = self.loop.run_until_complete(go())
+
+        by_host = {result.host: result for result in results}
+        self.assertEqual(2, len(by_host))
+        self.assertTrue(by_host[FAKE_BASE_URL].ok)
+        self.assertEqual(
+            "927FD402C11CE424", by_host[FAKE_BASE_URL].result["serial_number"]
+        )
+        self.assertFalse(by_host[DEAD_HUB].ok)
+
+        health = fleet.health()
+        self.assertEqual(HUB_STATE_ONLINE, health[FAKE_BASE_URL].state)
+        self.assertEqual(HUB_STATE_OFFLINE, health[DEAD_HUB].state)
+        self.assertEqual(1, health[DEAD_HUB].consecutive_failures)
+
+    def test_refresh_by_tag(self):
+        async def go():
+            fleet = await self.make_fleet()
+            return await fleet.gather(fleet._refresh, fleet.select("building-a"))
+
+        results = self.loop.run_until_complete(go())
+
+        self.assertEqual([FAKE_BASE_URL], list(results))
+        fleet_hub = results[FAKE_BASE_URL].result
+        self.assertEqual({29889, 56112}, set(fleet_hub.shades.processed))
+        self.assertEqual({30284, 26756}, set(fleet_hub.rooms.processed))
+
+    def test_stalled_hub_does_not_block(self):
+        async def operation(fleet_hub):
+            if fleet_hub.host == DEAD_HUB:
+                await asyncio.sleep(30)
+            return fleet_hub.host
+
+        async def go():
+            fleet = await self.make_fleet(max_concurrency=1)
+            return [result async for result in fleet.run(operation, timeout=0.2)]
+
+        results = self.loop.run_until_complete(go())
+
+        self.assertEqual(FAKE_BASE_URL, results[0].result)
+        self.assertIsInstance(results[1].error, asyncio.TimeoutError)
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import unittest
+from urllib.parse import urlsplit
+
+from aiopvapi.gateways import GatewayGroup
+from aiopvapi.helpers.aiorequest import PvApiConnectionError
+from aiopvapi.resources.scene import Scene
+from tests.fake_server import GATEWAY_VALUE
+
+PRIMARY = "10.0.0.2"
+SECONDARY = "10.0.0.1"
+
+HOME = {
+    "gateways": [
+        {"ip": SECONDARY, "name": "Hub 1", "serial": "A"},
+        {"ip": PRIMARY, "name": "Hub 2", "serial": "B"},
+    ]
+}
+
+
+def gateway_value(primary):
+    gateway = json.loads(GATEWAY_VALUE)
+    gateway["config"]["hubName"] = "aHVi"
+    gateway["config"]["mgwStatus"] = {"running": True}
+    gateway["config"]["mgwConfig"] = {"primary": primary}
+    return gateway
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.status = 200
+        self._data = data
+
+    async def json(self):
+        return self._data
+
+    async def release(self):
+        pass
+
+
+class FakeSession:
+    """Websession answering per gateway, with optionally dead gateways."""
+
+    def __init__(self):
+        self.calls = []
+        self.dead = set()
+
+    async def _request(self, method, url, **kwargs):
+        parts = urlsplit(url)
+        self.calls.append((method, parts.netloc, parts.path))
+        if parts.netloc in self.dead:
+            raise TimeoutError
+        if parts.path == "/home":
+            return FakeResponse(HOME)
+        if parts.path == "/gateway":
+            return FakeResponse(gateway_value(parts.netloc == PRIMARY))
+        return FakeResponse([1, 2])
+
+    async def get(self, url, **kwargs):
+        return await self._request("get", url, **kwargs)
+
+    async def put(self, url, **kwargs):
+        return await self._request("put", url, **kwargs)
+
+
+class TestGatewayGroup(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.session = FakeSession()
+        self.group = GatewayGroup(SECONDARY, loop=self.loop, websession=self.session)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_discover(self):
+        gateways = self.loop.run_until_complete(self.group.discover())
+        self.assertEqual({SECONDARY, PRIMARY}, set(gateways))
+        self.assertEqual(PRIMARY, self.group.primary.ip)
+        self.assertFalse(gateways[SECONDARY].primary)
+        self.assertEqual("Hub 1", gateways[SECONDARY].name)
+
+    def test_writes_go_to_primary(self):
+        async def go():
+            await self.group.discover()
+            self.session.calls.clear()
+            return await Scene({"id": 5}, self.group).activate()
+
+        self.assertEqual([1, 2], self.loop.run_until_complete(go()))
+        self.assertEqual(
+            [("put", PRIMARY, "/home/scenes/5/activate")], self.session.calls
+        )
+
+    def test_reads_prefer_fastest(self):
+        async def go():
+            await self.group.discover()
+            self.group.gateways[SECONDARY].latency = 0.5
+            self.group.gateways[PRIMARY].latency = 0.1
+            self.session.calls.clear()
+            await self.group.get(f"http://{SECONDARY}/home/shades")
+
+        self.loop.run_until_complete(go())
+        self.assertEqual([("get", PRIMARY, "/home/shades")], self.session.calls)
+
+    def test_failover(self):
+        async def go():
+            await self.group.discover()
+            self.session.dead.add(PRIMARY)
+            self.session.calls.clear()
+            return await self.group.put(f"http://{SECONDARY}/home/shades/positions")
+
+        self.assertEqual([1, 2], self.loop.run_until_complete(go()))
+        self.assertEqual(
+            [PRIMARY, SECONDARY], [netloc for _, netloc, _ in self.session.calls]
+        )
+        self.assertEqual(1, self.group.gateways[PRIMARY].failures)
+        self.assertIsNotNone(self.group.gateways[SECONDARY].latency)
+
+    def test_streamed_read_failover(self):
+        async def go():
+            await self.group.discover()
+            self.group.gateways[SECONDARY].latency = 0.5
+            self.group.gateways[PRIMARY].latency = 0.1
+            self.session.dead.add(PRIMARY)
+            self.session.calls.clear()
+            url = f"http://{SECONDARY}/home/shades"
+            return [element async for element in self.group.iter_json_array(url)]
+
+        self.assertEqual([1, 2], self.loop.run_until_complete(go()))
+        self.assertEqual(
+            [PRIMARY, SECONDARY], [netloc for _, netloc, _ in self.session.calls]
+        )
+        self.assertEqual(1, self.group.gateways[PRIMARY].failures)
+        self.assertEqual(0, self.group.gateways[SECONDARY].in_flight)
+
+    def test_no_gateways(self):
+        self.group.gateways.clear()
+        for method in ("get", "put"):
+            with self.subTest(method), self.assertRaises(PvApiConnectionError):
+                self.loop.run_until_complete(
+                    getattr(self.group, method)(f"http://{SECONDARY}/home/shades")
+                )
+
+        async def stream():
+            url = f"http://{SECONDARY}/home/shades"
+            return [element async for element in self.group.iter_json_array(url)]
+
+        with self.assertRaises(PvApiConnectionError):
+            self.loop.run_until_complete(stream())
+        self.assertEqual([], self.session.calls)
@@ -1,3 +1,4 @@
+import asyncio
 from unittest.mock import MagicMock
 import json
 
@@ -6,7 +7,13 @@ import pytest
 from aiopvapi.helpers.aiorequest import AioRequest
 from aiopvapi.hub import Version, Hub
 from tests.test_scene_members import AsyncMock
-from tests.fake_server import TestFakeServer, FAKE_BASE_URL, USER_DATA_VALUE
+from tests.fake_server import (
+    TestFakeServer,
+    FAKE_BASE_URL,
+    GATEWAY_VALUE,
+    HOME_VALUE,
+    USER_DATA_VALUE,
+)
 
 
 @pytest.fixture
@@ -83,3 +90,80 @@ class TestHub_v3(TestFakeServer):
         assert hub.radio_version == [Version(2, 0, 1307)]  # ["REVISION: 2 SUB_REVISION: 0 BUILD: 1307"]
         assert hub.ssid == "cisco789"
         assert hub.name == "00:26:74:af:fd:ae"
+
+
+def test_detect_api_version_races_generations():
+    """Gen 3 answer is used without waiting for the gen 2 probe to time out."""
+    loop = asyncio.new_event_loop()
+    request = AioRequest("127.0.0.1", loop=loop, websession=MagicMock())
+    gen2_cancelled = asyncio.Event()
+    calls = []
+
+    async def fake_get(url, **kwargs):
+        calls.append(url)
+        if url.endswith("fwversion"):
+            try:
+                await asyncio.sleep(15)
+            except asyncio.CancelledError:
+                gen2_cancelled.set()
+                raise
+        if url.endswith("home"):
+            return json.loads(HOME_VALUE)
+        gateway = json.loads(GATEWAY_VALUE)
+        gateway["config"]["firmware"]["mainProcessor"]["revision"] = 3
+        return gateway
+
+    request.get = fake_get
+
+    async def go():
+        hub = Hub(request)
+        await hub.query_firmware()
+        return hub
+
+    hub = loop.run_until_complete(asyncio.wait_for(go(), 5))
+    loop.close()
+
+    assert gen2_cancelled.is_set()
+    assert hub.api_version == 3
+    assert hub.serial_number == "927FD402C11CE424"
+    # gateway payload from the probe is reused instead of fetched again
+    assert calls == [
+        "http://127.0.0.1/api/fwversion",
+        "http://127.0.0.1/gateway/info",
+        "http://127.0.0.1/home",
+    ]
+
+
+def test_detection_payload_used_once():
+    """A later query_firmware fetches the gateway data again."""
+    loop = asyncio.new_event_loop()
+    request = AioRequest("127.0.0.1", loop=loop, websession=MagicMock())
+    calls = []
+    serials = iter(["A", "B"])
+
+    async def fake_get(url, **kwargs):
+        calls.append(url)
+        if url.endswith("fwversion"):
+            await asyncio.sleep(15)
+        if url.endswith("home"):
+            return json.loads(HOME_VALUE)
+        gateway = json.loads(GATEWAY_VALUE)
+        gateway["config"]["firmware"]["mainProcessor"]["revision"] = 3
+        gateway["config"]["serialNumber"] = next(serials)
+        return gateway
+
+    request.get = fake_get
+
+    async def go():
+        hub = Hub(request)
+        await hub.query_firmware()
+        first = hub.serial_number
+        calls.clear()
+        await hub.query_firmware()
+        return first, hub.serial_number
+
+    first, second = loop.run_until_complete(asyncio.wait_for(go(), 5))
+    loop.close()
+
+    assert (first, second) == ("A", "B")
+    assert calls == ["http://127.0.0.1/gateway", "http://127.0.0.1/home"]
@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+import unittest
+
+import aiopvapi
+from benchmarks.importtime import ENTRY_POINTS, load_budgets, measure, over_budget
+
+
+class TestImportTime(unittest.TestCase):
+    """Fail when an entry point imports slower than recorded in the repo.
+
+    Budgets live in benchmarks/baselines/import_budgets.json, record new
+    ones with ``python -m benchmarks.importtime --record``. Import times
+    depend on the machine, they are checked when AIOPVAPI_BENCHMARKS is
+    set.
+    """
+
+    def test_no_heavy_imports(self):
+        self.assertEqual([], over_budget(measure(ENTRY_POINTS, runs=1), {}))
+
+    @unittest.skipUnless(
+        os.environ.get("AIOPVAPI_BENCHMARKS"), "set AIOPVAPI_BENCHMARKS to run"
+    )
+    def test_within_budget(self):
+        budgets = load_budgets()
+        results = measure(ENTRY_POINTS)
+
+        self.assertEqual(set(budgets), set(results))
+        self.assertEqual([], over_budget(results, budgets))
+
+    def test_over_budget(self):
+        results = {
+            "aiopvapi": {"ms": 25.0, "heavy": []},
+            "aiopvapi.shades": {"ms": 10.0, "heavy": ["aiohttp"]},
+        }
+        self.assertEqual(
+            ["aiopvapi: 25.0ms > budget 20ms", "aiopvapi.shades imports aiohttp"],
+            over_budget(results, {"aiopvapi": 20}),
+        )
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_package_attributes(self):
+        from aiopvapi.shades import Shades
+
+        self.assertIs(Shades, aiopvapi.Shades)
+        self.assertIn("Hub", dir(aiopvapi))
+        with self.assertRaises(AttributeError):
+            aiopvapi.NotAClass
+
+    def test_aiohttp_loaded_on_first_session(self):
+        code = (
+            "import sys, asyncio\n"
+            "from aiopvapi.shades import Shades\n"
+            "from aiopvapi.helpers.aiorequest import AioRequest\n"
+            "assert 'aiohttp' not in sys.modules\n"
+            "async def go():\n"
+            "    request = AioRequest('hub', asyncio.get_running_loop())\n"
+            "    await request.websession.close()\n"
+            "asyncio.run(go())\n"
+            "assert 'aiohttp' in sys.modules\n"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+
+import aiohttp
+
+from aiopvapi.helpers.aiorequest import AioRequest, PvApiResponseStatusError
+from aiopvapi.helpers.json_stream import JsonArrayParser
+from aiopvapi.shades import Shades
+from aiopvapi.simulator.home import generate_home
+from aiopvapi.simulator.server import SimulatedHub
+
+SHADES = [
+    {"id": index, "type": 6, "ptName": f"Süd {index}", "positions": {"primary": 0.5}}
+    for index in range(20)
+]
+
+
+def parse(data: bytes, chunk_size: int) -> list:
+    return parse_with(JsonArrayParser(), data, chunk_size)
+
+
+def parse_with(parser: JsonArrayParser, data: bytes, chunk_size: int) -> list:
+    elements = []
+    for start in range(0, len(data), chunk_size):
+        elements += parser.feed(data[start : start + chunk_size])
+    return elements + parser.close()
+
+
+class TestJsonArrayParser(unittest.TestCase):
+    def test_any_chunking(self):
+        document = [*SHADES, 12345, 1.5, -2e10, True, None, "text", [1, [2]]]
+        data = json.dumps(document).encode()
+        for chunk_size in (1, 2, 3, 7, 64, len(data)):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(document, parse(data, chunk_size))
+
+    def test_elements_as_they_complete(self):
+        parser = JsonArrayParser()
+        self.assertEqual([{"id": 1}], parser.feed(b' [{"id": 1}, {"id"'))
+        self.assertEqual(5, parser.buffered)
+        self.assertEqual([{"id": 2}], parser.feed(b": 2}, 3"))
+        self.assertEqual([3], parser.feed(b"]"))
+        self.assertEqual([], parser.close())
+
+    def test_large_element_decoded_once(self):
+        element = {"id": 1, "text": 'x]}\\"{[' * 2000, "list": [[1], {"a": [2]}]}
+        data = json.dumps([element, 2]).encode()
+        parser = JsonArrayParser()
+        decoder = parser._decoder
+        with mock.patch.object(
+            decoder, "raw_decode", wraps=decoder.raw_decode
+        ) as raw_decode:
+            self.assertEqual([element, 2], parse_with(parser, data, 16))
+        self.assertLess(raw_decode.call_count, 10)
+
+    def test_other_documents(self):
+        self.assertEqual([{"shadeData": []}], parse(b'{"shadeData": []}', 4))
+        self.assertEqual([], parse(b"", 4))
+        with self.assertRaises(ValueError):
+            parse(b'[{"id": 1}', 4)
+
+
+class StreamedResponse:
+    """Response handing out its body in chunks, one per event loop turn."""
+
+    def __init__(self, data: bytes, chunk_size: int) -> None:
+        self.status = 200
+        self.content = self
+        self.chunks = [
+            data[start : start + chunk_size]
+            for start in range(0, len(data), chunk_size)
+        ]
+        self.sent = 0
+
+    async def iter_chunked(self, size):
+        for chunk in self.chunks:
+            self.sent += 1
+            yield chunk
+            await asyncio.sleep(0)
+
+    async def release(self):
+        pass
+
+
+class StreamedSession:
+    def __init__(self, response) -> None:
+        self.response = response
+
+    async def get(self, url, **kwargs):
+        return self.response
+
+
+class TestIterInstances(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+        self.loop.close()
+
+    def test_yields_before_body_complete(self):
+        response = StreamedResponse(json.dumps(SHADES).encode(), 64)
+        request = AioRequest(
+            "hub", loop=self.loop, websession=StreamedSession(response), api_version=3
+        )
+
+        async def go():
+            received = []
+            async for shade in Shades(request).iter_instances():
+                received.append((shade.name, response.sent))
+            return received
+
+        received = self.loop.run_until_complete(go())
+        self.assertEqual(
+            [f"Süd {index}" for index in range(20)], [r[0] for r in received]
+        )
+        self.assertLess(received[0][1], len(response.chunks))
+
+    def test_invalid_json(self):
+        response = StreamedResponse(b'[{"id": 1}, {"id"', 4)
+        request = AioRequest(
+            "hub", loop=self.loop, websession=StreamedSession(response), api_version=3
+        )
+
+        async def go():
+            return [shade async for shade in Shades(request).iter_instances()]
+
+        with self.assertRaises(PvApiResponseStatusError):
+            self.loop.run_until_complete(go())
+
+    def test_simulated_hub(self):
+        async def go(api_version, typed):
+            home = generate_home(api_version, shades=50, latency=0, jitter=0)
+            async with SimulatedHub(home) as hub, aiohttp.ClientSession() as session:
+                request = AioRequest(
+                    hub.address,
+                    loop=self.loop,
+                    websession=session,
+                    api_version=api_version,
+                )
+                entry = Shades(request)
+                streamed = [shade async for shade in entry.iter_instances(typed=typed)]
+                return streamed, await entry.get_instances()
+
+        for api_version in (2, 3):
+            for typed in (False, True):
+                with self.subTest(api_version=api_version, typed=typed):
+                    streamed, instances = self.loop.run_until_complete(
+                        go(api_version, typed)
+                    )
+                    self.assertEqual(
+                        [(type(shade), shade.id, shade.name) for shade in instances],
+                        [(type(shade), shade.id, shade.name) for shade in streamed],
+                    )
@@ -0,0 +1,35 @@
+import os
+import unittest
+
+from benchmarks.memory import SIZES, load_budgets, measure, over_budget
+
+
+class TestMemoryBudgets(unittest.TestCase):
+    """Fail when a large home retains more memory than recorded in the repo.
+
+    Budgets live in benchmarks/baselines/memory_budgets.json, record new
+    ones with ``python -m benchmarks.memory --record``. The larger homes
+    take a while, they are measured when AIOPVAPI_BENCHMARKS is set.
+    """
+
+    def test_within_budget(self):
+        budgets = load_budgets()
+        results = measure(SIZES[:1], api_versions=(2, 3))
+
+        self.assertEqual(set(budgets), set(results))
+        self.assertEqual([], over_budget(results, budgets))
+
+    @unittest.skipUnless(
+        os.environ.get("AIOPVAPI_BENCHMARKS"), "set AIOPVAPI_BENCHMARKS to run"
+    )
+    def test_large_homes_within_budget(self):
+        results = measure(SIZES[1:], api_versions=(3,))
+        results.update(measure(SIZES[1:2], api_versions=(2,)))
+        self.assertEqual([], over_budget(results, load_budgets()))
+
+    def test_over_budget(self):
+        results = {"shade[v3]": {"100": 2100.0, "1000": 1900.0}}
+        self.assertEqual(
+            ["shade[v3] with 100 shades: 2100.0 > budget 2000"],
+            over_budget(results, {"shade[v3]": 2000}),
+        )
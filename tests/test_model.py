@@ -0,0 +1,75 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from aiopvapi.helpers.aiorequest import AioRequest
+from aiopvapi.helpers.transport import InMemoryTransport
+from aiopvapi.resources import shade
+from aiopvapi.resources.model import LazyResources
+from aiopvapi.resources.shade import STATE_POSITIONS
+from aiopvapi.shades import Shades
+
+SHADES = [
+    {"id": 1, "type": 6, "ptName": "One", "positions": {"primary": 0.5}},
+    {"id": 2, "type": 6, "ptName": "Two", "positions": {"primary": 0.1}},
+]
+
+
+class TestLazyResources(unittest.TestCase):
+    def setUp(self):
+        self.created = []
+
+        def factory(entry):
+            self.created.append(entry["id"])
+            return {"resource": entry["id"]}
+
+        self.resources = LazyResources({raw["id"]: raw for raw in SHADES}, factory)
+
+    def test_ids_without_creating(self):
+        self.assertEqual([1, 2], list(self.resources))
+        self.assertEqual(2, len(self.resources))
+        self.assertIn(2, self.resources)
+        self.assertNotIn(3, self.resources)
+        self.assertIsNone(self.resources.peek(1))
+        self.assertEqual([], self.created)
+
+    def test_created_once_on_access(self):
+        self.assertEqual({"resource": 2}, self.resources[2])
+        self.assertIs(self.resources[2], self.resources.get(2))
+        self.assertEqual([2], self.created)
+
+        self.assertEqual([1, 2], [r["resource"] for r in self.resources.values()])
+        self.assertEqual([2, 1], self.created)
+        self.assertIsNone(self.resources.get(3))
+
+    def test_assign_and_delete(self):
+        self.resources[3] = {"resource": 3}
+        del self.resources[1]
+        self.assertEqual([2, 3], list(self.resources))
+        self.assertEqual({"resource": 3}, self.resources[3])
+        with self.assertRaises(KeyError):
+            self.resources[1]
+        self.assertEqual([], self.created)
+
+
+class TestLazyProcessed(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        transport = InMemoryTransport({("GET", "/home/shades"): lambda _: SHADES})
+        request = AioRequest("hub", loop=self.loop, websession=transport, api_version=3)
+        self.shades = Shades(request)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_get_shades(self):
+        with mock.patch.object(shade, "factory", wraps=shade.factory) as factory:
+            data = self.loop.run_until_complete(self.shades.get_shades())
+            self.assertEqual({1, 2}, set(data.processed))
+            factory.assert_not_called()
+
+            self.assertEqual("Two", data.processed[2].name)
+        factory.assert_called_once()
+        # stamped with the time and sequence of the request
+        stamp = data.processed[2].state_stamp(STATE_POSITIONS)
+        self.assertEqual(data.sequence, stamp.sequence)
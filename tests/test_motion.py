@@ -0,0 +1,201 @@
+import asyncio
+import unittest
+from unittest import mock
+
+import aiohttp
+
+from aiopvapi.helpers.aiorequest import AioRequest
+from aiopvapi.helpers.transport import InMemoryTransport
+from aiopvapi.resources import shade as shade_module
+from aiopvapi.resources.motion import MotionModel
+from aiopvapi.resources.shade import BaseShade, MotionStats, ShadePosition, factory
+from aiopvapi.shades import Shades
+from aiopvapi.simulator.home import generate_home
+from aiopvapi.simulator.server import SimulatedHub
+
+SHADE_V2 = {
+    "id": 1,
+    "type": 6,
+    "name": "U2hhZGU=",
+    "positions": {"posKind1": 1, "position1": 0},
+}
+SHADE_V3 = {
+    "id": 1,
+    "type": 44,
+    "ptName": "Shade",
+    "capabilities": 1,
+    "positions": {"primary": 0.0, "tilt": 0.5},
+}
+
+
+class TestMotionSuppression(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.sent = []
+        patcher = mock.patch.object(shade_module, "motion_stats", MotionStats())
+        self.stats = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(BaseShade, "confirm_moves", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def shade(self, raw, api_version):
+        def put(request):
+            self.sent.append(request.json)
+            return {}
+
+        transport = InMemoryTransport(
+            {
+                ("GET", "/api/shades/1"): lambda _: {"shade": dict(self.reported)},
+                ("PUT", "/api/shades/1"): put,
+                ("PUT", "/home/shades/positions"): put,
+                ("PUT", "/home/shades/stop"): lambda _: {},
+            }
+        )
+        request = AioRequest(
+            "hub", loop=self.loop, websession=transport, api_version=api_version
+        )
+        return factory(dict(raw), request)
+
+    def wait(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def test_close_of_closed_shade(self):
+        shade = self.shade(SHADE_V2, 2)
+        self.wait(shade.close())
+        self.assertEqual([], self.sent)
+        self.assertEqual(MotionStats(suppressed=1), self.stats)
+
+        self.wait(shade.close(force=True))
+        self.assertEqual(1, len(self.sent))
+
+    def test_repeated_move_is_pending(self):
+        shade = self.shade(SHADE_V2, 2)
+        self.wait(shade.move(ShadePosition(primary=40)))
+        # the hub reports the shade on its way, the target is still pending
+        shade._update_position_from_dict({"positions": {"position1": 6553}})
+        self.wait(shade.move(ShadePosition(primary=40)))
+        self.assertEqual(1, len(self.sent))
+        self.assertEqual(MotionStats(sent=1, suppressed=1), self.stats)
+
+        with mock.patch.object(shade, "pending_target_timeout", 0):
+            self.wait(shade.move(ShadePosition(primary=40)))
+        self.assertEqual(2, len(self.sent))
+
+    def test_unconfirmed_move_sent_again(self):
+        shade = self.shade(SHADE_V2, 2)
+        self.wait(shade.open())
+        self.assertEqual(100, shade.current_position.primary)
+        self.wait(shade.open())
+        self.assertEqual(1, len(self.sent))
+
+        # the hub never reported the shade open
+        with mock.patch.object(shade, "pending_target_timeout", 0):
+            self.wait(shade.open())
+        self.assertEqual(2, len(self.sent))
+        self.assertEqual(MotionStats(sent=2, suppressed=1), self.stats)
+
+    def test_reported_position_replaces_pending_target(self):
+        def opened():
+            return {**SHADE_V2, "positions": {"posKind1": 1, "position1": 65535}}
+
+        shade = self.shade(opened(), 2)
+        self.wait(shade.close())
+        # the shade was opened again at the hub
+        self.reported = opened()
+        self.wait(shade.refresh())
+        self.assertEqual(100, shade.current_position.primary)
+        self.wait(shade.close())
+        self.assertEqual(2, len(self.sent))
+
+    def test_stop_clears_pending_target(self):
+        shade = self.shade(SHADE_V3, 3)
+        self.wait(shade.move(ShadePosition(primary=40)))
+        self.wait(shade.stop())
+        shade._update_position_from_dict({"positions": {"primary": 0.2}})
+        self.wait(shade.move(ShadePosition(primary=40)))
+        self.assertEqual(2, len(self.sent))
+
+    def test_unchanged_axes_trimmed_on_gen3(self):
+        shade = self.shade(SHADE_V3, 3)
+        self.wait(shade.move(ShadePosition(primary=60, tilt=50)))
+        self.assertEqual([{"positions": {"primary": 0.6}}], self.sent)
+        self.assertEqual(MotionStats(sent=1, trimmed_axes=1), self.stats)
+
+    def test_unchanged_axes_sent_on_gen2(self):
+        shade = self.shade({**SHADE_V2, "type": 62}, 2)
+        self.wait(shade.move(ShadePosition(primary=0, tilt=50)))
+        positions = self.sent[0]["shade"]["positions"]
+        self.assertEqual(
+            {"posKind1", "position1", "posKind2", "position2"}, set(positions)
+        )
+
+
+class TestMotionModel(unittest.TestCase):
+    def test_estimate_and_eta(self):
+        model = MotionModel({"primary": 20.0})
+        self.assertEqual(10.0, model.start({"primary": 0}, {"primary": 50}, now=0))
+        self.assertEqual({"primary": 25.0}, model.estimate(now=5))
+        self.assertEqual(5.0, model.eta(now=5))
+        self.assertEqual({"primary": 50}, model.estimate(now=12))
+        self.assertEqual(0.0, model.eta(now=12))
+
+    def test_velocity_slows_the_move(self):
+        model = MotionModel({"primary": 20.0})
+        self.assertEqual(20.0, model.start({"primary": 0}, {"primary": 50}, 0.5, now=0))
+
+    def test_learns_from_position_on_the_way(self):
+        model = MotionModel({"primary": 20.0})
+        model.start({"primary": 0}, {"primary": 100}, now=0)
+        # only a quarter of the way after the expected 20 seconds
+        self.assertTrue(model.observe({"primary": 25}, 0.5, now=20))
+        self.assertEqual(0.5, model.seconds_per_percent["primary"])
+        self.assertEqual(37.5, model.eta(now=20))
+
+        self.assertFalse(model.observe({"primary": 100}, 0.5, now=50))
+        self.assertFalse(model.moving)
+        self.assertIsNone(model.eta())
+
+    def test_new_move_starts_from_estimate(self):
+        model = MotionModel({"primary": 20.0})
+        model.start({"primary": 0}, {"primary": 100}, now=0)
+        model.start({"primary": 0}, {"primary": 0}, now=10)
+        self.assertEqual({"primary": 25.0}, model.estimate(now=15))
+
+
+class TestMotionConfirmation(unittest.TestCase):
+    def test_single_refresh_at_completion(self):
+        async def go():
+            home = generate_home(3, shades=1, latency=0, jitter=0, speed=1.0)
+            async with SimulatedHub(home) as hub, aiohttp.ClientSession() as session:
+                request = AioRequest(
+                    hub.address,
+                    loop=asyncio.get_running_loop(),
+                    websession=session,
+                    api_version=3,
+                )
+                shades = await Shades(request).get_shades()
+                shade = next(iter(shades.processed.values()))
+                await shade.move(ShadePosition(primary=0), force=True)
+                await shade.motion.confirmation
+                await shade.move(ShadePosition(primary=100))
+                self.assertEqual(100, shade.current_position.primary)
+                eta = shade.eta
+                estimated = shade.estimated_position.primary
+
+                hub.requests.clear()
+                await shade.motion.confirmation
+                return eta, estimated, dict(hub.requests), shade
+
+        with mock.patch.multiple(
+            BaseShade, confirm_delay=0.1, travel_times={"primary": 1.0}
+        ):
+            eta, estimated, requests, shade = asyncio.run(go())
+        self.assertGreater(eta, 0)
+        self.assertLess(estimated, 10)
+        self.assertEqual({f"GET /home/shades/{shade.id}": 1}, requests)
+        self.assertIsNone(shade.eta)
+        self.assertEqual(100, shade.current_position.primary)
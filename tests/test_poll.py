@@ -0,0 +1,112 @@
+import asyncio
+import copy
+import unittest
+from unittest import mock
+
+from aiopvapi.helpers.aiorequest import AioRequest
+from aiopvapi.helpers.transport import InMemoryTransport
+from aiopvapi.resources import shade
+from aiopvapi.shades import Shades
+
+SHADES = [
+    {"id": 1, "type": 6, "name": "U2hhZGU=", "positions": {"primary": 0.5}},
+    {"id": 2, "type": 6, "name": "U2hhZGU=", "positions": {"primary": 0.1}},
+]
+
+
+class TestPoll(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.body = copy.deepcopy(SHADES)
+        transport = InMemoryTransport(
+            {
+                ("GET", "/home/shades"): lambda _: self.body,
+                ("PUT", "/home/shades/positions"): lambda _: {},
+            }
+        )
+        request = AioRequest("hub", loop=self.loop, websession=transport, api_version=3)
+        self.shades = Shades(request)
+        patcher = mock.patch.object(shade.BaseShade, "confirm_moves", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def poll(self):
+        return self.loop.run_until_complete(self.shades.poll())
+
+    def test_unchanged_body(self):
+        first = self.poll()
+        self.assertEqual({1, 2}, self.shades.changed_ids)
+        self.assertEqual("Shade", first.processed[1].name)
+
+        with mock.patch.object(shade, "factory", wraps=shade.factory) as factory:
+            self.assertIs(first, self.poll())
+        factory.assert_not_called()
+        self.assertEqual(set(), self.shades.changed_ids)
+
+    def test_changed_shade(self):
+        first = self.poll()
+        self.body[1]["positions"]["primary"] = 0.9
+
+        second = self.poll()
+        self.assertEqual({2}, self.shades.changed_ids)
+        self.assertIs(first.processed[1], second.processed[1])
+        self.assertIsNot(first.processed[2], second.processed[2])
+        self.assertEqual(90, second.processed[2].current_position.primary)
+        self.assertEqual(
+            [shade.raw_data for shade in second.processed.values()], second.raw
+        )
+
+    def test_resource_created_after_next_poll(self):
+        first = self.poll()
+        self.body[1]["positions"]["primary"] = 0.9
+        with mock.patch.object(shade, "factory", wraps=shade.factory) as factory:
+            second = self.poll()
+            factory.assert_not_called()
+
+        # an unchanged shade is the same instance in both polls
+        self.assertIs(second.processed[1], first.processed[1])
+        self.assertEqual(10, first.processed[2].current_position.primary)
+        self.assertEqual(90, second.processed[2].current_position.primary)
+
+    def test_added_and_removed_shades(self):
+        self.poll()
+        self.body = [self.body[0], {**SHADES[1], "id": 3}]
+
+        data = self.poll()
+        self.assertEqual([1, 3], list(data.processed))
+        self.assertEqual({3}, self.shades.changed_ids)
+
+    def move(self, resource):
+        # a move updates the nested positions of the shade in place
+        self.loop.run_until_complete(resource.move(shade.ShadePosition(primary=100)))
+        self.assertEqual(100, resource.current_position.primary)
+
+    def test_local_change_rebuilds_on_next_change(self):
+        first = self.poll()
+        self.move(first.processed[1])
+        self.body[1]["positions"]["primary"] = 0.2
+
+        second = self.poll()
+        self.assertEqual({1, 2}, self.shades.changed_ids)
+        self.assertIs(first.processed[1], second.processed[1])
+        self.assertEqual(50, second.processed[1].current_position.primary)
+
+    def test_local_change_with_unchanged_body(self):
+        first = self.poll()
+        resource = first.processed[1]
+        self.move(resource)
+
+        # the hub did not move the shade
+        self.assertIs(first, self.poll())
+        self.assertEqual({1}, self.shades.changed_ids)
+        self.assertEqual(50, resource.current_position.primary)
+        self.assertEqual(
+            shade.SOURCE_POLL, resource.state_stamp(shade.STATE_POSITIONS).source
+        )
+        self.assertEqual({"primary": 0.5}, self.shades._poll_raw[1]["positions"])
+
+        self.assertIs(first, self.poll())
+        self.assertEqual(set(), self.shades.changed_ids)
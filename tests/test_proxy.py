@@ -0,0 +1,134 @@
+import asyncio
+import json
+
+import aiohttp
+from aiohttp.test_utils import unused_port
+
+from aiopvapi.proxy import EVENTS_PATH, PowerviewProxy
+from tests.fake_server import TestFakeServer
+
+
+class TestPowerviewProxy(TestFakeServer):
+    async def start_proxy(self):
+        await self.start_fake_server()
+        self.upstream = []
+        get = self.request.get
+
+        async def counting_get(url, *args, **kwargs):
+            self.upstream.append(("GET", url))
+            return await get(url, *args, **kwargs)
+
+        async def fake_put(url, data=None, params=None, **kwargs):
+            self.upstream.append(("PUT", url, data))
+            await asyncio.sleep(0.05)
+            return data
+
+        self.request.get = counting_get
+        self.request.put = fake_put
+        self.proxy = PowerviewProxy(self.request, poll_interval=0, write_interval=0)
+        port = unused_port()
+        await self.proxy.start("127.0.0.1", port)
+        self.client = aiohttp.ClientSession()
+        return f"http://127.0.0.1:{port}"
+
+    async def stop_proxy(self):
+        await self.client.close()
+        await self.proxy.stop()
+
+    def test_reads_are_cached_and_coalesced(self):
+        async def go():
+            base = await self.start_proxy()
+            responses = await asyncio.gather(
+                *(self.client.get(base + "/api/shades") for _ in range(5))
+            )
+            bodies = [await response.json() for response in responses]
+            again = await (await self.client.get(base + "/api/shades")).json()
+            await self.stop_proxy()
+            return bodies, again
+
+        bodies, again = self.loop.run_until_complete(go())
+
+        self.assertEqual(1, len(self.upstream))
+        self.assertEqual([29889, 56112], bodies[0]["shadeIds"])
+        self.assertTrue(all(body == bodies[0] for body in bodies))
+        self.assertEqual(bodies[0], again)
+        stats = self.proxy.stats
+        self.assertEqual(5, stats.coalesced_reads + stats.cache_hits)
+
+    def test_moves_are_coalesced(self):
+        def move(position):
+            return {"shade": {"positions": {"posKind1": 1, "position1": position}}}
+
+        async def go():
+            base = await self.start_proxy()
+            url = base + "/api/shades/29889"
+            first = asyncio.ensure_future(self.client.put(url, json=move(0)))
+            await asyncio.sleep(0.02)
+            # queued while the first move is in flight, only the last one is sent
+            rest = [self.client.put(url, json=move(pos)) for pos in (100, 200, 300)]
+            responses = await asyncio.gather(first, *rest)
+            bodies = [await response.json() for response in responses]
+            await self.stop_proxy()
+            return bodies
+
+        bodies = self.loop.run_until_complete(go())
+
+        puts = [call for call in self.upstream if call[0] == "PUT"]
+        self.assertEqual(2, len(puts))
+        self.assertEqual(move(300), puts[1][2])
+        self.assertEqual([move(0)] + [move(300)] * 3, bodies)
+        self.assertEqual(2, self.proxy.stats.coalesced_writes)
+
+    def test_event_stream(self):
+        async def go():
+            base = await self.start_proxy()
+            events = await self.client.get(base + EVENTS_PATH)
+            await self.client.get(base + "/api/rooms")
+            line = await events.content.readline()
+            events.close()
+            await self.stop_proxy()
+            return json.loads(line.decode()[len("data: ") :])
+
+        event = self.loop.run_until_complete(go())
+
+        self.assertEqual("changed", event["type"])
+        self.assertEqual("/api/rooms", event["path"])
+        self.assertEqual([30284, 26756], event["data"]["roomIds"])
+
+    def test_scene_activations_are_not_cached(self):
+        async def go():
+            base = await self.start_proxy()
+            bodies = []
+            for _ in range(2):
+                response = await self.client.get(base + "/api/scenes?sceneId=10")
+                bodies.append(await response.json())
+            await self.client.get(base + "/api/scenes")
+            await self.client.get(base + "/api/scenes")
+            await self.stop_proxy()
+            return bodies
+
+        bodies = self.loop.run_until_complete(go())
+
+        self.assertEqual([{"id": 10}] * 2, bodies)
+        # both activations reach the hub, the list of scenes is cached
+        self.assertEqual(3, len(self.upstream))
+        self.assertEqual(2, self.proxy.stats.upstream_writes)
+        self.assertEqual(1, self.proxy.stats.cache_hits)
+
+    def test_cancelled_read_does_not_strand_waiters(self):
+        async def go():
+            await self.start_proxy()
+            first = asyncio.ensure_future(self.proxy.read("/api/rooms"))
+            await asyncio.sleep(0)
+            second = asyncio.ensure_future(self.proxy.read("/api/rooms"))
+            await asyncio.sleep(0)
+            first.cancel()
+            data = await asyncio.wait_for(second, 5)
+            await self.stop_proxy()
+            return first, data
+
+        first, data = self.loop.run_until_complete(go())
+
+        self.assertTrue(first.cancelled())
+        self.assertEqual([30284, 26756], data["roomIds"])
+        self.assertEqual(2, len(self.upstream))
@@ -0,0 +1,155 @@
+import asyncio
+import copy
+import unittest
+from unittest import mock
+
+from aiopvapi.helpers.aiorequest import AioRequest
+from aiopvapi.helpers.transport import InMemoryTransport
+from aiopvapi.resources.raw_store import RawStore
+from aiopvapi.resources.shade import BaseShade, ShadePosition
+from aiopvapi.resources.shade_data import PowerviewShadeData
+from aiopvapi.shades import Shades
+
+SHADES = [
+    {"id": 1, "type": 6, "ptName": "One", "positions": {"primary": 0.5}},
+    {"id": 2, "type": 6, "ptName": "Two", "positions": {"primary": 0.1}},
+]
+
+
+class TestRawStore(unittest.TestCase):
+    def test_put_updates_in_place(self):
+        store = RawStore()
+        raw = {"id": 1, "name": "a"}
+        self.assertIs(raw, store.put(raw))
+        store.derived(1)["name"] = "a"
+
+        # loaded again unchanged
+        self.assertIs(raw, store.put({"id": 1, "name": "a"}))
+        self.assertEqual({"name": "a"}, store.derived(1))
+
+        self.assertIs(raw, store.put({"id": 1, "name": "b"}))
+        self.assertEqual({"id": 1, "name": "b"}, raw)
+        self.assertEqual({}, store.derived(1))
+        store.put({"id": 1})
+        self.assertEqual({"id": 1}, raw)
+
+    def test_copy_and_retain(self):
+        store = RawStore()
+        store.put({"id": 1, "positions": {"primary": 1}})
+        store.put({"id": 2})
+        store.copy(1)["positions"]["primary"] = 0
+        self.assertEqual({"primary": 1}, store.get(1)["positions"])
+
+        store.retain([2])
+        self.assertEqual([2], list(store))
+        self.assertNotIn(1, store)
+
+
+class TestSharedRawData(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.body = copy.deepcopy(SHADES)
+        self.release = asyncio.Event()
+        self.release.set()
+
+        async def get_shades(request):
+            body = copy.deepcopy(self.body)
+            await self.release.wait()
+            return body
+
+        transport = InMemoryTransport(
+            {
+                ("GET", "/home/shades"): get_shades,
+                ("GET", "/home/shades/1"): lambda _: {
+                    **SHADES[0],
+                    "ptName": "Renamed",
+                    "roomId": 20,
+                    "positions": {"primary": 0.9},
+                },
+                ("PUT", "/home/shades/positions"): lambda _: {},
+            }
+        )
+        request = AioRequest("hub", loop=self.loop, websession=transport, api_version=3)
+        self.shades = Shades(request)
+        patcher = mock.patch.object(BaseShade, "confirm_moves", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def wait(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def test_single_copy_per_shade(self):
+        first = self.wait(self.shades.get_shades())
+        second = self.wait(self.shades.get_shades())
+        shade_data = PowerviewShadeData()
+        shade_data.store_group_data(second)
+
+        raw = first.processed[1].raw_data
+        self.assertIs(raw, second.processed[1].raw_data)
+        self.assertIs(raw, second.raw[0])
+        self.assertIs(raw, shade_data.get_raw_data(1))
+
+    def test_update_seen_by_all_views(self):
+        first = self.wait(self.shades.get_shades())
+        second = self.wait(self.shades.get_shades())
+        other = second.processed[1]
+        self.assertEqual("One", other.name)
+
+        self.wait(first.processed[1].refresh())
+        self.assertEqual(90, other.current_position.primary)
+        self.assertEqual("Renamed", other.name)
+        self.assertEqual({"primary": 0.9}, first.raw[0]["positions"])
+
+    def test_typed_record_dropped_on_update(self):
+        plain = self.wait(self.shades.get_shades())
+        typed = self.wait(self.shades.get_shades(typed=True))
+        shade = typed.processed[1]
+        other = plain.processed[1]
+        self.assertIsNotNone(shade.record)
+        self.assertEqual(("One", None), (other.name, other.room_id))
+
+        self.wait(shade.refresh())
+        self.assertIsNone(shade.record)
+        for view in (shade, other):
+            self.assertEqual(("Renamed", 20), (view.name, view.room_id))
+
+    def test_list_older_than_move(self):
+        data = self.wait(self.shades.get_shades())
+        shade = data.processed[1]
+
+        async def go():
+            self.release.clear()
+            listed = asyncio.ensure_future(self.shades.get_shades())
+            await asyncio.sleep(0)
+            await shade.move(ShadePosition(primary=100))
+            self.release.set()
+            return await listed
+
+        listed = self.wait(go())
+        self.assertEqual(100, listed.processed[1].current_position.primary)
+        self.assertEqual(100, shade.current_position.primary)
+        self.assertIs(shade.raw_data, listed.raw[0])
+
+    def test_shade_data_keeps_its_shades(self):
+        shade_data = PowerviewShadeData()
+        shade_data.store_group_data(self.wait(self.shades.get_shades()))
+        self.body = self.body[:1] + [{**SHADES[1], "id": 3}]
+        self.wait(self.shades.get_shades())
+
+        self.assertEqual("Two", shade_data.get_raw_data(2)["ptName"])
+        with self.assertRaises(KeyError):
+            shade_data.get_raw_data(3)
+
+    def test_removed_shade(self):
+        data = self.wait(self.shades.get_shades())
+        shade = data.processed[2]
+        self.body = self.body[:1]
+        self.wait(self.shades.get_shades())
+
+        self.assertEqual([1], list(self.shades.raw_store))
+        # the instance keeps its data
+        shade.raw_data = {**SHADES[1], "positions": {"primary": 0.3}}
+        self.assertEqual(30, shade.current_position.primary)
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import unittest
+
+from aiopvapi.helpers.aiorequest import AioRequest
+from aiopvapi.helpers.transport import InMemoryTransport
+from aiopvapi.resources.records import (
+    AutomationRecord,
+    SceneRecord,
+    ShadeRecord,
+    decode_name,
+)
+from aiopvapi.resources.shade import factory
+from aiopvapi.rooms import Rooms
+from aiopvapi.scenes import Scenes
+from aiopvapi.shades import Shades
+
+SHADES_V2 = {
+    "shadeIds": [1],
+    "shadeData": [
+        {
+            "id": 1,
+            "type": 6,
+            "name": "U2hhZGU=",
+            "roomId": 5,
+            "positions": {"posKind1": 1, "position1": 65535},
+        }
+    ],
+}
+SHADES_V3 = [
+    {
+        "id": 1,
+        "type": 6,
+        "name": "U2hhZGU=",
+        "ptName": "Shade",
+        "roomId": 5,
+        "capabilities": 0,
+        "positions": {"primary": 0.5},
+    }
+]
+
+
+class TestRecords(unittest.TestCase):
+    def test_decode_name(self):
+        self.assertEqual("Shade", decode_name({"name": "U2hhZGU="}))
+        self.assertEqual("Plain", decode_name({"ptName": "Plain", "name": "U2hhZGU="}))
+        self.assertEqual("", decode_name({}))
+
+    def test_decode(self):
+        shade = ShadeRecord.decode(SHADES_V3[0])
+        self.assertEqual(
+            (1, "Shade", 6, 0, 5),
+            (shade.id, shade.name, shade.type, shade.capabilities, shade.room_id),
+        )
+        self.assertIs(SHADES_V3[0], shade.raw)
+        self.assertEqual(3, SceneRecord.decode({"id": 2, "roomIds": [3]}).room_id)
+        self.assertEqual(4, SceneRecord.decode({"id": 2, "roomId": 4}).room_id)
+        self.assertEqual(7, AutomationRecord.decode({"id": 1, "sceneId": 7}).scene_id)
+
+    def test_decode_bytes(self):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        request = AioRequest("hub", loop=loop, websession=object(), api_version=2)
+        records = Shades(request).decode_records(json.dumps(SHADES_V2).encode())
+        self.assertEqual(["Shade"], [record.name for record in records])
+        self.assertNotIn("name_unicode", records[0].raw)
+
+    def test_resource_reads_record(self):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        request = AioRequest("hub", loop=loop, websession=object(), api_version=3)
+        shade = factory(ShadeRecord.decode(dict(SHADES_V3[0])), request)
+
+        self.assertEqual(("Shade", 5, 6), (shade.name, shade.room_id, shade.type_id))
+        self.assertIsNotNone(shade.record)
+
+        # a refresh replaces the raw data, the record no longer applies
+        shade.raw_data = {**SHADES_V3[0], "roomId": 9}
+        self.assertIsNone(shade.record)
+        self.assertEqual(9, shade.room_id)
+
+
+class TestTypedEntryPoints(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def request(self, api_version, routes):
+        return AioRequest(
+            "hub",
+            loop=self.loop,
+            websession=InMemoryTransport(routes),
+            api_version=api_version,
+        )
+
+    def test_typed_matches_dict_path(self):
+        for api_version, path, payload in (
+            (2, "/api/shades", SHADES_V2),
+            (3, "/home/shades", SHADES_V3),
+        ):
+            with self.subTest(api_version=api_version):
+                body = json.dumps(payload)
+                request = self.request(
+                    api_version, {("GET", path): lambda _, body=body: json.loads(body)}
+                )
+                entry = Shades(request)
+                typed = self.loop.run_until_complete(entry.get_shades(typed=True))
+                plain = self.loop.run_until_complete(entry.get_shades())
+
+                self.assertEqual(set(plain.processed), set(typed.processed))
+                for shade_id, shade in typed.processed.items():
+                    other = plain.processed[shade_id]
+                    self.assertIs(type(other), type(shade))
+                    self.assertEqual(other.name, shade.name)
+                    self.assertEqual(other.room_id, shade.room_id)
+                    self.assertEqual(other.current_position, shade.current_position)
+                    self.assertIs(typed.raw[0], shade.raw_data)
+
+    def test_typed_rooms_and_scenes(self):
+        request = self.request(
+            3,
+            {
+                ("GET", "/home/rooms"): lambda _: [{"id": 5, "ptName": "Kitchen"}],
+                ("GET", "/home/scenes"): lambda _: [
+                    {"id": 2, "ptName": "Morning", "roomIds": [5]}
+                ],
+            },
+        )
+        rooms = self.loop.run_until_complete(Rooms(request).get_rooms(typed=True))
+        scenes = self.loop.run_until_complete(Scenes(request).get_scenes(typed=True))
+
+        self.assertEqual("Kitchen", rooms.processed[5].name)
+        self.assertEqual(
+            ("Morning", 5), (scenes.processed[2].name, scenes.processed[2].room_id)
+        )
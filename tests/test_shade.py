@@ -56,6 +56,19 @@ class TestShade(TestApiResource):
         # thus base64 decoded is returned
         self.assertEqual("Right", self.resource.name)
 
+    def test_derived_attributes_follow_raw_data(self):
+        shade = self.get_resource()
+        self.assertEqual(("Right", "1.8.1944"), (shade.name, shade.firmware))
+        self.assertIs(shade.name, shade.name)
+
+        shade._update_position_from_dict(
+            {"shade": {"firmware": {"revision": 2, "subRevision": 0, "build": 7}}}
+        )
+        self.assertEqual("2.0.7", shade.firmware)
+
+        shade.raw_data = {**SHADE_RAW_DATA, "name": "TGVmdA=="}  # "Left"
+        self.assertEqual("Left", shade.name)
+
     def test_add_shade_to_room(self):
         async def go():
             await self.start_fake_server()
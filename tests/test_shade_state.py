@@ -0,0 +1,256 @@
+import asyncio
+import unittest
+from unittest import mock
+
+import aiohttp
+
+from aiopvapi.helpers.aiorequest import AioRequest
+from aiopvapi.helpers.tools import next_sequence
+from aiopvapi.helpers.transport import InMemoryTransport
+from aiopvapi.resources.model import PowerviewData
+from aiopvapi.resources.shade import (
+    SOURCE_COMMAND,
+    SOURCE_EVENT,
+    SOURCE_POLL,
+    SOURCE_REFRESH,
+    STATE_BATTERY,
+    STATE_POSITIONS,
+    BaseShade,
+    ShadePosition,
+    factory,
+)
+from aiopvapi.resources.shade_data import PowerviewShadeData
+from aiopvapi.shades import Shades
+from aiopvapi.simulator.home import generate_home
+from aiopvapi.simulator.server import SimulatedHub, SimulatorConfig
+
+SHADE = {
+    "id": 1,
+    "type": 6,
+    "ptName": "Shade",
+    "capabilities": 0,
+    "powerType": 0,
+    "batteryStatus": 2,
+    "positions": {"primary": 0.5},
+}
+
+
+class TestStateStamps(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.gets = []
+        self.hub_position = 0.7
+
+        async def get(request):
+            self.gets.append(request.params)
+            # give concurrent callers the time to join
+            await asyncio.sleep(0.01)
+            return {**SHADE, "positions": {"primary": self.hub_position}}
+
+        transport = InMemoryTransport(
+            {
+                ("GET", "/home/shades/1"): get,
+                ("PUT", "/home/shades/positions"): lambda _: {},
+            }
+        )
+        self.request = AioRequest(
+            "hub", loop=self.loop, websession=transport, api_version=3
+        )
+        patcher = mock.patch.object(BaseShade, "confirm_moves", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def shade(self):
+        return factory(dict(SHADE), self.request)
+
+    def wait(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def test_sources(self):
+        shade = self.shade()
+        self.assertEqual(SOURCE_POLL, shade.state_stamp(STATE_POSITIONS).source)
+
+        self.wait(shade.refresh())
+        self.assertEqual(SOURCE_REFRESH, shade.state_stamp(STATE_POSITIONS).source)
+        self.assertEqual(SOURCE_POLL, shade.state_stamp(STATE_BATTERY).source)
+
+        self.wait(shade.move(ShadePosition(primary=20)))
+        self.assertEqual(SOURCE_COMMAND, shade.state_stamp(STATE_POSITIONS).source)
+
+    def test_max_age(self):
+        shade = self.shade()
+        position = self.wait(shade.get_current_position(max_age=30))
+        self.assertEqual([], self.gets)
+        self.assertEqual(50, position.primary)
+
+        position = self.wait(shade.get_current_position(max_age=0))
+        self.assertEqual(1, len(self.gets))
+        self.assertEqual(70, position.primary)
+
+        self.wait(shade.refresh_battery(max_age=30))
+        self.assertEqual(1, len(self.gets))
+        self.wait(shade.refresh_battery(max_age=0))
+        self.assertEqual({"updateBatteryLevel": "true"}, self.gets[-1])
+
+    def test_concurrent_readers_share_a_refresh(self):
+        shades = [self.shade() for _ in range(5)]
+
+        async def go():
+            return await asyncio.gather(
+                *(shade.get_current_position(max_age=0) for shade in shades)
+            )
+
+        positions = self.wait(go())
+        self.assertEqual(1, len(self.gets))
+        self.assertEqual([70] * 5, [position.primary for position in positions])
+        # every shade got its own copy of the response
+        self.assertEqual(5, len({id(shade.raw_data["positions"]) for shade in shades}))
+
+
+class TestOutOfOrderResponses(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.hub_position = 0.5
+        self.release = asyncio.Event()
+
+        async def get(request):
+            # the state when the request arrives, returned later
+            position = self.hub_position
+            await self.release.wait()
+            return {**SHADE, "positions": {"primary": position}}
+
+        transport = InMemoryTransport(
+            {
+                ("GET", "/home/shades/1"): get,
+                ("PUT", "/home/shades/positions"): lambda _: {},
+            }
+        )
+        self.request = AioRequest(
+            "hub", loop=self.loop, websession=transport, api_version=3
+        )
+        patcher = mock.patch.object(BaseShade, "confirm_moves", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_refresh_older_than_move(self):
+        shade = factory(dict(SHADE), self.request)
+
+        async def go():
+            refresh = asyncio.ensure_future(shade.refresh())
+            await asyncio.sleep(0)
+            await shade.move(ShadePosition(primary=100))
+            self.release.set()
+            await refresh
+
+        self.loop.run_until_complete(go())
+        self.assertEqual(100, shade.current_position.primary)
+        self.assertEqual(SOURCE_COMMAND, shade.state_stamp(STATE_POSITIONS).source)
+
+    def test_event_older_than_refresh(self):
+        shade = factory(dict(SHADE), self.request)
+        self.release.set()
+        issued = next_sequence()
+        self.loop.run_until_complete(shade.refresh())
+        # an event received before the refresh was sent
+        shade.apply_event({"positions": {"primary": 0.1}}, sequence=issued)
+        self.assertEqual(50, shade.current_position.primary)
+
+        shade.apply_event({"positions": {"primary": 0.1}, "batteryStatus": 1})
+        self.assertEqual(10, shade.current_position.primary)
+        self.assertEqual(SOURCE_EVENT, shade.state_stamp(STATE_BATTERY).source)
+
+    def test_poll_keeps_newer_state(self):
+        previous = factory(dict(SHADE), self.request)
+        sequence = next_sequence()
+        previous.apply_event({"positions": {"primary": 0.9}})
+
+        polled = factory(dict(SHADE), self.request)
+        polled._carry_over(previous, sequence)
+        self.assertEqual(90, polled.current_position.primary)
+        self.assertEqual(sequence, polled.state_stamp(STATE_BATTERY).sequence)
+
+
+class TestShadeDataOrdering(unittest.TestCase):
+    def test_late_group_data(self):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        request = AioRequest("hub", loop=loop, websession=object(), api_version=3)
+        older = next_sequence()
+        newer = next_sequence()
+
+        def group(position, sequence):
+            shade = factory({**SHADE, "positions": {"primary": position}}, request)
+            return PowerviewData(
+                raw=[shade.raw_data], processed={1: shade}, sequence=sequence
+            )
+
+        store = PowerviewShadeData()
+        store.store_group_data(group(0.2, newer))
+        store.store_group_data(group(0.8, older))
+        store.update_from_group_data(1)
+        self.assertEqual(20, store.get_shade_position(1).primary)
+
+        # a move answered after the next poll was requested
+        polled = next_sequence()
+        store.update_shade_position(1, ShadePosition(primary=60))
+        store.store_group_data(group(0.2, polled))
+        store.update_from_group_data(1)
+        self.assertEqual(60, store.get_shade_position(1).primary)
+
+        store.update_shade_position(1, ShadePosition(primary=30), sequence=older)
+        self.assertEqual(60, store.get_shade_position(1).primary)
+
+
+class TestRefreshMany(unittest.TestCase):
+    def refresh(self, ids_filter, *subsets):
+        """Refresh stale subsets of 30 shades, return the requests of each."""
+
+        async def go():
+            home = generate_home(3, shades=30, latency=0, jitter=0)
+            config = SimulatorConfig(ids_filter=ids_filter)
+            async with SimulatedHub(home, config) as hub, aiohttp.ClientSession() as s:
+                request = AioRequest(
+                    hub.address,
+                    loop=asyncio.get_running_loop(),
+                    websession=s,
+                    api_version=3,
+                )
+                entry = Shades(request)
+                shades = (await entry.get_shades()).processed
+                hub_positions = {i: s.current_position for i, s in shades.items()}
+                requests = []
+                for size in subsets:
+                    subset = list(shades)[:size]
+                    for shade_id in subset:
+                        shades[shade_id].apply_event({"positions": {"primary": 0.42}})
+                    issued = next_sequence()
+                    hub.requests.clear()
+                    await entry.refresh_many(subset, shades)
+                    requests.append(dict(hub.requests))
+                    for shade_id in subset:
+                        shade = shades[shade_id]
+                        self.assertEqual(
+                            hub_positions[shade_id], shade.current_position
+                        )
+                        stamp = shade.state_stamp(STATE_POSITIONS)
+                        self.assertGreater(stamp.sequence, issued)
+                return requests
+
+        return asyncio.run(go())
+
+    def test_filtered_by_id(self):
+        self.assertEqual([{"GET /home/shades": 1}] * 2, self.refresh(True, 3, 15))
+
+    def test_without_filter(self):
+        first, few, many = self.refresh(False, 3, 1, 10)
+        self.assertEqual({"GET /home/shades": 1}, first)
+        # the hub ignored the filter, a single shade is refreshed on its own
+        self.assertEqual(1, sum(few.values()))
+        self.assertNotIn("GET /home/shades", few)
+        self.assertEqual({"GET /home/shades": 1}, many)
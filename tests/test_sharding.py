@@ -0,0 +1,83 @@
+import asyncio
+import unittest
+
+from aiopvapi.sharding import (
+    OPERATION_REFRESH,
+    ShardedFleet,
+    apply_shade_delta,
+    shade_delta,
+)
+from tests.fake_server import FakePowerViewHub
+
+DEAD_HUB = "127.0.0.1:1"
+
+
+class TestShadeDelta(unittest.TestCase):
+    def test_delta_roundtrip(self):
+        previous = {
+            1: {"position": [0, None, None]},
+            2: {"position": [100, None, None]},
+        }
+        current = {1: {"position": [50, None, None]}, 3: {"position": [0, None, None]}}
+
+        delta = shade_delta(previous, current)
+        self.assertFalse(delta["full"])
+        self.assertEqual([2], delta["removed"])
+        self.assertEqual([1, 3], [shade_id for shade_id, _ in delta["changed"]])
+
+        state = dict(previous)
+        apply_shade_delta(state, delta)
+        self.assertEqual(current, state)
+
+    def test_unchanged_delta_is_empty(self):
+        snapshot = {1: {"position": [0, None, None]}}
+        delta = shade_delta(snapshot, dict(snapshot))
+        self.assertEqual([], delta["changed"])
+        self.assertEqual([], delta["removed"])
+
+    def test_first_delta_is_full(self):
+        delta = shade_delta(None, {1: {}})
+        self.assertTrue(delta["full"])
+
+
+class TestShardedFleet(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.server = FakePowerViewHub(loop=self.loop)
+
+    def tearDown(self):
+        self.loop.run_until_complete(self.server.stop())
+        self.loop.close()
+
+    def test_refresh_and_rebalance(self):
+        async def go():
+            port = next(iter((await self.server.start()).values()))
+            live_hub = f"127.0.0.1:{port}"
+            async with ShardedFleet(workers=2, timeout=1) as fleet:
+                fleet.add_hub(live_hub, api_version=2)
+                fleet.add_hub(DEAD_HUB, api_version=2)
+                self.assertNotEqual(fleet.owner(live_hub), fleet.owner(DEAD_HUB))
+
+                first = {r.host: r async for r in fleet.refresh_all()}
+
+                # kill the worker owning the live hub
+                owner = fleet._owner[live_hub]
+                owner.process.kill()
+                while fleet._owner.get(live_hub) in (None, owner):
+                    await asyncio.sleep(0.05)
+
+                second = await fleet.command(live_hub, OPERATION_REFRESH)
+                return live_hub, first, second, fleet.state
+
+        live_hub, first, second, state = self.loop.run_until_complete(
+            asyncio.wait_for(go(), 60)
+        )
+
+        self.assertTrue(first[live_hub].ok)
+        self.assertTrue(first[live_hub].result["full"])
+        self.assertFalse(first[DEAD_HUB].ok)
+        # the new owner has no previous snapshot and sends a full delta again
+        self.assertTrue(second["full"])
+        self.assertEqual({29889, 56112}, set(state[live_hub]["shades"]))
+        self.assertEqual("927FD402C11CE424", state[live_hub]["hub"]["serial_number"])
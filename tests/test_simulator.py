@@ -0,0 +1,127 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+
+import aiohttp
+
+from aiopvapi.helpers.aiorequest import (
+    AioRequest,
+    PvApiMaintenance,
+    PvApiResponseStatusError,
+)
+from aiopvapi.helpers.constants import ATTR_PRIMARY
+from aiopvapi.hub import Hub
+from aiopvapi.resources.shade import SHADE_CLASSES, BaseShade, ShadePosition
+from aiopvapi.scenes import Scenes
+from aiopvapi.shades import Shades
+from aiopvapi.simulator.home import generate_home, shade_type_catalog
+from aiopvapi.simulator.server import EVENTS_PATH, SimulatedHub, SimulatorConfig
+
+
+class TestSimulatedHub(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def run_with_hub(self, test, api_version=3, config=None, **home_kwargs):
+        home_kwargs.setdefault("latency", 0)
+        home_kwargs.setdefault("jitter", 0)
+
+        async def go():
+            home = generate_home(api_version=api_version, **home_kwargs)
+            async with SimulatedHub(home, config) as hub:
+                async with aiohttp.ClientSession() as session:
+                    request = AioRequest(
+                        hub.address, loop=self.loop, websession=session, timeout=2
+                    )
+                    return await test(hub, request)
+
+        return self.loop.run_until_complete(asyncio.wait_for(go(), 30))
+
+    def test_every_shade_class(self):
+        async def go(hub, request):
+            await Hub(request).query_firmware()
+            shades = await Shades(request).get_shades()
+            return {type(shade) for shade in shades.processed.values()}
+
+        for api_version in (2, 3):
+            with self.subTest(api_version=api_version):
+                classes = self.run_with_hub(
+                    go, api_version, shades=len(shade_type_catalog())
+                )
+                self.assertEqual(set(SHADE_CLASSES), classes)
+
+    def test_hub_info(self):
+        async def go(hub, request):
+            pv_hub = Hub(request)
+            await pv_hub.query_firmware()
+            return pv_hub
+
+        for api_version in (2, 3):
+            with self.subTest(api_version=api_version):
+                pv_hub = self.run_with_hub(go, api_version)
+                self.assertEqual(api_version, pv_hub.api_version)
+                self.assertEqual("Simulated Hub", pv_hub.name)
+
+    def test_shade_moves_over_time(self):
+        async def go(hub, request):
+            request.api_version = 3
+            shades = await Shades(request).get_shades()
+            shade = shades.processed[10000]
+            await shade.move(ShadePosition(primary=100))
+            await asyncio.sleep(0.2)
+            await shade.refresh()
+            halfway = shade.current_position.primary
+            await asyncio.sleep(0.4)
+            await shade.refresh()
+            return halfway, shade.current_position.primary
+
+        with mock.patch.object(BaseShade, "confirm_moves", False):
+            halfway, done = self.run_with_hub(go, speed=2.0)
+        self.assertTrue(0 < halfway < 100)
+        self.assertEqual(100, done)
+
+    def test_scene_activation_and_events(self):
+        async def go(hub, request):
+            request.api_version = 3
+            events = await request.websession.get(f"http://{hub.address}{EVENTS_PATH}")
+            scenes = await Scenes(request).get_scenes()
+            scene = next(
+                scene
+                for scene in scenes.processed.values()
+                if hub.home.scenes[scene.id]["members"]
+            )
+            hub.home.shades[scene.raw_data["shadeIds"][0]].positions[
+                ATTR_PRIMARY
+            ] = 0.25
+            shade_ids = await scene.activate()
+            line = await events.content.readline()
+            events.close()
+            return shade_ids, json.loads(line.decode()[len("data: ") :])
+
+        shade_ids, event = self.run_with_hub(go)
+        self.assertEqual("motion-started", event["evt"])
+        self.assertIn(event["id"], shade_ids)
+
+    def test_maintenance(self):
+        async def go(hub, request):
+            request.api_version = 3
+            hub.maintenance = True
+            await Hub(request).query_firmware()
+
+        with self.assertRaises(PvApiMaintenance):
+            self.run_with_hub(go)
+
+    def test_rate_limit(self):
+        async def go(hub, request):
+            request.api_version = 3
+            for _ in range(5):
+                await request.get(f"http://{hub.address}/home/rooms")
+
+        config = SimulatorConfig(rate_limit=1, burst=3)
+        with self.assertRaises(PvApiResponseStatusError):
+            self.run_with_hub(go, config=config)
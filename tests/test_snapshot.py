@@ -0,0 +1,133 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from aiopvapi.fleet import HubFleet
+from aiopvapi.simulator.home import generate_home
+from aiopvapi.simulator.server import SimulatedHub
+from aiopvapi.snapshot import FleetSnapshot, write_snapshot
+
+
+def describe(shade):
+    """Return what a snapshot keeps of a shade."""
+    return (
+        shade.name,
+        shade.room_id,
+        shade.type_id,
+        shade.capability.type,
+        shade.current_position,
+        shade.is_battery_powered(),
+        shade.get_battery_strength() if shade.has_battery_info() else None,
+        shade.get_signal_strength() if shade.has_signal_strength() else None,
+        shade.firmware,
+    )
+
+
+class TestFleetSnapshot(unittest.TestCase):
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.path = os.path.join(folder.name, "fleet.pvsnap")
+
+    def write(self):
+        """Snapshot a fleet of a gen 2 and a gen 3 hub, return the fleet."""
+
+        async def go():
+            async with (
+                SimulatedHub(generate_home(2, shades=30, seed=1)) as gen2,
+                SimulatedHub(generate_home(3, shades=30, seed=2)) as gen3,
+                HubFleet() as fleet,
+            ):
+                fleet.add_hub(gen2.address, api_version=2)
+                fleet.add_hub(gen3.address, api_version=3)
+                fleet.add_hub("127.0.0.1:1", api_version=3)  # never fetched
+                results = [result async for result in fleet.refresh_all(timeout=5)]
+                fleet.write_snapshot(self.path)
+                return fleet, results
+
+        fleet, results = asyncio.run(go())
+        self.assertEqual(2, sum(result.ok for result in results))
+        return fleet
+
+    def test_hubs(self):
+        fleet = self.write()
+        with FleetSnapshot(self.path) as snapshot:
+            self.assertEqual(list(fleet.hubs), list(snapshot.hosts))
+            for host, fleet_hub in fleet.hubs.items():
+                hub = snapshot.hub(host)
+                self.assertEqual(fleet_hub.api_version, hub.api_version)
+                if fleet_hub.shades is None:
+                    self.assertEqual(
+                        (None, 0, 0), (hub.firmware, hub.shade_count, hub.room_count)
+                    )
+                    continue
+                self.assertEqual(fleet_hub.hub.serial_number, hub.serial_number)
+                self.assertEqual(fleet_hub.hub.firmware, hub.firmware)
+                self.assertEqual(len(fleet_hub.shades.raw), hub.shade_count)
+                self.assertEqual(len(fleet_hub.rooms.raw), hub.room_count)
+            with self.assertRaises(KeyError):
+                snapshot.hub("unknown")
+
+    def test_low_battery(self):
+        fleet = self.write()
+        expected = {}
+        for host, fleet_hub in fleet.hubs.items():
+            low = [
+                shade.id
+                for shade in (
+                    fleet_hub.shades.processed if fleet_hub.shades else {}
+                ).values()
+                if shade.is_battery_powered() and shade.get_battery_strength() <= 75
+            ]
+            if low:
+                expected[host] = low
+        self.assertEqual(2, len(expected))
+
+        with FleetSnapshot(self.path) as snapshot:
+            self.assertEqual(expected, snapshot.low_battery(75))
+
+    def test_seed(self):
+        fleet = self.write()
+
+        async def go():
+            async with HubFleet() as new_fleet:
+                with FleetSnapshot(self.path) as snapshot:
+                    for host in snapshot.hosts:
+                        snapshot.seed(new_fleet.add_hub(host))
+                return new_fleet
+
+        seeded = asyncio.run(go())
+        for host, fleet_hub in fleet.hubs.items():
+            with self.subTest(host):
+                seeded_hub = seeded.hubs[host]
+                self.assertEqual(fleet_hub.api_version, seeded_hub.api_version)
+                if fleet_hub.shades is None:
+                    self.assertEqual({}, dict(seeded_hub.shades.processed))
+                    continue
+                shades = fleet_hub.shades.processed
+                self.assertEqual(
+                    {i: describe(shade) for i, shade in shades.items()},
+                    {i: describe(s) for i, s in seeded_hub.shades.processed.items()},
+                )
+                self.assertEqual(
+                    {i: room.name for i, room in fleet_hub.rooms.processed.items()},
+                    {i: room.name for i, room in seeded_hub.rooms.processed.items()},
+                )
+                shade_id = next(iter(shades))
+                self.assertEqual(
+                    shades[shade_id].current_position.primary,
+                    seeded_hub.shade_data.get_shade_position(shade_id).primary,
+                )
+
+    def test_not_a_snapshot(self):
+        with open(self.path, "wb") as file:
+            file.write(b"\0" * 64)
+        with self.assertRaises(ValueError):
+            FleetSnapshot(self.path)
+
+    def test_empty(self):
+        write_snapshot(self.path, [])
+        with FleetSnapshot(self.path) as snapshot:
+            self.assertEqual({}, snapshot.hosts)
+            self.assertEqual({}, snapshot.low_battery())
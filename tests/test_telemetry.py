@@ -0,0 +1,235 @@
+import asyncio
+import gc
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from aiopvapi.helpers.aiorequest import AioRequest
+from aiopvapi.helpers.transport import InMemoryTransport
+from aiopvapi.resources import telemetry
+from aiopvapi.resources.shade import BaseShade, ShadePosition
+from aiopvapi.resources.telemetry import (
+    METRIC_BATTERY,
+    METRIC_PRIMARY,
+    METRIC_SIGNAL,
+    Sample,
+    Series,
+    TelemetryRecorder,
+)
+from aiopvapi.shades import Shades
+
+SHADE_V3 = {
+    "id": 1,
+    "type": 6,
+    "ptName": "One",
+    "powerType": 0,
+    "batteryStatus": 3,
+    "signalStrength": -60,
+    "positions": {"primary": 0.5},
+}
+SHADE_V2 = {
+    "id": 1,
+    "type": 6,
+    "name": "T25l",
+    "batteryKind": 2,
+    "batteryStrength": 162,
+    "signalStrength": 3,
+    "positions": {"posKind1": 1, "position1": 16384},
+}
+
+
+class TestSeries(unittest.TestCase):
+    def test_raw_window(self):
+        series = Series(capacity=8)
+        for second in range(5):
+            series.add(100 + second, second * 10)
+
+        self.assertEqual(Sample(104, 40), series.last())
+        stats = series.window(102)
+        self.assertEqual(
+            (3, 20, 40, 30), (stats.count, stats.min, stats.max, stats.avg)
+        )
+        self.assertEqual(Sample(102, 20), stats.first)
+        self.assertIsNone(series.window(105))
+        self.assertEqual(5, series.window(0).count)
+
+    def test_aggregates_beyond_raw_samples(self):
+        series = Series(capacity=4, tiers=((60, 10), (3600, 10)))
+        # a sample every 30 seconds for an hour, from 100 down to 0
+        for index in range(121):
+            series.add(index * 30, 100 - index * 100 / 120)
+
+        # the raw samples cover the last 2 minutes only
+        self.assertEqual(4, series.window(3600 - 90).count)
+        minutes = series.window(3600 - 300)
+        self.assertEqual(11, minutes.count)
+        self.assertEqual(0, minutes.min)
+        self.assertEqual(Sample(3600, 0), minutes.last)
+        # the mean of the first minute
+        self.assertEqual(3300, minutes.first.time)
+        self.assertAlmostEqual(7.917, minutes.first.value, places=3)
+        hours = series.window(0)
+        self.assertEqual(121, hours.count)
+        self.assertAlmostEqual(100, hours.max)
+        self.assertAlmostEqual(50, hours.avg, places=4)
+
+    def test_older_sample_taken_as_last(self):
+        series = Series()
+        series.add(100, 1)
+        series.add(50, 2)
+        self.assertEqual(Sample(100, 2), series.last())
+
+
+class TestTelemetryRecorder(unittest.TestCase):
+    def test_rate_per_hour(self):
+        recorder = TelemetryRecorder()
+        for hour in range(4):
+            recorder.record(1, METRIC_BATTERY, 100 - hour * 5, when=hour * 3600)
+
+        self.assertEqual(-5, recorder.rate(1, METRIC_BATTERY, 4 * 3600, now=3 * 3600))
+        self.assertIsNone(recorder.rate(1, METRIC_BATTERY, 60, now=3 * 3600))
+        self.assertIsNone(recorder.window(2, METRIC_BATTERY, 60))
+        self.assertEqual({1}, recorder.shade_ids())
+
+    def test_file(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "telemetry.bin")
+            recorder = TelemetryRecorder(path)
+            recorder.record(1, METRIC_BATTERY, 50, when=10)
+            recorder.record(2, METRIC_SIGNAL, -70, when=20)
+            recorder.flush()
+            with open(path, "ab") as file:
+                file.write(b"\x00" * 5)  # a record cut short
+
+            loaded = TelemetryRecorder.load(path, append=True)
+            self.assertEqual(Sample(10, 50), loaded.last(1, METRIC_BATTERY))
+            self.assertEqual(Sample(20, -70), loaded.last(2, METRIC_SIGNAL))
+            self.assertEqual(path, loaded.path)
+
+            # a telemetry file is appended to
+            appending = TelemetryRecorder(path)
+            appending.record(1, METRIC_BATTERY, 40, when=30)
+            appending.flush()
+            self.assertEqual(
+                2, TelemetryRecorder.load(path).window(1, METRIC_BATTERY, 60, 60).count
+            )
+
+            with open(path, "wb") as file:
+                file.write(b"{}")
+            with self.assertRaises(ValueError):
+                TelemetryRecorder.load(path)
+            with self.assertRaises(ValueError):
+                TelemetryRecorder(path)
+            with open(path, "rb") as file:
+                self.assertEqual(b"{}", file.read())
+
+
+class TestRecordedState(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        patcher = mock.patch.object(BaseShade, "confirm_moves", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def shades(self, api_version, raw, refreshed):
+        if api_version >= 3:
+            routes = {
+                ("GET", "/home/shades"): lambda _: [dict(raw)],
+                ("GET", "/home/shades/1"): lambda _: dict(refreshed),
+                ("PUT", "/home/shades/positions"): lambda _: {},
+            }
+        else:
+            routes = {
+                ("GET", "/api/shades"): lambda _: {
+                    "shadeIds": [1],
+                    "shadeData": [dict(raw)],
+                },
+                ("GET", "/api/shades/1"): lambda _: {"shade": dict(refreshed)},
+                ("PUT", "/api/shades/1"): lambda _: {},
+            }
+        request = AioRequest(
+            "hub",
+            loop=self.loop,
+            websession=InMemoryTransport(routes),
+            api_version=api_version,
+        )
+        return request, Shades(request)
+
+    def test_not_recorded_by_default(self):
+        request, shades = self.shades(3, SHADE_V3, SHADE_V3)
+        self.loop.run_until_complete(shades.get_shades())
+        self.assertIsNone(telemetry.recorder(request))
+
+    def test_sources_v3(self):
+        request, shades = self.shades(
+            3, SHADE_V3, {**SHADE_V3, "positions": {"primary": 0.8}}
+        )
+        recorder = telemetry.enable(request)
+        self.assertIs(recorder, telemetry.enable(request))
+
+        shade = self.loop.run_until_complete(shades.get_shades()).processed[1]
+        self.assertEqual(100, recorder.last(1, METRIC_BATTERY).value)
+        self.assertEqual(-60, recorder.last(1, METRIC_SIGNAL).value)
+        self.assertEqual(50, recorder.last(1, METRIC_PRIMARY).value)
+
+        self.loop.run_until_complete(shade.refresh())
+        self.assertEqual(80, recorder.last(1, METRIC_PRIMARY).value)
+        # commands are not telemetry
+        self.loop.run_until_complete(shade.move(ShadePosition(primary=10)))
+        self.assertEqual(80, recorder.last(1, METRIC_PRIMARY).value)
+
+        shade.apply_event({"batteryStatus": 1})
+        stats = recorder.window(1, METRIC_BATTERY, 60)
+        self.assertEqual((2, 20, 100), (stats.count, stats.min, stats.max))
+        self.assertEqual(2, recorder.window(1, METRIC_PRIMARY, 60).count)
+
+        telemetry.disable(request)
+        self.assertIsNone(telemetry.recorder(request))
+
+    def test_enable_with_another_file(self):
+        request, _shades = self.shades(3, SHADE_V3, SHADE_V3)
+        recorder = telemetry.enable(request)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "telemetry.bin")
+            with self.assertRaises(ValueError):
+                telemetry.enable(request, path=path)
+            self.assertFalse(os.path.exists(path))
+
+            telemetry.disable(request)
+            recorder = telemetry.enable(request, path=path)
+            self.assertIs(recorder, telemetry.enable(request, path=path))
+            self.assertIs(recorder, telemetry.enable(request))
+            with self.assertRaises(ValueError):
+                telemetry.enable(request, path=path + ".2")
+
+    def test_flushed_when_request_dropped(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "telemetry.bin")
+            request, shades = self.shades(3, SHADE_V3, SHADE_V3)
+            telemetry.enable(request, path=path)
+            self.loop.run_until_complete(shades.get_shades())
+            del request, shades
+            gc.collect()
+
+            loaded = TelemetryRecorder.load(path)
+            self.assertEqual(100, loaded.last(1, METRIC_BATTERY).value)
+
+    def test_unknown_api_version(self):
+        request, shades = self.shades(3, SHADE_V3, SHADE_V3)
+        shade = self.loop.run_until_complete(shades.get_shades()).processed[1]
+        recorder = telemetry.enable(request)
+        request.api_version = None
+        shade.apply_event({"batteryStatus": 1})
+        self.assertEqual(set(), recorder.shade_ids())
+
+    def test_sources_v2(self):
+        request, shades = self.shades(2, SHADE_V2, SHADE_V2)
+        recorder = telemetry.enable(request)
+        self.loop.run_until_complete(shades.get_shades())
+        self.assertEqual(90, recorder.last(1, METRIC_BATTERY).value)
+        self.assertEqual(75, recorder.last(1, METRIC_SIGNAL).value)
+        self.assertAlmostEqual(25, recorder.last(1, METRIC_PRIMARY).value, places=3)
@@ -22,3 +22,13 @@ class TestTools(unittest.TestCase):
                          tools.get_base_path('http://127.0.0.1', '/api//api2'))
         self.assertEqual('http://127.0.0.1/api/api2',
                          tools.get_base_path('http://127.0.0.1//', '/api//api2'))
+
+    def test_intern_name(self):
+        name = "".join(["Living", " Room"])
+        self.assertIs(tools.intern_name(name), tools.intern_name("Living Room"))
+        # "Right" in base64, a plain name with the same text is kept apart
+        self.assertEqual("UmlnaHQ=", tools.intern_name("UmlnaHQ="))
+        decoded = tools.base64_to_name("UmlnaHQ=")
+        self.assertEqual("Right", decoded)
+        self.assertIs(decoded, tools.base64_to_name("UmlnaHQ="))
+        self.assertIs(decoded, tools.intern_name("Right"))
@@ -0,0 +1,105 @@
+import asyncio
+from contextlib import contextmanager
+import unittest
+from unittest import mock
+
+from aiopvapi.helpers import tracing
+from aiopvapi.helpers.aiorequest import AioRequest
+from aiopvapi.helpers.transport import InMemoryTransport
+from aiopvapi.resources.scene import Scene
+from aiopvapi.resources.shade import BaseShade, ShadePosition
+from aiopvapi.shades import Shades
+
+SHADES = [{"id": 1, "type": 6, "name": "U2hhZGU=", "positions": {"primary": 0.5}}]
+
+
+class RecordedSpan:
+    def __init__(self, name, attributes, parent):
+        self.name = name
+        self.attributes = dict(attributes)
+        self.parent = parent
+
+    def is_recording(self):
+        return True
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+
+class RecordingTracer:
+    def __init__(self):
+        self.spans = []
+        self._current = None
+
+    @contextmanager
+    def start_as_current_span(self, name, attributes=None):
+        recorded = RecordedSpan(name, attributes or {}, self._current)
+        self.spans.append(recorded)
+        self._current, parent = recorded, self._current
+        try:
+            yield recorded
+        finally:
+            self._current = parent
+
+    def named(self, name):
+        return [recorded for recorded in self.spans if recorded.name == name]
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.tracer = RecordingTracer()
+        tracing.set_tracer(self.tracer)
+        transport = InMemoryTransport(
+            {
+                ("GET", "/home/shades"): lambda request: SHADES,
+                ("PUT", "/home/shades/positions"): lambda request: {},
+                ("PUT", "/home/scenes/{scene_id}/activate"): lambda request: [1],
+            }
+        )
+        self.request = AioRequest(
+            "hub", loop=self.loop, websession=transport, api_version=3
+        )
+        self.request.hub_serial = "ABC"
+        patcher = mock.patch.object(BaseShade, "confirm_moves", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        tracing.set_tracer(None)
+        self.loop.close()
+
+    def test_disabled_by_default(self):
+        tracing.set_tracer(None)
+        self.assertIs(tracing.NOOP_SPAN, tracing.span("anything", self.request))
+
+    def test_get_shades(self):
+        shades = self.loop.run_until_complete(Shades(self.request).get_shades())
+
+        (operation,) = self.tracer.named("Shades.get_shades")
+        self.assertIsNone(operation.parent)
+        self.assertEqual(1, operation.attributes[tracing.ATTR_COUNT])
+        self.assertEqual("ABC", operation.attributes[tracing.ATTR_HUB_SERIAL])
+        self.assertEqual(3, operation.attributes[tracing.ATTR_API_VERSION])
+
+        (get,) = self.tracer.named("AioRequest.get")
+        self.assertIs(operation, get.parent)
+        self.assertEqual("GET", get.attributes[tracing.ATTR_HTTP_METHOD])
+        self.assertEqual(200, get.attributes[tracing.ATTR_HTTP_STATUS])
+        self.assertIs(get, self.tracer.named("AioRequest.json_decode")[0].parent)
+        self.assertIs(operation, self.tracer.named("sanitize")[0].parent)
+        self.assertIs(operation, self.tracer.named("factory")[0].parent)
+
+        shade = shades.processed[1]
+        self.loop.run_until_complete(shade.move(ShadePosition(primary=10)))
+        (move,) = self.tracer.named("BaseShade.move")
+        self.assertEqual(1, move.attributes[tracing.ATTR_SHADE_ID])
+        self.assertIs(move, self.tracer.named("codec")[0].parent)
+        self.assertIs(move, self.tracer.named("AioRequest.put")[0].parent)
+
+    def test_scene_activate(self):
+        self.loop.run_until_complete(Scene({"id": 7}, self.request).activate())
+
+        (activate,) = self.tracer.named("Scene.activate")
+        self.assertEqual(7, activate.attributes[tracing.ATTR_SCENE_ID])
+        self.assertIs(activate, self.tracer.named("AioRequest.put")[0].parent)
@@ -0,0 +1,124 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+
+from aiopvapi.helpers.aiorequest import (
+    AioRequest,
+    PvApiConnectionError,
+    PvApiMaintenance,
+    PvApiResponseStatusError,
+)
+from aiopvapi.helpers.transport import (
+    InMemoryTransport,
+    RecordingTransport,
+    ReplayTransport,
+    load_capture,
+)
+from aiopvapi.resources.scene import Scene
+from aiopvapi.shades import Shades
+from tests.fake_server import FAKE_BASE_URL, TestFakeServer
+
+SHADES = [{"id": 1, "type": 6, "name": "U2hhZGU=", "positions": {"primary": 0.5}}]
+
+
+class TestInMemoryTransport(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def request(self, transport):
+        return AioRequest(
+            "hub", loop=self.loop, websession=transport, timeout=1, api_version=3
+        )
+
+    def test_dispatch_to_handlers(self):
+        calls = []
+
+        async def activate(request):
+            calls.append(request.match_info["scene_id"])
+            return [1]
+
+        transport = InMemoryTransport(
+            {
+                ("GET", "/home/shades"): lambda request: SHADES,
+                ("PUT", "/home/scenes/{scene_id}/activate"): activate,
+            }
+        )
+        request = self.request(transport)
+
+        async def go():
+            shades = await Shades(request).get_shades()
+            return shades, await Scene({"id": 7}, request).activate()
+
+        shades, activated = self.loop.run_until_complete(go())
+        self.assertEqual("Shade", shades.processed[1].name)
+        self.assertEqual(50, shades.processed[1].current_position.primary)
+        self.assertEqual([1], activated)
+        self.assertEqual(["7"], calls)
+
+    def test_status_and_timeout(self):
+        async def hang(request):
+            await asyncio.sleep(5)
+
+        transport = InMemoryTransport(
+            {("GET", "/home/rooms"): lambda request: (423, None)}
+        )
+        transport.add_route("*", "/home/scenes", hang)
+        request = self.request(transport)
+
+        with self.assertRaises(PvApiMaintenance):
+            self.loop.run_until_complete(request.get("http://hub/home/rooms"))
+        with self.assertRaises(PvApiConnectionError):
+            self.loop.run_until_complete(request.get("http://hub/home/scenes"))
+
+
+class TestRecordReplay(TestFakeServer):
+    def test_record_and_replay(self):
+        async def record():
+            await self.start_fake_server()
+            recorder = RecordingTransport(self.request.websession)
+            self.request.websession = recorder
+            shades = await Shades(self.request).get_shades()
+            self.request.websession = recorder.session
+            return recorder, shades
+
+        recorder, recorded = self.loop.run_until_complete(record())
+        self.assertEqual(1, len(recorder.exchanges))
+        self.assertEqual("/api/shades", recorder.exchanges[0].path)
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "capture.jsonl")
+            recorder.save(path)
+            capture = load_capture(path)
+        capture[0].duration = 0.2
+
+        async def replay(speed):
+            request = AioRequest(
+                FAKE_BASE_URL,
+                loop=self.loop,
+                websession=ReplayTransport(capture, speed=speed),
+                api_version=2,
+            )
+            started = time.monotonic()
+            shades = await Shades(request).get_shades()
+            return shades, time.monotonic() - started
+
+        replayed, elapsed = self.loop.run_until_complete(replay(1))
+        self.assertEqual(recorded.raw, replayed.raw)
+        self.assertGreaterEqual(elapsed, 0.2)
+
+        _, elapsed = self.loop.run_until_complete(replay(10))
+        self.assertLess(elapsed, 0.1)
+
+    def test_replay_unmatched(self):
+        transport = ReplayTransport([], speed=0)
+        request = AioRequest(
+            FAKE_BASE_URL, loop=self.loop, websession=transport, api_version=2
+        )
+        with self.assertRaises(PvApiResponseStatusError):
+            self.loop.run_until_complete(request.get(f"http://{FAKE_BASE_URL}/api"))
+        self.assertEqual("/api", transport.unmatched[0].path)